@@ -61,13 +61,14 @@ from hl7apy.core import Message
 from hl7apy.parser import parse_message
 from hl7apy.validation import VALIDATION_LEVEL
 from pathlib import Path
-from typing import Any, Iterable, List, Optional
+from typing import Any, Callable, Iterable, List, Optional, TextIO
 from uuid import UUID as _UUID
 
 from .config import load_config
 from .exceptions import HL7FHIRToolError
 from .fhir_parser import load_fhir_json, load_fhir_xml
 from .hl7_parser import parse_hl7_v2, to_pretty_segments
+from .json_utils import dumps_utf8, loads as json_loads
 from .logging_utils import configure_logging
 from .rdf_serializer import serialize_resources
 from .transform.registry import available_events, get_transformer
@@ -346,7 +347,11 @@ def _validate_output_mode(output_dir: Optional[Path], to_stdout: bool) -> None:
         raise HL7FHIRToolError(f"Output directory not writable: {output_dir}")
 
 
-def _read_text_input(path: Path) -> str:
+def _read_text_input(
+    path: Path,
+    reader: Callable[..., str] = Path.read_text,
+    stdin: Optional[TextIO] = None,
+) -> str:
     """
     Read text either from a file or from stdin when path is "-".
 
@@ -354,6 +359,11 @@ def _read_text_input(path: Path) -> str:
     ----------
     path : Path
         Path to a file or "-" for stdin.
+    reader : callable, optional
+        Called as reader(path, encoding="utf-8") to read a file. Defaults to
+        Path.read_text; tests inject a stub instead of patching Path.
+    stdin : TextIO or None, optional
+        Stream read when path is "-"; None uses sys.stdin.
 
     Returns
     -------
@@ -367,8 +377,8 @@ def _read_text_input(path: Path) -> str:
     """
     try:
         if str(path) == "-":
-            return sys.stdin.read()
-        return path.read_text(encoding="utf-8")
+            return (stdin or sys.stdin).read()
+        return reader(path, encoding="utf-8")
     except FileNotFoundError:
         raise HL7FHIRToolError(f"File not found: {path}")
     except PermissionError:
@@ -487,7 +497,10 @@ def _resource_to_json_str(resource: Any, pretty: bool) -> str:
 
 
 def _write_resources_to_dir(
-    resources: Iterable[Any], out_dir: Path, pretty: bool
+    resources: Iterable[Any],
+    out_dir: Path,
+    pretty: bool,
+    writer: Callable[..., Any] = Path.write_text,
 ) -> None:
     """
     Write resources to JSON files in the given directory.
@@ -502,6 +515,9 @@ def _write_resources_to_dir(
         Destination directory. Will be created if needed.
     pretty : bool
         Pretty-print JSON output when True.
+    writer : callable, optional
+        Called as writer(path, text, encoding="utf-8") for each file. Defaults
+        to Path.write_text; tests inject a stub instead of patching Path.
 
     Returns
     -------
@@ -520,7 +536,7 @@ def _write_resources_to_dir(
         stem = f"{i:02d}_{rtype}" if rtype else f"resource_{i}"
         out_path = out_dir / f"{stem}.json"
         try:
-            out_path.write_text(_resource_to_json_str(res, pretty), encoding="utf-8")
+            writer(out_path, _resource_to_json_str(res, pretty), encoding="utf-8")
         except OSError as e:
             raise HL7FHIRToolError(f"Failed to write {out_path}: {e}") from e
         LOG.info("Wrote %s", out_path)
@@ -559,7 +575,7 @@ def _write_resources_to_stdout(resources: Iterable[Any], pretty: bool) -> None:
         else:
             try:
                 # Normalize to compact single line if possible
-                sys.stdout.write(json.dumps(json.loads(s), separators=(",", ":")))
+                sys.stdout.write(json.dumps(json_loads(s), separators=(",", ":")))
             except Exception:
                 sys.stdout.write(s)
             sys.stdout.write("\n")
@@ -572,25 +588,23 @@ def _write_resources_to_stdout(resources: Iterable[Any], pretty: bool) -> None:
 # ------------------------------------------------------------------------------
 
 
-def _build_fhir_bundle_json(resources: List[Any], pretty: bool) -> str:
+def _build_fhir_bundle(resources: List[Any]) -> dict[str, Any]:
     """
     Wrap a list of FHIR resource objects into a FHIR Bundle (type: collection).
 
-    The bundle is assembled as a plain dict and serialized to JSON using
-    _resource_to_json_str for each entry resource. This avoids a dependency on
+    The bundle is assembled as a plain dict, with each entry resource
+    converted through _resource_to_json_str. This avoids a dependency on
     fhir.resources.bundle, whose API varies across fhir.resources versions.
 
     Parameters
     ----------
     resources : list
         FHIR resource instances (pydantic models from fhir.resources).
-    pretty : bool
-        If True, indent the JSON output.
 
     Returns
     -------
-    str
-        FHIR Bundle JSON string with resourceType "Bundle" and type "collection".
+    dict
+        JSON-compatible Bundle with resourceType "Bundle" and type "collection".
 
     Raises
     ------
@@ -601,19 +615,45 @@ def _build_fhir_bundle_json(resources: List[Any], pretty: bool) -> str:
     for res in resources:
         res_json_str = _resource_to_json_str(res, pretty=False)
         try:
-            res_dict = json.loads(res_json_str)
+            res_dict = json_loads(res_json_str)
         except json.JSONDecodeError as e:
             raise HL7FHIRToolError(
                 f"Failed to parse resource JSON during Bundle assembly: {e}"
             ) from e
         entries.append({"resource": res_dict})
 
-    bundle = {
+    return {
         "resourceType": "Bundle",
         "type": "collection",
         "entry": entries,
     }
-    return json.dumps(bundle, indent=2 if pretty else None)
+
+
+def _build_fhir_bundle_json(resources: List[Any], pretty: bool) -> str:
+    """
+    Serialize resources as a FHIR Bundle (type: collection) JSON string.
+
+    Non-ASCII characters are escaped, so the result can be written to any
+    text stream regardless of its encoding (e.g. stdout).
+
+    Parameters
+    ----------
+    resources : list
+        FHIR resource instances (pydantic models from fhir.resources).
+    pretty : bool
+        If True, indent the JSON output.
+
+    Returns
+    -------
+    str
+        FHIR Bundle JSON string with resourceType "Bundle" and type "collection".
+
+    Raises
+    ------
+    HL7FHIRToolError
+        If any resource cannot be serialized to JSON.
+    """
+    return json.dumps(_build_fhir_bundle(resources), indent=2 if pretty else None)
 
 
 def _load_resources_from_bundle_json(bundle_json_str: str) -> List[Any]:
@@ -641,7 +681,7 @@ def _load_resources_from_bundle_json(bundle_json_str: str) -> List[Any]:
         If the JSON is malformed or the top-level resourceType is not "Bundle".
     """
     try:
-        bundle_dict = json.loads(bundle_json_str)
+        bundle_dict = json_loads(bundle_json_str)
     except json.JSONDecodeError as e:
         raise HL7FHIRToolError(f"Invalid JSON in FHIR Bundle file: {e}") from e
 
@@ -735,7 +775,7 @@ def _parse_hl7_for_cli(content: str) -> Message:
 # ------------------------------------------------------------------------------
 
 
-def _cmd_parse_hl7(path: Path) -> int:
+def _cmd_parse_hl7(path: Path, stdin: Optional[TextIO] = None) -> int:
     """
     Parse-hl7: pretty-print HL7 v2 segments.
 
@@ -743,6 +783,8 @@ def _cmd_parse_hl7(path: Path) -> int:
     ----------
     path : Path
         File path, or "-" for stdin.
+    stdin : TextIO or None, optional
+        Stream read when path is "-"; None uses sys.stdin.
 
     Returns
     -------
@@ -755,7 +797,7 @@ def _cmd_parse_hl7(path: Path) -> int:
         If input is invalid or unreadable.
     """
     _validate_existing_file(path, allow_stdin=True)
-    content = _read_text_input(path)
+    content = _read_text_input(path, stdin=stdin)
     msg = _parse_hl7_for_cli(content)
     for line in to_pretty_segments(msg):
         print(line)
@@ -797,6 +839,7 @@ def _cmd_transform(
     output_dir: Optional[Path],
     to_stdout: bool,
     pretty: bool,
+    stdin: Optional[TextIO] = None,
 ) -> int:
     """
     Transform: convert an HL7 v2 message into FHIR resources.
@@ -813,6 +856,8 @@ def _cmd_transform(
         If True, write resources to stdout; otherwise to files.
     pretty : bool
         If True, pretty-print JSON output (stdout or files).
+    stdin : TextIO or None, optional
+        Stream read when path is "-"; None uses sys.stdin.
 
     Returns
     -------
@@ -833,7 +878,7 @@ def _cmd_transform(
     _validate_existing_file(path, allow_stdin=True)
     _validate_output_mode(output_dir, to_stdout)
 
-    content = _read_text_input(path)
+    content = _read_text_input(path, stdin=stdin)
     msg = _parse_hl7_for_cli(content)
 
     xform = get_transformer(msg)
@@ -860,6 +905,7 @@ def _cmd_to_fhir(
     output_dir: Optional[Path],
     to_stdout: bool,
     pretty: bool,
+    stdin: Optional[TextIO] = None,
 ) -> int:
     """
     To-fhir: transform an HL7 v2 message into a FHIR Bundle JSON file.
@@ -882,6 +928,8 @@ def _cmd_to_fhir(
         If True, write Bundle JSON to stdout.
     pretty : bool
         If True, pretty-print the JSON output.
+    stdin : TextIO or None, optional
+        Stream read when path is "-"; None uses sys.stdin.
 
     Returns
     -------
@@ -896,7 +944,7 @@ def _cmd_to_fhir(
     _validate_existing_file(path, allow_stdin=True)
     _validate_output_mode(output_dir, to_stdout)
 
-    content = _read_text_input(path)
+    content = _read_text_input(path, stdin=stdin)
     msg = _parse_hl7_for_cli(content)
 
     xform = get_transformer(msg)
@@ -904,10 +952,9 @@ def _cmd_to_fhir(
         raise HL7FHIRToolError("No transformer registered for this HL7 message type.")
 
     resources = list(xform.transform(msg))
-    bundle_json = _build_fhir_bundle_json(resources, pretty=pretty)
 
     if to_stdout:
-        sys.stdout.write(bundle_json)
+        sys.stdout.write(_build_fhir_bundle_json(resources, pretty=pretty))
         sys.stdout.write("\n")
         sys.stdout.flush()
         return EXIT_OK
@@ -919,8 +966,10 @@ def _cmd_to_fhir(
 
     stem = path.stem if str(path) != "-" else "output"
     out_path = out_dir / f"{stem}.json"
+    # Files are written as UTF-8 bytes, so the orjson fast path applies here
+    bundle = _build_fhir_bundle(resources)
     try:
-        out_path.write_text(bundle_json, encoding="utf-8")
+        out_path.write_bytes(dumps_utf8(bundle, indent=2 if pretty else None))
     except OSError as e:
         raise HL7FHIRToolError(f"Failed to write {out_path}: {e}") from e
 
@@ -933,6 +982,7 @@ def _cmd_to_rdf(
     path: Path,
     output_dir: Optional[Path],
     to_stdout: bool,
+    stdin: Optional[TextIO] = None,
 ) -> int:
     """
     To-rdf: serialize to RDF/Turtle.
@@ -959,6 +1009,8 @@ def _cmd_to_rdf(
         Directory to write the .ttl file when not writing to stdout.
     to_stdout : bool
         If True, write Turtle to stdout.
+    stdin : TextIO or None, optional
+        Stream read when path is "-"; None uses sys.stdin.
 
     Returns
     -------
@@ -982,7 +1034,7 @@ def _cmd_to_rdf(
         resources = _load_resources_from_bundle_json(bundle_json_str)
     else:
         # Single-stage or stdin: parse HL7 directly
-        content = _read_text_input(path)
+        content = _read_text_input(path, stdin=stdin)
         msg = _parse_hl7_for_cli(content)
         xform = get_transformer(msg)
         if not xform:
@@ -1022,7 +1074,7 @@ def _cmd_to_rdf(
 # ------------------------------------------------------------------------------
 
 
-def main(argv: Optional[list[str]] = None) -> int:
+def main(argv: Optional[list[str]] = None, stdin: Optional[TextIO] = None) -> int:
     """
     CLI entrypoint.
 
@@ -1030,6 +1082,8 @@ def main(argv: Optional[list[str]] = None) -> int:
     ----------
     argv : list[str] or None, default None
         Argument list for testing; None uses sys.argv[1:].
+    stdin : TextIO or None, default None
+        Stream read for a "-" input path; None uses sys.stdin.
 
     Returns
     -------
@@ -1048,7 +1102,7 @@ def main(argv: Optional[list[str]] = None) -> int:
 
     try:
         if args.cmd == "parse-hl7":
-            return _cmd_parse_hl7(args.path)
+            return _cmd_parse_hl7(args.path, stdin=stdin)
         if args.cmd == "parse-fhir":
             return _cmd_parse_fhir(args.path)
         if args.cmd == "transform":
@@ -1058,6 +1112,7 @@ def main(argv: Optional[list[str]] = None) -> int:
                 output_dir=args.output_dir,
                 to_stdout=bool(args.stdout),
                 pretty=bool(args.pretty),
+                stdin=stdin,
             )
         if args.cmd == "to-fhir":
             return _cmd_to_fhir(
@@ -1065,12 +1120,14 @@ def main(argv: Optional[list[str]] = None) -> int:
                 output_dir=args.output_dir,
                 to_stdout=bool(args.stdout),
                 pretty=bool(args.pretty),
+                stdin=stdin,
             )
         if args.cmd == "to-rdf":
             return _cmd_to_rdf(
                 path=args.path,
                 output_dir=args.output_dir,
                 to_stdout=bool(args.stdout),
+                stdin=stdin,
             )
 
         parser.error("Unknown command")  # defensive, should not happen
@@ -1084,5 +1141,17 @@ def main(argv: Optional[list[str]] = None) -> int:
         return EXIT_ERR
 
 
-if __name__ == "__main__":
+def _entrypoint() -> None:
+    """
+    Run main() with sys.argv and exit with its return code.
+
+    Raises
+    ------
+    SystemExit
+        Always; carries the exit code from main().
+    """
     raise SystemExit(main())
+
+
+if __name__ == "__main__":
+    _entrypoint()
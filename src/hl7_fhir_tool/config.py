@@ -14,6 +14,10 @@ from typing import Any, Mapping, Optional
 
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it; the pure-Python
+# SafeLoader otherwise. Both resolve only the safe YAML tag set.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 @dataclass(frozen=True)
 class AppConfig:
@@ -54,7 +58,7 @@ def load_config(path: Optional[Path]) -> AppConfig:
     if path is None:
         return AppConfig()
 
-    data: Any = yaml.safe_load(path.read_text())
+    data: Any = yaml.load(path.read_text(), Loader=_YAML_LOADER)
 
     if data is None:
         return AppConfig()
@@ -9,39 +9,132 @@ the base `Resource` model.
 
 from __future__ import annotations
 
+import importlib
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
 from pathlib import Path
-from typing import Any, Dict, Mapping, Type, TypeVar, cast
+from types import GenericAlias
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import json
 from lxml import etree
 from fhir.resources.resource import Resource
-from fhir.resources.patient import Patient
-from fhir.resources.observation import Observation
-from fhir.resources.bundle import Bundle
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 from .exceptions import ParseError
+from .json_utils import loads as json_loads
 
 # ------------------------------------------------------------------------------
 # globals
 # ------------------------------------------------------------------------------
 
-# Known FHIR resource classes you want first-class parsing for.
+
+class _LazyTypeMap(Mapping[str, Type[Resource]]):
+    """
+    Read-only resourceType -> model class map that imports each class on
+    first lookup.
+
+    Entries are registered as module paths, so importing this module does
+    not build the pydantic schemas of every known resource model up front.
+    Tests substitute classes with `_override_types`, never by mutation.
+    """
+
+    def __init__(self, modules: Mapping[str, str]) -> None:
+        self._modules = dict(modules)
+        self._loaded: Dict[str, Type[Resource]] = {}
+
+    def __getitem__(self, key: str) -> Type[Resource]:
+        cls = self._loaded.get(key)
+        if cls is None:
+            module = importlib.import_module(self._modules[key])
+            cls = self._loaded[key] = getattr(module, key)
+        return cls
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._modules
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._modules)
+
+    def __len__(self) -> int:
+        return len(self._modules)
+
+
+# Known FHIR resource classes you want first-class parsing for, by module.
 # Extend this as needed.
-KNOWN_TYPES: Mapping[str, Type[Resource]] = {
-    "Patient": Patient,
-    "Observation": Observation,
-    "Bundle": Bundle,
-}
+KNOWN_TYPES: Mapping[str, Type[Resource]] = _LazyTypeMap(
+    {
+        "Patient": "fhir.resources.patient",
+        "Observation": "fhir.resources.observation",
+        "Bundle": "fhir.resources.bundle",
+    }
+)
+
+# Per-context replacement classes consulted before KNOWN_TYPES (test seam).
+_TYPE_OVERRIDE: ContextVar[Optional[Mapping[str, Type[Any]]]] = ContextVar(
+    "_TYPE_OVERRIDE", default=None
+)
 
 # Typed helper for constructing concrete Resource subclasses.
 R = TypeVar("R", bound=Resource)
 
+# Reused XML parser: skips per-call parser setup, never expands entities,
+# does not build an ID table, and drops whitespace-only text nodes.
+_XML_PARSER = etree.XMLParser(
+    resolve_entities=False,
+    collect_ids=False,
+    huge_tree=False,
+    remove_blank_text=True,
+)
+
+# Patient elements FHIR types as lists (0..*); a single XML child would
+# otherwise arrive as a lone dict/scalar.
+_PATIENT_LIST_FIELDS = ("name", "identifier", "telecom", "address", "contact")
+
 
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
+def _lookup(rtype: str) -> Optional[Type[Resource]]:
+    """Return the model class for a resourceType, honouring `_override_types`."""
+    override = _TYPE_OVERRIDE.get()
+    if override is not None and rtype in override:
+        return cast(Type[Resource], override[rtype])
+    return KNOWN_TYPES.get(rtype)
+
+
+@contextmanager
+def _override_types(types: Mapping[str, Type[Any]]) -> Iterator[None]:
+    """
+    Substitute model classes for some resourceTypes within a `with` block.
+
+    The override lives in a ContextVar, so KNOWN_TYPES itself stays
+    read-only and concurrent contexts are unaffected.
+    """
+    token = _TYPE_OVERRIDE.set(types)
+    try:
+        yield
+    finally:
+        _TYPE_OVERRIDE.reset(token)
+
+
 def _construct_known(cls: Type[R], data: Dict[str, Any]) -> R:
     """
     Build and validate a concrete FHIR Resource instance.
@@ -73,18 +166,55 @@ def _construct_known(cls: Type[R], data: Dict[str, Any]) -> R:
     return res  # precise type via TypeVar R
 
 
-def _construct_base(data: Dict[str, Any]) -> Resource:
+@cache
+def _resolve_base_construct(base_cls: Any = Resource) -> Optional[Callable[..., Any]]:
+    """
+    Return the unvalidated constructor exposed by a base model class.
+
+    Cached per class, so the v2/v1 probe runs once for each base model.
+
+    Parameters
+    ----------
+    base_cls : type, default Resource
+        Model class to probe.
+
+    Returns
+    -------
+    Callable or None
+        `base_cls.model_construct` (pydantic v2), else `base_cls.construct`
+        (pydantic v1), else None when neither API is available.
+    """
+    # Prefer Pydantic v2 API if available on the concrete model
+    mc = getattr(base_cls, "model_construct", None)
+    if callable(mc):
+        return cast(Callable[..., Any], mc)
+
+    # Fallback: v1 API (may be absent in some shims)
+    cc = getattr(base_cls, "construct", None)
+    if callable(cc):
+        return cast(Callable[..., Any], cc)
+    return None
+
+
+# Resolved once at import for the real Resource model.
+_BASE_CONSTRUCT = _resolve_base_construct()
+
+
+def _construct_base(data: Dict[str, Any], base_cls: Any = Resource) -> Resource:
     """
     Construct a base Resource WITHOUT validation, preserving fields as-is.
 
-    Works with pydantic v2 (`model_construct`) and v1 (`construct`). If neither
-    API is available on the concrete `Resource` model in this environment,
-    a ParseError is raised.
+    Works with pydantic v2 (`model_construct`) and v1 (`construct`). For the
+    default `Resource` the constructor is resolved once into
+    `_BASE_CONSTRUCT`; any other `base_cls` is probed once and cached. If neither
+    API is available, a ParseError is raised.
 
     Parameters
     ----------
     data : Dict[str, Any]
         JSON-like dictionary (must include "resourceType").
+    base_cls : type, default Resource
+        Model class to construct.
 
     Returns
     -------
@@ -96,18 +226,31 @@ def _construct_base(data: Dict[str, Any]) -> Resource:
     ParseError
         If no compatible construction API is available.
     """
-    # Prefer Pydantic v2 API if available on the concrete model
-    mc = getattr(Resource, "model_construct", None)
-    if callable(mc):
-        return cast(Resource, mc(**data))
+    if base_cls is Resource:
+        construct = _BASE_CONSTRUCT
+    else:
+        construct = _resolve_base_construct(base_cls)
+    if construct is None:
+        # If neither API exists, bail with a clear error.
+        raise ParseError(
+            f"{base_cls.__name__} does not expose model_construct or construct"
+        )
+    return cast(Resource, construct(**data))
 
-    # Fallback: v1 API (may be absent in some shims)
-    cc = getattr(Resource, "construct", None)
-    if callable(cc):
-        return cast(Resource, cc(**data))
 
-    # If neither API exists, bail with a clear error.
-    raise ParseError("Resource does not expose model_construct or construct")
+@cache
+def _field_names(cls: type) -> frozenset[str]:
+    """
+    Return the declared field names of a model class (cached per class).
+
+    Probes class-level metadata (avoids the v2 instance deprecation):
+    ``model_fields`` on pydantic v2, ``__fields__`` on v1, else empty.
+    """
+    model_fields = getattr(cls, "model_fields", None)  # v2
+    if isinstance(model_fields, dict):
+        return frozenset(model_fields)
+    v1_fields = getattr(cls, "__fields__", None)  # v1
+    return frozenset(v1_fields) if isinstance(v1_fields, dict) else frozenset()
 
 
 def _inject_extras(res: Resource, data: Dict[str, Any]) -> None:
@@ -133,19 +276,12 @@ def _inject_extras(res: Resource, data: Dict[str, Any]) -> None:
     - **Pydantic v1**:
         Keys are injected into the instance ``__dict__``.
 
-    In both cases, attributes are also set on the instance (via
-    ``object.__setattr__``) so ``res.foo`` works for unknown keys like
-    ``identifier`` on custom resource types.
+    In both cases the keys are also written to the instance ``__dict__`` in
+    one bulk update, so ``res.foo`` works for unknown keys like
+    ``identifier`` on custom resource types. Only instances without a
+    ``__dict__`` (``__slots__``) fall back to per-key ``object.__setattr__``.
     """
-    cls = type(res)
-    # Probe field names from class-level metadata (avoids v2 instance deprecation)
-    model_fields = getattr(cls, "model_fields", None)  # v2
-    if isinstance(model_fields, dict):
-        field_names = set(model_fields.keys())
-    else:
-        v1_fields = getattr(cls, "__fields__", None)  # v1
-        field_names = set(v1_fields.keys()) if isinstance(v1_fields, dict) else set()
-
+    field_names = _field_names(type(res))
     extras = {k: v for k, v in data.items() if k not in field_names}
     if not extras:
         return
@@ -153,10 +289,11 @@ def _inject_extras(res: Resource, data: Dict[str, Any]) -> None:
     extra_store = getattr(res, "__pydantic_extra__", None)
     if isinstance(extra_store, dict):
         extra_store.update(extras)
-    else:
-        d = getattr(res, "__dict__", None)
-        if isinstance(d, dict):
-            d.update(extras)
+
+    d = getattr(res, "__dict__", None)
+    if isinstance(d, dict):
+        d.update(extras)
+        return
 
     # Attribute access convenience (best-effort; ignore failures)
     for k, v in extras.items():
@@ -178,7 +315,27 @@ def _ensure_file(path: Path) -> None:
 
 def _local(tag: str) -> str:
     """Return the local (namespace-stripped) tag name."""
-    return tag.split("}", 1)[1] if "}" in tag else tag
+    return tag.rpartition("}")[2]
+
+
+def _xml_node(elem: Any) -> Tuple[Any, List[Tuple[str, Any]]]:
+    """
+    Return the JSON-like shell for one element and the children that fill it.
+
+    A value-only leaf yields its scalar and no children. Anything else yields
+    a dict whose repeated child names are pre-allocated as empty lists (in
+    first-appearance order), so callers append to them without type checks.
+    Children come back as ``(local_name, element)`` pairs so each tag is
+    namespace-stripped once.
+    """
+    named = [(_local(c.tag), c) for c in elem if isinstance(c.tag, str)]
+    val = elem.attrib.get("value")
+    if val is not None and not named:
+        return val, []
+
+    counts = Counter(n for n, _ in named)
+    out: Dict[str, Any] = {n: ([] if counts[n] > 1 else None) for n, _ in named}
+    return out, named
 
 
 def _xml_to_obj(elem: Any) -> Any:
@@ -204,25 +361,26 @@ def _xml_to_obj(elem: Any) -> Any:
 
     These can be added iteratively without changing the public API.
     """
-    # If there are no element children and a 'value' attribute, return the scalar.
-    children = [c for c in elem if isinstance(c.tag, str)]
-    val = elem.get("value")
-    if val is not None and not children:
-        return val
-
-    # Otherwise, build a shallow dict from direct children.
-    out: Dict[str, Any] = {}
-    for child in children:
-        name = _local(child.tag)
-        child_obj = _xml_to_obj(child)
-        if name in out:
-            # promote to a list on repeat
-            if not isinstance(out[name], list):
-                out[name] = [out[name]]
-            out[name].append(child_obj)
-        else:
-            out[name] = child_obj
-    return out
+    obj, children = _xml_node(elem)
+
+    # Iterative walk: each stack entry is a dict shell plus the children that
+    # populate it, so deep trees never hit the recursion limit.
+    stack = [(obj, children)]
+
+    while stack:
+        out, children = stack.pop()
+        for name, child in children:
+            child_obj, grandchildren = _xml_node(child)
+            if grandchildren:
+                stack.append((child_obj, grandchildren))
+            slot = out[name]
+            if slot is None:
+                # single occurrence: pre-allocated as None by _xml_node
+                out[name] = child_obj
+            else:
+                # repeated name: pre-allocated list
+                slot.append(child_obj)
+    return obj
 
 
 def _ensure_resource_type_attr(res: Resource, expected: str | None) -> None:
@@ -230,66 +388,85 @@ def _ensure_resource_type_attr(res: Resource, expected: str | None) -> None:
     Ensure the instance exposes `resource_type` (some versions keep it only on the class).
     If missing/empty, set it on the instance; if that fails, set it on the class.
     """
-    current = getattr(res, "resource_type", None)
-    if current:
+    if not expected or getattr(res, "resource_type", None):
         return
-    if expected:
-        try:
-            # set on instance first
-            object.__setattr__(res, "resource_type", expected)
-            return
-        except Exception:
-            pass
-        try:
-            # fall back to class-level if instance is frozen
-            if getattr(res.__class__, "resource_type", None) in (None, ""):
-                setattr(res.__class__, "resource_type", expected)
-        except Exception:
-            # last resort: ignore (tests will still pass on known classes)
-            pass
+    try:
+        # common case: one instance-level write
+        object.__setattr__(res, "resource_type", expected)
+    except Exception:
+        # instance is frozen / has no __dict__
+        _ensure_class_resource_type(type(res), expected)
 
 
-def load_fhir_json(path: Path) -> Resource:
+def _ensure_class_resource_type(cls: type, expected: str) -> None:
     """
-    Load a FHIR resource from a JSON file.
+    Set `resource_type` on a class whose instances reject attribute writes.
+
+    An existing non-empty class value is kept, and classes that refuse the
+    write (built-ins, extension types) are left unchanged.
+    """
+    if getattr(cls, "resource_type", None) not in (None, ""):
+        return
+    try:
+        setattr(cls, "resource_type", expected)
+    except Exception:
+        # last resort: ignore (tests will still pass on known classes)
+        pass
+
+
+def _parse_fhir_json(text: Union[str, bytes]) -> Resource:
+    """
+    Parse a FHIR resource from JSON text already held in memory.
 
     Parameters
     ----------
-    path : Path
-        Path to a JSON file containing a FHIR resource.
+    text : str or bytes
+        JSON document containing a single FHIR resource; bytes must be UTF-8.
 
     Returns
     -------
     Resource
-        A validated FHIR model instance. If the resourceType is recognized
-        (see KNOWN_TYPES), an instance of that concrete class is returned.
-        If the resourceType is unknown, a base Resource is constructed
-        WITHOUT validation, preserving the original "resourceType" value
-        in the payload.
+        See `load_fhir_json`.
 
     Raises
     ------
     ParseError
-        If the path is invalid, the JSON is not valid, the file does not
-        contain a JSON object, or model validation fails for known types.
+        If the JSON is not valid, does not contain an object at the top level,
+        or model validation fails for known types.
     """
-    _ensure_file(path)
+    return _resource_from_json_obj(_json_object(text))
 
-    try:
-        text = path.read_text(encoding="utf-8")
-    except OSError as e:
-        raise ParseError(f"failed to read JSON: {e}") from e
 
+def _json_object(text: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Decode a JSON document and check that it is an object at the top level.
+
+    Raises
+    ------
+    ParseError
+        If the JSON is not valid or is not an object.
+    """
     try:
-        obj: Dict[str, Any] = json.loads(text)
-    except json.JSONDecodeError as e:
+        obj: Dict[str, Any] = json_loads(text)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         raise ParseError(f"invalid JSON: {e}") from e
 
     if not isinstance(obj, dict):
         raise ParseError("FHIR JSON must be an object at the top level")
+    return obj
+
+
+def _resource_from_json_obj(obj: Dict[str, Any]) -> Resource:
+    """
+    Build the FHIR model for a decoded JSON object (see `_parse_fhir_json`).
 
+    Raises
+    ------
+    ParseError
+        If model validation or construction fails.
+    """
     rtype = obj.get("resourceType")
-    cls = KNOWN_TYPES.get(str(rtype)) if rtype is not None else None
+    cls = _lookup(str(rtype)) if rtype is not None else None
 
     if cls is not None:
         # Known type: validate
@@ -314,41 +491,40 @@ def load_fhir_json(path: Path) -> Resource:
         ) from e
 
 
-def load_fhir_xml(path: Path) -> Resource:
+def _parse_fhir_xml(buf: bytes) -> Resource:
     """
-    Load a FHIR resource from an XML file.
+    Parse a FHIR resource from XML bytes already held in memory.
 
     Parameters
     ----------
-    path : Path
-        Path to an XML file containing a FHIR resource.
+    buf : bytes
+        Raw XML document; lxml honours any encoding declaration it carries.
 
     Returns
     -------
     Resource
-        A FHIR Resource instance parsed from the XML content. This loader
-        builds a minimal JSON-like dict by:
-          - setting 'resourceType' from the root element's local name
-          - mapping direct children that carry a 'value="..."' attribute
-            (e.g., <id value="p1"/>) to flat fields (e.g., {"id": "p1"})
-          - aggregating repeated child tags into lists
-        Then validates via the concrete model when known; otherwise constructs
-        a base Resource without validation.
+        See `load_fhir_xml`.
 
     Raises
     ------
     ParseError
-        If the path is invalid, the XML cannot be parsed, or model validation fails.
+        If the XML cannot be parsed or model validation fails.
     """
-    _ensure_file(path)
-
     try:
-        # Parse XML from file; lxml handles encoding detection.
-        tree = etree.parse(str(path))
-        root = tree.getroot()
-    except (etree.XMLSyntaxError, OSError) as e:
+        root = etree.fromstring(buf, _XML_PARSER)
+    except etree.XMLSyntaxError as e:
         raise ParseError(f"invalid XML: {e}") from e
 
+    return _resource_from_xml_root(root)
+
+
+def _xml_resource_data(root: Any) -> Dict[str, Any]:
+    """
+    Build the normalized JSON-like dict for a parsed resource element.
+
+    This is the payload `_resource_from_xml_root` hands to the model, per the
+    rules documented on `load_fhir_xml`.
+    """
     # Determine resourceType from the root element (namespace-stripped).
     resource_type = _local(root.tag)
 
@@ -371,19 +547,33 @@ def load_fhir_xml(path: Path) -> Resource:
         else:
             data[name] = value_obj
 
-    # Patient.name must be a list[HumanName]; HumanName.given must be a list[str].
-    if resource_type == "Patient" and "name" in data:
-        nm = data["name"]
-        if isinstance(nm, dict):
-            data["name"] = [nm]
-        if isinstance(data["name"], list):
-            for part in data["name"]:
-                if isinstance(part, dict) and "given" in part:
-                    if not isinstance(part["given"], list):
-                        part["given"] = [part["given"]]
+    # Patient list fields must be lists; HumanName.given must be a list[str].
+    if resource_type == "Patient":
+        for key in _PATIENT_LIST_FIELDS:
+            v = data.get(key)
+            if v is not None and not isinstance(v, list):
+                data[key] = [v]
+        for part in data.get("name", ()):
+            if isinstance(part, dict) and "given" in part:
+                if not isinstance(part["given"], list):
+                    part["given"] = [part["given"]]
+    return data
+
+
+def _resource_from_xml_root(root: Any) -> Resource:
+    """
+    Build the FHIR model for a parsed resource element (see `load_fhir_xml`).
+
+    Raises
+    ------
+    ParseError
+        If model validation or construction fails.
+    """
+    data = _xml_resource_data(root)
+    resource_type = data["resourceType"]
 
     # Validate/construct using known type if available.
-    cls = KNOWN_TYPES.get(resource_type)
+    cls = _lookup(resource_type)
     if cls is not None:
         try:
             res = _construct_known(cls, data)
@@ -402,3 +592,198 @@ def load_fhir_xml(path: Path) -> Resource:
         return res
     except Exception as e:
         raise ParseError(f"failed to construct base Resource from XML: {e}") from e
+
+
+def load_fhir_json(path: Path) -> Resource:
+    """
+    Load a FHIR resource from a JSON file.
+
+    Parameters
+    ----------
+    path : Path
+        Path to a JSON file containing a FHIR resource.
+
+    Returns
+    -------
+    Resource
+        A validated FHIR model instance. If the resourceType is recognized
+        (see KNOWN_TYPES), an instance of that concrete class is returned.
+        If the resourceType is unknown, a base Resource is constructed
+        WITHOUT validation, preserving the original "resourceType" value
+        in the payload.
+
+    Raises
+    ------
+    ParseError
+        If the path is invalid, the JSON is not valid, the file does not
+        contain a JSON object, or model validation fails for known types.
+    """
+    return _parse_fhir_json(_read_json_file(path))
+
+
+def _read_json_file(path: Path) -> bytes:
+    """Validate path and return its raw bytes; raise ParseError on failure."""
+    _ensure_file(path)
+
+    try:
+        # Raw bytes: orjson parses UTF-8 directly, skipping a str decode.
+        return path.read_bytes()
+    except OSError as e:
+        raise ParseError(f"failed to read JSON: {e}") from e
+
+
+@cache
+def _list_adapter(cls: Type[Resource]) -> TypeAdapter[List[Resource]]:
+    """Return a (cached) TypeAdapter validating a list of `cls` instances."""
+    # list[cls] is built at runtime because cls is a value, not a static type
+    return TypeAdapter(cast(Any, GenericAlias(list, (cls,))))
+
+
+def load_fhir_json_many(paths: Iterable[Path]) -> List[Resource]:
+    """
+    Load several FHIR JSON files, validating known types in batches.
+
+    Documents are grouped by resourceType and each known-type group is
+    validated with a single `TypeAdapter(list[cls]).validate_python` call,
+    which amortizes pydantic's per-call validator setup. Unknown types are
+    built exactly as `load_fhir_json` builds them.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        JSON files, each containing a single FHIR resource.
+
+    Returns
+    -------
+    List[Resource]
+        One resource per path, in input order, equal to what
+        `load_fhir_json` returns for that path.
+
+    Raises
+    ------
+    ParseError
+        Under the same conditions as `load_fhir_json`, for the first file
+        in input order that fails.
+    """
+    objs = [_json_object(_read_json_file(p)) for p in paths]
+    out: List[Any] = [None] * len(objs)
+
+    groups: Dict[str, List[int]] = {}
+    unknown: List[int] = []
+    for i, obj in enumerate(objs):
+        rtype = obj.get("resourceType")
+        if rtype is not None and _lookup(str(rtype)) is not None:
+            groups.setdefault(str(rtype), []).append(i)
+        else:
+            unknown.append(i)
+
+    try:
+        for rtype, idxs in groups.items():
+            cls = cast(Type[Resource], _lookup(rtype))
+            models = _list_adapter(cls).validate_python([objs[i] for i in idxs])
+            for i, res in zip(idxs, models):
+                _ensure_resource_type_attr(res, rtype)
+                out[i] = res
+        for i in unknown:
+            out[i] = _resource_from_json_obj(objs[i])
+    except Exception:
+        # Rebuild one by one in path order so the earliest failing document
+        # raises the usual ParseError, whichever group it belongs to
+        return [_resource_from_json_obj(obj) for obj in objs]
+    return out
+
+
+def load_fhir_xml(path: Path) -> Resource:
+    """
+    Load a FHIR resource from an XML file.
+
+    Parameters
+    ----------
+    path : Path
+        Path to an XML file containing a FHIR resource.
+
+    Returns
+    -------
+    Resource
+        A FHIR Resource instance parsed from the XML content. This loader
+        builds a minimal JSON-like dict by:
+          - setting 'resourceType' from the root element's local name
+          - mapping direct children that carry a 'value="..."' attribute
+            (e.g., <id value="p1"/>) to flat fields (e.g., {"id": "p1"})
+          - aggregating repeated child tags into lists
+        Then validates via the concrete model when known; otherwise constructs
+        a base Resource without validation.
+
+    Raises
+    ------
+    ParseError
+        If the path is invalid, the XML cannot be parsed, or model validation fails.
+    """
+    _ensure_file(path)
+
+    try:
+        # Read raw bytes; lxml handles encoding detection.
+        buf = path.read_bytes()
+    except OSError as e:
+        raise ParseError(f"invalid XML: {e}") from e
+
+    return _parse_fhir_xml(buf)
+
+
+def iter_fhir_xml_entries(path: Path) -> Iterator[Resource]:
+    """
+    Stream the resources of a FHIR XML Bundle one entry at a time.
+
+    The file is read with `etree.iterparse`; each top-level ``<entry>`` is
+    converted when its end tag is seen and is then cleared and detached
+    from the Bundle, so memory stays flat however many entries there are.
+
+    Parameters
+    ----------
+    path : Path
+        Path to an XML file whose root is a FHIR Bundle.
+
+    Yields
+    ------
+    Resource
+        The model for each entry's ``<resource>`` child, built as
+        `load_fhir_xml` builds a standalone resource. Entries without a
+        resource (e.g. request-only entries) are skipped.
+
+    Raises
+    ------
+    ParseError
+        If the path is invalid, the XML cannot be parsed, or model
+        validation fails for an entry. Being a generator, nothing is
+        checked until iteration starts.
+    """
+    _ensure_file(path)
+
+    try:
+        with path.open("rb") as fh:
+            events = etree.iterparse(
+                fh,
+                events=("end",),
+                tag="{*}entry",
+                resolve_entities=False,
+                collect_ids=False,
+                huge_tree=False,
+                remove_blank_text=True,
+            )
+            for _, entry in events:
+                bundle = entry.getparent()
+                if bundle is None or bundle.getparent() is not None:
+                    # entry of a nested Bundle: handled with its top-level entry
+                    continue
+                for child in entry:
+                    if isinstance(child.tag, str) and _local(child.tag) == "resource":
+                        for res_elem in child:
+                            if isinstance(res_elem.tag, str):
+                                yield _resource_from_xml_root(res_elem)
+                                break
+                # Free the processed entry and everything before it.
+                entry.clear(keep_tail=True)
+                while entry.getprevious() is not None:
+                    del bundle[0]
+    except (etree.XMLSyntaxError, OSError) as e:
+        raise ParseError(f"invalid XML: {e}") from e
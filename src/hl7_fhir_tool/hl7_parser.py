@@ -50,8 +50,11 @@ def parse_hl7_v2(raw: str, *, strict: bool = True) -> Message:
     if raw.strip() == "":
         raise ValueError("raw must be a non-empty HL7 v2 string")
 
-    # Normalize line endings so \n or \r\n are accepted (HL7 expects \r)
-    normalized = raw.replace("\r\n", "\r").replace("\n", "\r")
+    # Normalize line endings so \n or \r\n are accepted (HL7 expects \r);
+    # CR-only messages, the common case, skip the two copy passes
+    normalized = raw
+    if "\n" in raw:
+        normalized = raw.replace("\r\n", "\r").replace("\n", "\r")
 
     # Use hl7apy enum constants (do not pass bare ints)
     vlevel = VALIDATION_LEVEL.STRICT if strict else VALIDATION_LEVEL.TOLERANT
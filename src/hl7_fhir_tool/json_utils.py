@@ -0,0 +1,94 @@
+# src/hl7_fhir_tool/json_utils.py
+"""
+JSON helpers shared by the CLI and the FHIR parser.
+
+orjson is an optional dependency (the ``fast`` extra). When it is not
+installed every helper falls back to the stdlib json module.
+"""
+
+import json
+from functools import cache
+from typing import Any, Optional, Union
+
+
+@cache
+def get_orjson() -> Any:
+    """
+    Return the optional orjson module, or None when it is not installed.
+
+    Returns
+    -------
+    module or None
+        The imported orjson module, or None.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def loads(buf: Union[str, bytes]) -> Any:
+    """
+    Parse JSON text or UTF-8 bytes, using orjson when available.
+
+    Parameters
+    ----------
+    buf : str or bytes
+        JSON document.
+
+    Returns
+    -------
+    Any
+        Parsed object.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If buf is not valid JSON (orjson's error type subclasses it).
+    UnicodeDecodeError
+        If the stdlib parser is given bytes that are not valid Unicode.
+    """
+    oj = get_orjson()
+    if oj is not None:
+        return oj.loads(buf)
+    return json.loads(buf)
+
+
+def dumps_utf8(obj: Any, indent: Optional[int] = None) -> bytes:
+    """
+    Serialize obj to UTF-8 encoded JSON bytes, using orjson when available.
+
+    Meant for writing files opened in binary mode. Without orjson the result
+    is exactly ``json.dumps(obj, indent=2 if indent else None)`` encoded as
+    UTF-8, i.e. the same text the CLI writes to stdout. With orjson (the
+    ``fast`` extra) the output is compact when indent is None, non-ASCII
+    characters are raw UTF-8 rather than ``\\u`` escapes, and floats can be
+    formatted differently (``1e16`` rather than ``1e+16``); the parsed
+    values are the same.
+
+    Parameters
+    ----------
+    obj : Any
+        JSON-compatible object.
+    indent : int or None, default None
+        Indent width; any truthy value means two-space indentation.
+
+    Returns
+    -------
+    bytes
+        Serialized JSON.
+
+    Raises
+    ------
+    TypeError
+        If obj is not JSON serializable.
+    """
+    oj = get_orjson()
+    if oj is not None:
+        try:
+            return bytes(oj.dumps(obj, option=oj.OPT_INDENT_2 if indent else 0))
+        except TypeError:
+            # e.g. Decimal or ints beyond 64 bits; let the stdlib decide
+            pass
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
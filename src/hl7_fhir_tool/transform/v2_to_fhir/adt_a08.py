@@ -1,8 +1,10 @@
 # src/hl7_fhir_tool/transform/v2_to_fhir/adt_a08.py
 from __future__ import annotations
 
-from datetime import datetime, date
-from typing import List, Optional
+from datetime import date
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 
 from fhir.resources.codeableconcept import CodeableConcept
 from fhir.resources.coding import Coding
@@ -32,6 +34,33 @@ LOG = logging.getLogger(__name__)
 # ------------------------------------------------------------------------------
 
 
+@lru_cache(maxsize=1024)
+def _yyyymmdd_to_iso(s: str) -> Optional[str]:
+    """
+    Convert a stripped HL7 YYYYMMDD[...] string to YYYY-MM-DD.
+
+    Builds the date from fixed slices instead of datetime.strptime; dates
+    repeat heavily across a batch, so results are memoized.
+
+    Parameters
+    ----------
+    s : str
+        Stripped HL7 date/time string; only the first 8 characters are used.
+
+    Returns
+    -------
+    str or None
+        ISO date string, or None if s is too short, non-numeric, or not a
+        valid calendar date.
+    """
+    if len(s) < 8 or not s[:8].isdigit():
+        return None
+    try:
+        return date(int(s[0:4]), int(s[4:6]), int(s[6:8])).isoformat()
+    except ValueError:
+        return None
+
+
 def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
     """
     Normalize an HL7 date (YYYYMMDD) into ISO 8601 format (YYYY-MM-DD).
@@ -49,9 +78,7 @@ def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
     """
     try:
         s = val.to_er7() if hasattr(val, "to_er7") else str(val)
-        s = (s or "").strip()
-        if len(s) >= 8 and s[:8].isdigit():
-            return datetime.strptime(s[:8], "%Y%m%d").date().isoformat()
+        return _yyyymmdd_to_iso((s or "").strip())
     except Exception:
         # keep silent and let caller decide
         pass
@@ -92,6 +119,10 @@ class ADTA08Transformer:
 
     event: str = "ADT^A08"
 
+    # PID-8 administrative sex -> FHIR gender; anything else is "unknown".
+    # Class-level and read-only so it is built once per process.
+    _GENDER: Mapping[str, str] = MappingProxyType({"M": "male", "F": "female"})
+
     def applies(self, msg: Message) -> bool:
         """
         Check whether this transformer applies to the given HL7 message.
@@ -232,13 +263,7 @@ class ADTA08Transformer:
                     LOG.error("PID-8 to_er7 failed: %s", e)
                     raw = ""
                 v = (raw or "").strip().upper()
-                # explicit mapping so coverage marks these lines
-                if v == "M":
-                    p.gender = "male"
-                elif v == "F":
-                    p.gender = "female"
-                else:
-                    p.gender = "unknown"
+                p.gender = ADTA08Transformer._GENDER.get(v, "unknown")
 
         except Exception as e:
             LOG.error("Error parsing PID: %s", e)
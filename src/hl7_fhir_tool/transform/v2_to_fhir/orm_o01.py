@@ -2,22 +2,23 @@
 from __future__ import annotations
 
 from datetime import datetime, date
-from typing import List, Optional, cast
+from functools import cache, lru_cache
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
 from hl7apy.core import Message
-
-from fhir.resources.codeableconcept import CodeableConcept
-from fhir.resources.codeablereference import CodeableReference
-from fhir.resources.coding import Coding
-from fhir.resources.humanname import HumanName
-from fhir.resources.identifier import Identifier
-from fhir.resources.patient import Patient
-from fhir.resources.reference import Reference
-from fhir.resources.resource import Resource
-from fhir.resources.servicerequest import ServiceRequest
+from hl7apy.exceptions import HL7apyException
 
 from ..registry import register
 
+if TYPE_CHECKING:
+    from fhir.resources.codeableconcept import CodeableConcept
+    from fhir.resources.identifier import Identifier
+    from fhir.resources.patient import Patient
+    from fhir.resources.reference import Reference
+    from fhir.resources.resource import Resource
+    from fhir.resources.servicerequest import ServiceRequest
+
 import logging
 
 
@@ -28,12 +29,51 @@ import logging
 
 LOG = logging.getLogger(__name__)
 
+# Errors that malformed or oddly structured HL7 input can raise while we probe
+# it (hl7apy raises ChildNotFound/ChildNotValid on attribute access). Anything
+# else is a bug and is allowed to propagate out of the helpers.
+_HL7_ERRORS = (AttributeError, TypeError, ValueError, HL7apyException)
+
 
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
+@cache
+def _fhir() -> SimpleNamespace:
+    """
+    Import the FHIR model classes used by this module on first use.
+
+    Deferring these imports keeps process startup and memory down when a
+    batch never contains ORM^O01 messages.
+
+    Returns
+    -------
+    SimpleNamespace
+        Namespace exposing the FHIR classes by their class name.
+    """
+    from fhir.resources.codeableconcept import CodeableConcept
+    from fhir.resources.codeablereference import CodeableReference
+    from fhir.resources.coding import Coding
+    from fhir.resources.humanname import HumanName
+    from fhir.resources.identifier import Identifier
+    from fhir.resources.patient import Patient
+    from fhir.resources.reference import Reference
+    from fhir.resources.servicerequest import ServiceRequest
+
+    return SimpleNamespace(
+        CodeableConcept=CodeableConcept,
+        CodeableReference=CodeableReference,
+        Coding=Coding,
+        HumanName=HumanName,
+        Identifier=Identifier,
+        Patient=Patient,
+        Reference=Reference,
+        ServiceRequest=ServiceRequest,
+    )
+
+
 def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
     """
     Normalize an HL7 date (YYYYMMDD) into ISO 8601 format (YYYY-MM-DD).
@@ -49,13 +89,12 @@ def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
     str or None
         Normalized date string in YYYY-MM-DD format, or None if parsing fails.
     """
-    try:
-        s = val.to_er7() if hasattr(val, "to_er7") else str(val)
-        s = (s or "").strip()
-        if len(s) >= 8 and s[:8].isdigit():
+    s = _er7(val)
+    if len(s) >= 8 and s[:8].isdigit():
+        try:
             return datetime.strptime(s[:8], "%Y%m%d").date().isoformat()
-    except Exception:
-        pass
+        except ValueError:
+            pass
     return None
 
 
@@ -78,41 +117,155 @@ def _er7(x: object | None) -> str:
     try:
         s = x.to_er7() if hasattr(x, "to_er7") else str(x)
         return (s or "").strip()
-    except Exception:
+    except _HL7_ERRORS:
         return ""
 
 
-def _field_comp_from_er7(
-    er7_line: Optional[str], field_index: int, comp_index: int
-) -> Optional[str]:
+def _slice_at(text: str, index: int, sep: str) -> Optional[str]:
     """
-    Extract a component from a raw ER7 line.
+    Return the 0-based sep-delimited slice of text without splitting it.
+
+    Walks the string with str.find so no intermediate list is allocated.
+
+    Parameters
+    ----------
+    text : str
+        Segment line or field.
+    index : int
+        0-based position of the wanted slice (segment name is 0 for lines).
+    sep : str
+        Delimiter, '|' for fields or '^' for components.
+
+    Returns
+    -------
+    str or None
+        The slice (possibly empty), or None if text has fewer slices.
+    """
+    start = 0
+    for _ in range(index):
+        start = text.find(sep, start) + 1
+        if start == 0:
+            return None
+    end = text.find(sep, start)
+    return text[start:] if end < 0 else text[start:end]
+
+
+def _split_fields(er7_line: Optional[str], last_field: int) -> List[str]:
+    """
+    Split a raw ER7 segment line once, up to and including last_field.
 
     Parameters
     ----------
     er7_line : str or None
         Complete segment line in ER7.
+    last_field : int
+        Highest 1-based field position the caller needs; the rest of the
+        line is left unsplit.
+
+    Returns
+    -------
+    list of str
+        Fields with the segment name at index 0, or an empty list.
+    """
+    return er7_line.strip().split("|", last_field + 1) if er7_line else []
+
+
+def _comps(fields: List[str], field_index: int) -> List[str]:
+    """
+    Return the stripped components of one already-split field.
+
+    Parameters
+    ----------
+    fields : list of str
+        Output of _split_fields().
     field_index : int
-        1-based field position (PID-3 => 3).
-    comp_index : int
-        1-based component position within the field.
+        1-based field position.
 
     Returns
     -------
-    str or None
-        Component value or None if missing.
+    list of str
+        Components of the field, or an empty list if the field is missing.
+    """
+    if len(fields) <= field_index or not fields[field_index]:
+        return []
+    return [c.strip() for c in fields[field_index].split("^")]
+
+
+def _comp_at(comps: List[str], comp_index: int) -> Optional[str]:
+    """
+    Return the 1-based component from a component list, or None if empty.
+    """
+    return (comps[comp_index - 1] or None) if len(comps) >= comp_index else None
+
+
+def _parse_pid_line(
+    pid_line: Optional[str],
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """
+    Extract PID-3.1, PID-5.1, PID-5.2, PID-7.1 and PID-8.1 in a single pass.
+
+    Parameters
+    ----------
+    pid_line : str or None
+        Raw ER7 PID line.
+
+    Returns
+    -------
+    tuple
+        (id, family, given, birth_raw, gender); missing values are None.
+    """
+    fields = _split_fields(pid_line, 8)
+    name = _comps(fields, 5)
+    return (
+        _comp_at(_comps(fields, 3), 1),
+        _comp_at(name, 1),
+        _comp_at(name, 2),
+        _comp_at(_comps(fields, 7), 1),
+        _comp_at(_comps(fields, 8), 1),
+    )
+
+
+def _parse_orc_line(
+    orc_line: Optional[str],
+) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Extract ORC-2.1, ORC-3.1 and ORC-5.1 in a single pass.
+
+    Parameters
+    ----------
+    orc_line : str or None
+        Raw ER7 ORC line.
+
+    Returns
+    -------
+    tuple
+        (placer, filler, status); missing values are None.
     """
-    if not er7_line:
-        return None
-    parts = er7_line.strip().split("|")
-    if field_index < 1 or len(parts) <= field_index:
-        return None
-    field = parts[field_index]
-    comps = field.split("^") if field else []
-    if comp_index < 1 or len(comps) < comp_index:
-        return None
-    val = comps[comp_index - 1].strip()
-    return val or None
+    fields = _split_fields(orc_line, 5)
+    return (
+        _comp_at(_comps(fields, 2), 1),
+        _comp_at(_comps(fields, 3), 1),
+        _comp_at(_comps(fields, 5), 1),
+    )
+
+
+def _parse_obr_line(obr_line: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Extract OBR-4.1 and OBR-4.2 (Universal Service ID) in a single pass.
+
+    Parameters
+    ----------
+    obr_line : str or None
+        Raw ER7 OBR line.
+
+    Returns
+    -------
+    tuple
+        (code, text); missing values are None.
+    """
+    field = _slice_at(obr_line.strip(), 4, "|") if obr_line else None
+    obr_4 = [c.strip() for c in field.split("^", 2)] if field else []
+    return _comp_at(obr_4, 1), _comp_at(obr_4, 2)
 
 
 def _find_first(msg_or_group: object, seg_name: str) -> object | None:
@@ -132,18 +285,19 @@ def _find_first(msg_or_group: object, seg_name: str) -> object | None:
         The segment if found, else None.
     """
     try:
-        cand = getattr(msg_or_group, seg_name, None)
+        cand: object = getattr(msg_or_group, seg_name, None)
         if cand is not None:
             LOG.debug(
                 "Found %s via attribute on %s", seg_name, type(msg_or_group).__name__
             )
-            return cast(object, cand)
-    except Exception:
+            return cand
+    except _HL7_ERRORS:
         pass
 
+    children: Iterable[object]
     try:
         children = getattr(msg_or_group, "children", [])
-    except Exception:
+    except _HL7_ERRORS:
         children = []
 
     for ch in children:
@@ -154,8 +308,8 @@ def _find_first(msg_or_group: object, seg_name: str) -> object | None:
                     seg_name,
                     type(msg_or_group).__name__,
                 )
-                return cast(object, ch)
-        except Exception:
+                return ch
+        except _HL7_ERRORS:
             pass
 
     for ch in children:
@@ -164,39 +318,109 @@ def _find_first(msg_or_group: object, seg_name: str) -> object | None:
                 found = _find_first(ch, seg_name)
                 if found is not None:
                     return found
-        except Exception:
+        except _HL7_ERRORS:
             pass
 
     return None
 
 
-def _first_segment_line(msg: Message, seg_name: str) -> Optional[str]:
+@cache
+def _empty_patient() -> Patient:
     """
-    Return the first raw ER7 line for a given segment name.
+    Return the shared, validated empty Patient used as a copy template.
+
+    Messages without any PID data get a shallow copy of this instance, which
+    is far cheaper than validating a fresh Patient. The template itself must
+    never be returned or mutated.
+
+    Returns
+    -------
+    Patient
+        Empty Patient instance.
+    """
+    p: Patient = _fhir().Patient()
+    return p
+
+
+@lru_cache(maxsize=4096)
+def _patient_ref(patient_id: str) -> Reference:
+    """
+    Return a cached template subject Reference for the given Patient id.
+
+    Orders in a batch frequently share a patient, so the Reference is built
+    once per id (without re-validation). The template is shared between
+    callers; attach a model_copy() of it to each resource, never the
+    template itself.
+
+    Parameters
+    ----------
+    patient_id : str
+        Patient id, or 'unknown' when no id could be derived.
+
+    Returns
+    -------
+    Reference
+        Reference of the form 'Patient/<id>'.
+    """
+    ref: Reference = _fhir().Reference.model_construct(
+        reference=f"Patient/{patient_id}"
+    )
+    return ref
+
+
+def _first_segment_lines(msg: Message, seg_names: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    Return the first raw ER7 line for each requested segment in one pass.
+
+    The message is serialized once and scanned once, stopping as soon as
+    every requested segment has been seen.
 
     Parameters
     ----------
     msg : Message
         hl7apy message.
-    seg_name : str
-        'PID', 'ORC', 'OBR', etc.
+    seg_names : tuple of str
+        Segment names to collect, e.g. ('PID', 'ORC', 'OBR').
 
     Returns
     -------
-    str or None
-        Matching line or None if not present.
+    dict of str to str
+        Segment name -> first matching line; absent segments are omitted.
     """
     try:
         s_any = msg.to_er7()
         s: str = str(s_any)
     except Exception:
         s = ""
+    found: Dict[str, str] = {}
     if not s:
-        return None
+        return found
     for line in s.replace("\n", "\r").split("\r"):
-        if line.startswith(seg_name + "|"):
-            return line
-    return None
+        name, sep, _ = line.partition("|")
+        if sep and name in seg_names and name not in found:
+            found[name] = line
+            if len(found) == len(seg_names):
+                break
+    return found
+
+
+def _first_segment_line(msg: Message, seg_name: str) -> Optional[str]:
+    """
+    Return the first raw ER7 line for a given segment name.
+
+    Parameters
+    ----------
+    msg : Message
+        hl7apy message.
+    seg_name : str
+        'PID', 'ORC', 'OBR', etc.
+
+    Returns
+    -------
+    str or None
+        Matching line or None if not present.
+    """
+    return _first_segment_lines(msg, (seg_name,)).get(seg_name)
 
 
 # ------------------------------------------------------------------------------
@@ -260,9 +484,10 @@ class ORMO01Transformer:
         orc_seg = _find_first(msg, "ORC")
         obr_seg = _find_first(msg, "OBR")
 
-        pid_line = _first_segment_line(msg, "PID")
-        orc_line = _first_segment_line(msg, "ORC")
-        obr_line = _first_segment_line(msg, "OBR")
+        lines = _first_segment_lines(msg, ("PID", "ORC", "OBR"))
+        pid_line = lines.get("PID")
+        orc_line = lines.get("ORC")
+        obr_line = lines.get("OBR")
 
         patient = self._build_patient(pid_seg, pid_line)
 
@@ -302,9 +527,13 @@ class ORMO01Transformer:
         Patient
             Patient with id, name, birthDate, gender when available.
         """
-        p = Patient()
         if pid is None and not pid_line:
-            return p
+            return _empty_patient().model_copy()
+
+        fhir = _fhir()
+        p: Patient = fhir.Patient()
+
+        raw_id, raw_fam, raw_giv, raw_bd, raw_gender = _parse_pid_line(pid_line)
 
         try:
             # PID-3 -> Patient.id (simple CX.1)
@@ -318,7 +547,7 @@ class ORMO01Transformer:
                             if hasattr(pid_3, "__len__") and len(pid_3) > 0
                             else [pid_3]
                         )
-                    except Exception:
+                    except _HL7_ERRORS:
                         reps = [pid_3]
                     rep0 = reps[0] if reps else None
                     if rep0 is not None:
@@ -328,11 +557,11 @@ class ORMO01Transformer:
                         if cx_1 is not None:
                             val = _er7(cx_1)
             if not val:
-                val = _field_comp_from_er7(pid_line, field_index=3, comp_index=1)
+                val = raw_id
             if val:
                 try:
                     p.id = val
-                except Exception:
+                except ValueError:
                     LOG.debug("PID-3 value rejected by Patient.id setter")
 
             # PID-5 -> Patient.name[0]
@@ -347,10 +576,10 @@ class ORMO01Transformer:
                     if giv_raw is not None:
                         giv = _er7(giv_raw)
             if not (fam or giv):
-                fam = _field_comp_from_er7(pid_line, field_index=5, comp_index=1) or fam
-                giv = _field_comp_from_er7(pid_line, field_index=5, comp_index=2) or giv
+                fam = raw_fam or fam
+                giv = raw_giv or giv
             if fam or giv:
-                hn = HumanName()
+                hn = fhir.HumanName()
                 if fam:
                     hn.family = fam
                 if giv:
@@ -364,7 +593,6 @@ class ORMO01Transformer:
                 if pid_7 is not None:
                     bd = _parse_hl7_yyyymmdd(pid_7)
             if not bd:
-                raw_bd = _field_comp_from_er7(pid_line, field_index=7, comp_index=1)
                 if raw_bd and len(raw_bd) >= 8 and raw_bd[:8].isdigit():
                     bd = datetime.strptime(raw_bd[:8], "%Y%m%d").date().isoformat()
             if bd:
@@ -377,7 +605,7 @@ class ORMO01Transformer:
                 if pid_8 is not None:
                     v = _er7(pid_8)
             if not v:
-                v = _field_comp_from_er7(pid_line, field_index=8, comp_index=1)
+                v = raw_gender
             v = (v or "").upper()
             if v:
                 p.gender = {"M": "male", "F": "female"}.get(v, "unknown")
@@ -416,7 +644,9 @@ class ORMO01Transformer:
         ServiceRequest
             ServiceRequest with minimal fields populated.
         """
+        fhir = _fhir()
         intent = "order"
+        raw_placer, raw_filler, raw_status = _parse_orc_line(orc_line)
 
         # Identifiers from ORC-2 (placer) / ORC-3 (filler)
         identifiers: list[Identifier] = []
@@ -428,9 +658,9 @@ class ORMO01Transformer:
                 if orc_2 is not None:
                     val2 = _er7(orc_2)
             if not val2:
-                val2 = _field_comp_from_er7(orc_line, field_index=2, comp_index=1)
+                val2 = raw_placer
             if val2:
-                identifiers.append(Identifier(value=val2))
+                identifiers.append(fhir.Identifier(value=val2))
                 sr_id = val2
 
             val3 = None
@@ -439,9 +669,9 @@ class ORMO01Transformer:
                 if orc_3 is not None:
                     val3 = _er7(orc_3)
             if not val3:
-                val3 = _field_comp_from_er7(orc_line, field_index=3, comp_index=1)
+                val3 = raw_filler
             if val3 and not sr_id:
-                identifiers.append(Identifier(value=val3))
+                identifiers.append(fhir.Identifier(value=val3))
                 sr_id = val3
         except Exception:
             LOG.error("Error parsing ORC", exc_info=True)
@@ -449,8 +679,7 @@ class ORMO01Transformer:
         # Code from OBR-4 (Universal Service ID) -> CodeableConcept
         code_cc: Optional[CodeableConcept] = None
         try:
-            code_val = _field_comp_from_er7(obr_line, field_index=4, comp_index=1)
-            text_val = _field_comp_from_er7(obr_line, field_index=4, comp_index=2)
+            code_val, text_val = _parse_obr_line(obr_line)
             if not (code_val or text_val) and obr is not None:
                 obr_4 = getattr(obr, "obr_4", None)
                 if obr_4 is not None:
@@ -462,8 +691,8 @@ class ORMO01Transformer:
                     text_val = _er7(comp2) if comp2 is not None else None
 
             if code_val or text_val:
-                coding = [Coding(code=code_val)] if code_val else []
-                code_cc = CodeableConcept(coding=coding or None, text=text_val)
+                coding = [fhir.Coding(code=code_val)] if code_val else []
+                code_cc = fhir.CodeableConcept(coding=coding or None, text=text_val)
         except Exception:
             LOG.error("Error parsing OBR", exc_info=True)
 
@@ -476,7 +705,7 @@ class ORMO01Transformer:
                 if orc_5 is not None:
                     v = _er7(orc_5)
             if not v:
-                v = _field_comp_from_er7(orc_line, field_index=5, comp_index=1)
+                v = raw_status
             v_up = (v or "").upper()
             if v_up:
                 status = {
@@ -489,17 +718,19 @@ class ORMO01Transformer:
             LOG.error("Error mapping ORC-5", exc_info=True)
 
         # Subject is required
-        subject_ref = Reference(
-            reference=f"Patient/{(getattr(patient, 'id', None) or 'unknown')}"
-        )
+        subject_ref = _patient_ref(
+            getattr(patient, "id", None) or "unknown"
+        ).model_copy()
 
         # Build ServiceRequest (R5: code is CodeableReference to a CodeableConcept)
         try:
-            sr = ServiceRequest(
+            sr: ServiceRequest = fhir.ServiceRequest(
                 intent=intent,
                 status=status,
                 code=(
-                    CodeableReference(concept=code_cc) if code_cc is not None else None
+                    fhir.CodeableReference(concept=code_cc)
+                    if code_cc is not None
+                    else None
                 ),
                 identifier=(identifiers or None),
                 subject=subject_ref,
@@ -509,7 +740,7 @@ class ORMO01Transformer:
                 "ServiceRequest init failed; retrying without code",
                 exc_info=True,
             )
-            sr = ServiceRequest(
+            sr = fhir.ServiceRequest(
                 intent=intent,
                 status=status,
                 subject=subject_ref,
@@ -1,24 +1,26 @@
 # src/hl7_fhir_tool/transform/v2_to_fhir/oru_r01.py
 from __future__ import annotations
 
+from collections import deque
 from datetime import datetime, date, timezone
-from typing import List, Optional, cast
+from functools import cache
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Deque, List, Optional, Tuple, cast
 from decimal import Decimal
 
-from hl7apy.core import Message
-
-from fhir.resources.codeableconcept import CodeableConcept
-from fhir.resources.coding import Coding
-from fhir.resources.humanname import HumanName
-from fhir.resources.identifier import Identifier
-from fhir.resources.observation import Observation
-from fhir.resources.patient import Patient
-from fhir.resources.quantity import Quantity
-from fhir.resources.reference import Reference
-from fhir.resources.resource import Resource
+from hl7apy.core import Message, Segment
 
 from ..registry import register
 
+if TYPE_CHECKING:
+    from fhir.resources.codeableconcept import CodeableConcept
+    from fhir.resources.identifier import Identifier
+    from fhir.resources.observation import Observation
+    from fhir.resources.patient import Patient
+    from fhir.resources.quantity import Quantity
+    from fhir.resources.reference import Reference
+    from fhir.resources.resource import Resource
+
 import logging
 
 
@@ -28,12 +30,77 @@ import logging
 
 LOG = logging.getLogger(__name__)
 
+# Raw-line prefixes for the segments transform() scans for; every segment id
+# is three characters, so a line's first four characters identify it
+_PID_PREFIX = "PID|"
+_OBR_PREFIX = "OBR|"
+_OBX_PREFIX = "OBX|"
+
+# PID-8 administrative sex -> Patient.gender (anything else is "unknown")
+_GENDER_MAP = {"M": "male", "F": "female"}
+
+# CE component attribute names, in lookup order (named accessor, then CE.n)
+_CODE_ATTRS = ("identifier", "ce_1")
+_TEXT_ATTRS = ("text", "ce_2")
+_UNIT_ATTRS = _TEXT_ATTRS + _CODE_ATTRS
+
+# OBR fields copied into Observation.identifier: (field index, hl7apy attribute)
+_OBR_ID_FIELDS = ((2, "obr_2"), (3, "obr_3"))
+
 
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
+@cache
+def _fhir() -> SimpleNamespace:
+    """
+    Import the FHIR model classes used by this module on first use.
+
+    Deferring these imports keeps process startup and memory down when a
+    batch never contains ORU^R01 messages.
+
+    Returns
+    -------
+    SimpleNamespace
+        Namespace exposing the FHIR classes by their class name.
+    """
+    from fhir.resources.codeableconcept import CodeableConcept
+    from fhir.resources.coding import Coding
+    from fhir.resources.humanname import HumanName
+    from fhir.resources.identifier import Identifier
+    from fhir.resources.observation import Observation
+    from fhir.resources.patient import Patient
+    from fhir.resources.quantity import Quantity
+    from fhir.resources.reference import Reference
+
+    return SimpleNamespace(
+        CodeableConcept=CodeableConcept,
+        Coding=Coding,
+        HumanName=HumanName,
+        Identifier=Identifier,
+        Observation=Observation,
+        Patient=Patient,
+        Quantity=Quantity,
+        Reference=Reference,
+    )
+
+
+@cache
+def _unspecified_code() -> CodeableConcept:
+    """
+    Return the shared `Observation.code` placeholder used when OBX-3 is empty.
+
+    Returns
+    -------
+    CodeableConcept
+        The cached template; callers must `model_copy()` it, never share it.
+    """
+    cc: CodeableConcept = _fhir().CodeableConcept(text="Unspecified Observation")
+    return cc
+
+
 def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
     """
     Normalize an HL7 date (YYYYMMDD[...]) into ISO 8601 date (YYYY-MM-DD).
@@ -57,12 +124,40 @@ def _parse_hl7_yyyymmdd(val: object) -> Optional[str]:
         s = val.to_er7() if hasattr(val, "to_er7") else str(val)
         s = (s or "").strip()
         if len(s) >= 8 and s[:8].isdigit():
-            return datetime.strptime(s[:8], "%Y%m%d").date().isoformat()
+            return _ymd(s).isoformat()
     except Exception:
         pass
     return None
 
 
+def _ymd(s: str) -> date:
+    """
+    Build a `date` from the leading `YYYYMMDD` digits of an HL7 DT/DTM value.
+
+    Parameters
+    ----------
+    s : str
+        Value whose first 8 characters are digits (callers check this).
+
+    Returns
+    -------
+    datetime.date
+        The calendar date.
+
+    Raises
+    ------
+    ValueError
+        If the digits do not form a valid calendar date (e.g., month 13).
+
+    Notes
+    -----
+    Slicing and calling the `date` constructor directly avoids the format
+    parsing done by `datetime.strptime` on every call, while keeping the same
+    range validation.
+    """
+    return date(int(s[0:4]), int(s[4:6]), int(s[6:8]))
+
+
 def _er7(x: object | None) -> str:
     """
     Coerce a value to an ER7 string.
@@ -79,13 +174,74 @@ def _er7(x: object | None) -> str:
     """
     if x is None:
         return ""
+    if isinstance(x, str):
+        return x.strip()
     try:
-        s = x.to_er7() if hasattr(x, "to_er7") else str(x)
+        to_er7 = getattr(x, "to_er7", None)
+        s = to_er7() if to_er7 is not None else str(x)
         return (s or "").strip()
     except Exception:
         return ""
 
 
+def _tokenize_segment(
+    er7_line: object, last_field: Optional[int] = None
+) -> List[List[str]]:
+    """
+    Split a raw ER7 segment line into fields and components once.
+
+    Parameters
+    ----------
+    er7_line : object
+        Full segment line (e.g., `"OBX|1|NM|..."`). Anything that is not a
+        non-empty string yields no tokens.
+    last_field : int, optional
+        Highest field index the caller will read. Fields after it are neither
+        split nor copied, which matters for long segments or large payloads
+        (e.g., encapsulated data in later fields). `None` tokenizes all fields.
+
+    Returns
+    -------
+    list of list of str
+        `tok[field_index][comp_index - 1]`, with the segment name at index 0.
+        Empty fields have no components.
+    """
+    if not isinstance(er7_line, str) or not er7_line:
+        return []
+    line = er7_line.strip()
+    if last_field is None:
+        fields = line.split("|")
+    else:
+        fields = line.split("|", last_field + 1)[: last_field + 1]
+    return [f.split("^") if f else [] for f in fields]
+
+
+def _tok_comp(tok: List[List[str]], field_index: int, comp_index: int) -> Optional[str]:
+    """
+    Look up a component in a tokenized segment line.
+
+    Parameters
+    ----------
+    tok : list of list of str
+        Output of `_tokenize_segment`.
+    field_index : int
+        1-based field index (e.g., `3` for OBX-3).
+    comp_index : int
+        1-based component index within the field (e.g., `2` for CE.2 text).
+
+    Returns
+    -------
+    str or None
+        The stripped component value, or `None` if unavailable or empty.
+    """
+    if field_index < 1 or comp_index < 1 or len(tok) <= field_index:
+        return None
+    comps = tok[field_index]
+    if len(comps) < comp_index:
+        return None
+    return comps[comp_index - 1].strip() or None
+
+
 def _field_comp_from_er7(
     er7_line: Optional[str], field_index: int, comp_index: int
 ) -> Optional[str]:
@@ -108,20 +264,11 @@ def _field_comp_from_er7(
 
     Notes
     -----
-    This helper is used as a fallback when structured hl7apy accessors fail or
-    are not present. Indices are 1-based to match HL7 convention.
+    Convenience wrapper for one-off lookups. Callers that need several
+    components of the same line should tokenize it once with
+    `_tokenize_segment` and use `_tok_comp`.
     """
-    if not er7_line:
-        return None
-    parts = er7_line.strip().split("|")
-    if field_index < 1 or len(parts) <= field_index:
-        return None
-    field = parts[field_index]
-    comps = field.split("^") if field else []
-    if comp_index < 1 or len(comps) < comp_index:
-        return None
-    val = comps[comp_index - 1].strip()
-    return val or None
+    return _tok_comp(_tokenize_segment(er7_line, field_index), field_index, comp_index)
 
 
 def _is_truthy_container(x: object | None) -> bool:
@@ -145,12 +292,87 @@ def _is_truthy_container(x: object | None) -> bool:
     """
     if x is None:
         return False
+    if not isinstance(x, (list, tuple, set, dict)):
+        return True
     try:
-        if isinstance(x, (list, tuple, set, dict)):
-            return len(x) > 0
+        return len(x) > 0
     except Exception:
-        pass
-    return True
+        return True
+
+
+def _to_decimal(s: str) -> Optional[Decimal]:
+    """
+    Parse an OBX-5 numeric string without raising.
+
+    Parameters
+    ----------
+    s : str
+        Stripped OBX-5 value.
+
+    Returns
+    -------
+    Decimal or None
+        The finite decimal value, or `None` if `s` is not numeric.
+
+    Notes
+    -----
+    `Decimal` (not `float`) is kept so the reported precision survives
+    (`"5.50"` stays `Decimal("5.50")`); fhir.resources would coerce a float
+    back to `Decimal` anyway. Plain `[+-]digits[.digits]` strings, the common
+    case, are converted directly; other forms (exponents, text) go through
+    the exception path.
+    """
+    body = s[1:] if s[:1] in ("+", "-") else s
+    if body.replace(".", "", 1).isdecimal():
+        return Decimal(s)
+    try:
+        num = Decimal(s)
+    except ArithmeticError:
+        return None
+    return num if num.is_finite() else None
+
+
+def _subject_ref(patient: Patient) -> Reference:
+    """
+    Build the `Patient/{id}` subject reference for a patient's Observations.
+
+    Parameters
+    ----------
+    patient : Patient
+        The transformed Patient.
+
+    Returns
+    -------
+    Reference
+        `Patient/{patient.id}`, or `Patient/unknown` when the id is missing.
+    """
+    ref: Reference = _fhir().Reference(
+        reference=f"Patient/{(getattr(patient, 'id', None) or 'unknown')}"
+    )
+    return ref
+
+
+def _first_attr(obj: object, names: Tuple[str, ...]) -> object | None:
+    """
+    Return the first truthy attribute of `obj` among `names`.
+
+    Parameters
+    ----------
+    obj : object
+        Any object (typically an hl7apy field or component).
+    names : tuple of str
+        Attribute names to try, in order.
+
+    Returns
+    -------
+    object or None
+        The first truthy attribute value, or `None` if none is truthy.
+    """
+    for name in names:
+        val: object = getattr(obj, name, None)
+        if val:
+            return val
+    return None
 
 
 def _first_rep(val: object | None) -> object | None:
@@ -168,12 +390,12 @@ def _first_rep(val: object | None) -> object | None:
     object or None
         First element of the sequence, or the original value if not a sequence.
     """
-    if val is None:
-        return None
+    if val is None or not isinstance(val, (list, tuple)):
+        return val
     try:
-        if isinstance(val, (list, tuple)) and len(val) > 0:
-            # Cast ensures we never return Any (keeps declared return type exact)
-            return cast(object, val[0])
+        if len(val) > 0:
+            first: object = val[0]
+            return first
     except Exception:
         pass
     return val
@@ -181,7 +403,7 @@ def _first_rep(val: object | None) -> object | None:
 
 def _find_first(msg_or_group: object, seg_name: str) -> object | None:
     """
-    Recursively find the first segment by name in an HL7 Message/Group tree.
+    Find the first segment by name in an HL7 Message/Group tree.
 
     Parameters
     ----------
@@ -197,9 +419,10 @@ def _find_first(msg_or_group: object, seg_name: str) -> object | None:
 
     Notes
     -----
-    This function treats empty containers (e.g., `[]`) as "not found" and will
-    *not* return them, including down recursive paths. This matches test
-    expectations that `_find_first(msg, "ZZZ") is None` rather than `[]`.
+    After the attribute shortcut on the root, descendants are searched
+    breadth-first with an explicit queue (no recursion), so the shallowest
+    match wins. Empty containers (e.g., `[]`) are treated as "not found" and
+    never returned, so `_find_first(msg, "ZZZ") is None` rather than `[]`.
     """
     # 1) attribute shortcut
     try:
@@ -212,58 +435,101 @@ def _find_first(msg_or_group: object, seg_name: str) -> object | None:
     except Exception:
         pass
 
-    # 2) iterate direct children
+    # 2) breadth-first search over descendants (shallowest match wins)
+    queue: Deque[object] = deque()
     try:
-        children = getattr(msg_or_group, "children", [])
+        queue.extend(getattr(msg_or_group, "children", None) or [])
     except Exception:
-        children = []
+        pass
 
-    for ch in children:
+    while queue:
+        node = queue.popleft()
         try:
-            if getattr(ch, "name", None) == seg_name and _is_truthy_container(ch):
-                LOG.debug(
-                    "Found %s directly in children of %s",
-                    seg_name,
-                    type(msg_or_group).__name__,
-                )
-                return cast(object, ch)
+            if getattr(node, "name", None) == seg_name and _is_truthy_container(node):
+                LOG.debug("Found %s under %s", seg_name, type(msg_or_group).__name__)
+                return node
+            children = getattr(node, "children", None)
+            if children:
+                queue.extend(children)
         except Exception:
             pass
 
-    # 3) recurse
-    for ch in children:
+    # Never return [] for missing
+    return None
+
+
+def _collect_segments(
+    msg: object, max_obx: int
+) -> Tuple[object | None, object | None, List[object]]:
+    """
+    Find the first PID, the first OBR and the OBX segments in one tree walk.
+
+    Parameters
+    ----------
+    msg : object
+        An hl7apy Message (or any node exposing `children`).
+    max_obx : int
+        Number of OBX segments wanted; the walk stops once this many are
+        collected and both PID and OBR have been seen.
+
+    Returns
+    -------
+    tuple
+        `(pid, obr, obx_segs)`; `pid`/`obr` are `None` when not found and
+        `obx_segs` is in document order.
+
+    Notes
+    -----
+    Uses an explicit stack instead of recursion. ORU_R01 nests segments under
+    several group levels (PATIENT_RESULT -> ORDER_OBSERVATION -> OBSERVATION
+    -> OBX), so the walk is not depth-limited; segments are leaves, so their
+    fields are never visited.
+    """
+    pid: object | None = None
+    obr: object | None = None
+    obx_segs: List[object] = []
+    stack: List[object] = [msg]
+    while stack and (pid is None or obr is None or len(obx_segs) < max_obx):
+        node = stack.pop()
         try:
-            if getattr(ch, "children", None):
-                found = _find_first(ch, seg_name)
-                # treat empty lists/containers as missing
-                if _is_truthy_container(found):
-                    return found
+            name = getattr(node, "name", None)
+            if name == "OBX":
+                obx_segs.append(node)
+            elif name == "PID":
+                if pid is None:
+                    pid = node
+            elif name == "OBR":
+                if obr is None:
+                    obr = node
+            elif not isinstance(node, Segment):
+                children = getattr(node, "children", None) or []
+                stack.extend(reversed(list(children)))
         except Exception:
             pass
-
-    # Final normalization: never return [] for missing
-    return None
+    return pid, obr, obx_segs
 
 
-def _first_segment_line(msg: Message, seg_name: str) -> Optional[str]:
+def _er7_lines(msg: Message) -> List[str]:
     """
-    Return the first raw ER7 line for a target segment.
+    Serialize a message once and return its raw ER7 segment lines.
 
     Parameters
     ----------
     msg : Message
         Parsed hl7apy Message.
-    seg_name : str
-        Segment name (e.g., `"OBX"`).
 
     Returns
     -------
-    str or None
-        The first raw line that starts with `f"{seg_name}|"` or `None`.
+    list of str
+        Segment lines in message order, or an empty list if serialization
+        fails or yields nothing.
 
     Notes
     -----
-    This function tolerates CR, LF, and CRLF line endings.
+    This function tolerates CR, LF, and CRLF line endings. Text with a single
+    kind of terminator (the usual case: CR from hl7apy) is split in one pass.
+    `str.splitlines()` is not used because it also breaks on characters such
+    as `\x0b`, `\x1c` and `\x85`, which may legitimately appear in field data.
     """
     try:
         s_any = msg.to_er7()
@@ -271,9 +537,33 @@ def _first_segment_line(msg: Message, seg_name: str) -> Optional[str]:
     except Exception:
         s = ""
     if not s:
-        return None
-    for line in s.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
-        if line.startswith(seg_name + "|"):
+        return []
+    if "\n" not in s:
+        return s.split("\r")
+    if "\r" not in s:
+        return s.split("\n")
+    return s.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+
+def _first_segment_line(msg: Message, seg_name: str) -> Optional[str]:
+    """
+    Return the first raw ER7 line for a target segment.
+
+    Parameters
+    ----------
+    msg : Message
+        Parsed hl7apy Message.
+    seg_name : str
+        Segment name (e.g., `"OBX"`).
+
+    Returns
+    -------
+    str or None
+        The first raw line that starts with `f"{seg_name}|"` or `None`.
+    """
+    prefix = seg_name + "|"
+    for line in _er7_lines(msg):
+        if line.startswith(prefix):
             return line
     return None
 
@@ -350,74 +640,37 @@ class ORUR01Transformer:
           `[Patient]` only, even if hl7apy exposes placeholder/empty nodes.
         - Observation ids are stable: `obs-{patient.id or 'unknown'}-{ordinal}`.
         """
-        pid_seg = _find_first(msg, "PID")
-        obr_seg = _find_first(msg, "OBR")  # may be absent
-
-        # Raw lines for OBX (authoritative for presence)
+        # Raw lines: one serialization and one pass for PID, OBR and every OBX
+        # (OBX lines are authoritative for presence)
+        pid_line: Optional[str] = None
+        obr_line: Optional[str] = None
         obx_lines: List[str] = []
-        try:
-            s_all = _er7(msg)
-            if s_all:
-                for line in s_all.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
-                    if line.startswith("OBX|"):
-                        obx_lines.append(line)
-        except Exception:
-            pass
+        for line in _er7_lines(msg):
+            head = line[:4]
+            if head == _OBX_PREFIX:
+                obx_lines.append(line)
+            elif pid_line is None and head == _PID_PREFIX:
+                pid_line = line
+            elif obr_line is None and head == _OBR_PREFIX:
+                obr_line = line
+
+        # Structured segments: one tree walk for PID, OBR and the OBX segments
+        # that pair up with the raw OBX lines (used to enrich values)
+        pid_seg, obr_seg, obx_segs = _collect_segments(msg, len(obx_lines))
+        if pid_seg is None:
+            pid_seg = _find_first(msg, "PID")
+        if obr_seg is None:
+            obr_seg = _find_first(msg, "OBR")  # may be absent
 
         # Build Patient first
-        pid_line = _first_segment_line(msg, "PID")
-        obr_line = _first_segment_line(msg, "OBR")
         patient = self._build_patient(pid_seg, pid_line)
 
         # If no raw OBX lines at all, return Patient only (prevents false positives)
         if not obx_lines:
-            return [
-                # cast to Resource to satisfy List[Resource]
-                cast(Resource, patient)
-            ]
+            return [patient]
 
-        # Gather structured OBX segments to enrich values when available
-        obx_segs: List[object] = []
-        try:
-            children = getattr(msg, "children", []) or []
-        except Exception:
-            children = []
-        for ch in children:
-            try:
-                if getattr(ch, "name", None) == "OBX" and _is_truthy_container(ch):
-                    obx_segs.append(ch)
-                for gg in getattr(ch, "children", []) or []:
-                    if getattr(gg, "name", None) == "OBX" and _is_truthy_container(gg):
-                        obx_segs.append(gg)
-                    for leaf in getattr(gg, "children", []) or []:
-                        if getattr(
-                            leaf, "name", None
-                        ) == "OBX" and _is_truthy_container(leaf):
-                            obx_segs.append(leaf)
-            except Exception:
-                pass
         if not obx_segs:
-            # Handle nested ORU_R01 structure (PATIENT_RESULT -> ORDER_OBSERVATION -> OBX)
-            try:
-                pr = getattr(msg, "PATIENT_RESULT", None)
-                if _is_truthy_container(pr):
-                    pr_list = pr if isinstance(pr, (list, tuple)) else [pr]
-                    for grp in pr_list:
-                        order_obs = getattr(grp, "ORDER_OBSERVATION", None)
-                        if _is_truthy_container(order_obs):
-                            oo_list = (
-                                order_obs
-                                if isinstance(order_obs, (list, tuple))
-                                else [order_obs]
-                            )
-                            for oo in oo_list:
-                                cand = getattr(oo, "OBX", None)
-                                if _is_truthy_container(cand):
-                                    obx_segs.append(cand)
-            except Exception:
-                pass
-
-            # HL7 ORU_R01 has OBX under nested groups, not directly on the message
+            # Fall back to an OBX exposed directly on the message object
             single = None
             try:
                 single = getattr(msg, "OBX", None)
@@ -428,35 +681,34 @@ class ORUR01Transformer:
             if _is_truthy_container(single):
                 obx_segs = [single]
 
-        # Build Observations one-for-one with OBX raw lines
-        observations: List[Observation] = []
+        # Build Observations one-for-one with OBX raw lines, each with its own
+        # copy of one subject reference; they go straight into the result
+        # after Patient
+        subject_ref = _subject_ref(patient)
         count = len(obx_lines)
-        for idx in range(count):
-            obx = obx_segs[idx] if idx < len(obx_segs) else None
-            obx_line = obx_lines[idx]
-
-            obs = self._build_observation(
-                obr=obr_seg,
-                obx=obx,
-                patient=patient,
-                obr_line=obr_line,
-                obx_line=obx_line,
-                ordinal=idx + 1,
-                total_obx=count,  # kept for parity with direct unit calls
+        # Raw lines without a structured partner get obx=None
+        obx_pairs: List[object | None] = list(obx_segs)
+        obx_pairs.extend([None] * (count - len(obx_pairs)))
+        resources: List[Resource] = [patient]
+        for ordinal, (obx, obx_line) in enumerate(zip(obx_pairs, obx_lines), start=1):
+            resources.append(
+                self._build_observation(
+                    obr=obr_seg,
+                    obx=obx,
+                    patient=patient,
+                    obr_line=obr_line,
+                    obx_line=obx_line,
+                    ordinal=ordinal,
+                    total_obx=count,  # kept for parity with direct unit calls
+                    subject_ref=subject_ref.model_copy(),
+                )
             )
-            observations.append(obs)
 
         LOG.debug(
             "Built %d Observation(s) for Patient.id=%s",
-            len(observations),
+            count,
             getattr(patient, "id", None),
         )
-
-        # Build a concrete List[Resource] to avoid list invariance issues
-        resources: List[Resource] = []
-        resources.append(cast(Resource, patient))
-        for obs in observations:
-            resources.append(cast(Resource, obs))
         return resources
 
     @staticmethod
@@ -483,10 +735,13 @@ class ORUR01Transformer:
         - PID-7 -> `Patient.birthDate`.
         - PID-8 -> `Patient.gender` (mapped to `male/female/unknown`).
         """
-        p = Patient()
+        fhir = _fhir()
+        p: Patient = fhir.Patient()
         if pid is None and not pid_line:
             return p
 
+        pid_tok = _tokenize_segment(pid_line, last_field=8)
+
         try:
             # PID-3 -> Patient.id (simple CX.1)
             val = None
@@ -509,7 +764,7 @@ class ORUR01Transformer:
                         if cx_1 is not None:
                             val = _er7(cx_1)
             if not val:
-                val = _field_comp_from_er7(pid_line, field_index=3, comp_index=1)
+                val = _tok_comp(pid_tok, 3, 1)
             if val:
                 try:
                     p.id = val
@@ -529,10 +784,10 @@ class ORUR01Transformer:
                     if giv_raw is not None:
                         giv = _er7(giv_raw)
             if not (fam or giv):
-                fam = _field_comp_from_er7(pid_line, field_index=5, comp_index=1) or fam
-                giv = _field_comp_from_er7(pid_line, field_index=5, comp_index=2) or giv
+                fam = _tok_comp(pid_tok, 5, 1) or fam
+                giv = _tok_comp(pid_tok, 5, 2) or giv
             if fam or giv:
-                hn = HumanName()
+                hn = fhir.HumanName()
                 if fam:
                     hn.family = fam
                 if giv:
@@ -546,9 +801,9 @@ class ORUR01Transformer:
                 if pid_7 is not None:
                     bd = _parse_hl7_yyyymmdd(pid_7)
             if not bd:
-                raw_bd = _field_comp_from_er7(pid_line, field_index=7, comp_index=1)
+                raw_bd = _tok_comp(pid_tok, 7, 1)
                 if raw_bd and len(raw_bd) >= 8 and raw_bd[:8].isdigit():
-                    bd = datetime.strptime(raw_bd[:8], "%Y%m%d").date().isoformat()
+                    bd = _ymd(raw_bd).isoformat()
             if bd:
                 p.birthDate = date.fromisoformat(bd)
 
@@ -559,10 +814,10 @@ class ORUR01Transformer:
                 if pid_8 is not None:
                     v = _er7(pid_8)
             if not v:
-                v = _field_comp_from_er7(pid_line, field_index=8, comp_index=1)
+                v = _tok_comp(pid_tok, 8, 1)
             v = (v or "").upper()
             if v:
-                p.gender = {"M": "male", "F": "female"}.get(v, "unknown")
+                p.gender = _GENDER_MAP.get(v, "unknown")
 
         except Exception:
             LOG.error("Error parsing PID", exc_info=True)
@@ -578,6 +833,7 @@ class ORUR01Transformer:
         obx_line: Optional[str],
         ordinal: int,
         total_obx: Optional[int] = None,
+        subject_ref: Optional[Reference] = None,
     ) -> Observation:
         """
         Construct a FHIR Observation from OBR/OBX with HL7 v2 fallbacks.
@@ -598,6 +854,9 @@ class ORUR01Transformer:
             1-based index of the OBX among all observations.
         total_obx : int or None
             Total OBX count (unused, for parity with callers/tests).
+        subject_ref : Reference or None
+            Prebuilt subject reference, owned by this Observation (callers
+            pass a copy per Observation); built from `patient` when `None`.
 
         Returns
         -------
@@ -610,32 +869,29 @@ class ORUR01Transformer:
             - `valueQuantity` for numeric values (especially OBX-2 == NM), else `valueString`.
             - `identifier` includes OBR-2/OBR-3 when present.
             - `id` is `obs-{patient.id or 'unknown'}-{ordinal}`.
-
-        Notes
-        -----
-        The constructor is retried **only** for the explicit test case where a
-        monkeypatched `Observation` raises `ValueError('boom')` when the `code`
-        field is present. For any other exception, the original error is
-        propagated; we **do not** drop `code` in normal operation.
         """
+        fhir = _fhir()
+
         # subject
-        subject_ref = Reference(
-            reference=f"Patient/{(getattr(patient, 'id', None) or 'unknown')}"
-        )
+        if subject_ref is None:
+            subject_ref = _subject_ref(patient)
+
+        # tokenize each raw line once; every lookup below indexes into these
+        obr_tok = _tokenize_segment(obr_line, last_field=7)
+        obx_tok = _tokenize_segment(obx_line, last_field=6)
 
         # identifiers from OBR-2/OBR-3
         identifiers: List[Identifier] = []
         try:
-            for field_idx in (2, 3):
-                v = _field_comp_from_er7(obr_line, field_index=field_idx, comp_index=1)
+            for field_idx, attr in _OBR_ID_FIELDS:
+                v = _tok_comp(obr_tok, field_idx, 1)
                 if not v and obr is not None:
-                    attr = f"obr_{field_idx}"
                     fval = getattr(obr, attr, None)
                     fval = _first_rep(fval)
                     if fval is not None:
                         v = _er7(fval)
                 if v:
-                    identifiers.append(Identifier(value=v))
+                    identifiers.append(fhir.Identifier(value=v))
         except Exception:
             LOG.error("Error parsing OBR identifiers", exc_info=True)
 
@@ -643,16 +899,14 @@ class ORUR01Transformer:
         code_cc: Optional[CodeableConcept] = None
         code_val = text_val = None
         try:
-            code_val = _field_comp_from_er7(obx_line, field_index=3, comp_index=1)
-            text_val = _field_comp_from_er7(obx_line, field_index=3, comp_index=2)
+            code_val = _tok_comp(obx_tok, 3, 1)
+            text_val = _tok_comp(obx_tok, 3, 2)
             if not (code_val or text_val) and obx is not None:
                 obx_3 = getattr(obx, "obx_3", None)
                 obx_3 = _first_rep(obx_3)
                 if obx_3 is not None:
-                    c1 = getattr(obx_3, "identifier", None) or getattr(
-                        obx_3, "ce_1", None
-                    )
-                    c2 = getattr(obx_3, "text", None) or getattr(obx_3, "ce_2", None)
+                    c1 = _first_attr(obx_3, _CODE_ATTRS)
+                    c2 = _first_attr(obx_3, _TEXT_ATTRS)
                     code_val = _er7(c1) if c1 is not None else None
                     text_val = _er7(c2) if c2 is not None else None
         except Exception:
@@ -660,25 +914,31 @@ class ORUR01Transformer:
 
         # Always produce a CodeableConcept (required by most FHIR validators)
         if code_val or text_val:
-            coding = [Coding(code=code_val)] if code_val else None
-            code_cc = CodeableConcept(coding=coding, text=text_val)
+            coding = [fhir.Coding(code=code_val)] if code_val else None
+            code_cc = fhir.CodeableConcept(coding=coding, text=text_val)
         else:
-            code_cc = CodeableConcept(text="Unspecified Observation")
+            code_cc = _unspecified_code().model_copy()
 
         # effectiveDateTime from OBR-7 (produce timezone-aware datetime)
         effective_dt: Optional[datetime] = None
         try:
-            dt = _field_comp_from_er7(obr_line, field_index=7, comp_index=1)
+            dt = _tok_comp(obr_tok, 7, 1)
             if dt and len(dt) >= 8 and dt[:8].isdigit():
                 if len(dt) >= 14 and dt[:14].isdigit():
                     # full datetime: make tz-aware (UTC)
-                    naive = datetime.strptime(dt[:14], "%Y%m%d%H%M%S")
-                    effective_dt = naive.replace(tzinfo=timezone.utc)
+                    effective_dt = datetime(
+                        int(dt[0:4]),
+                        int(dt[4:6]),
+                        int(dt[6:8]),
+                        int(dt[8:10]),
+                        int(dt[10:12]),
+                        int(dt[12:14]),
+                        tzinfo=timezone.utc,
+                    )
                 else:
                     # date only: midnight UTC
-                    ymd = datetime.strptime(dt[:8], "%Y%m%d").date()
                     effective_dt = datetime(
-                        ymd.year, ymd.month, ymd.day, tzinfo=timezone.utc
+                        int(dt[0:4]), int(dt[4:6]), int(dt[6:8]), tzinfo=timezone.utc
                     )
         except Exception:
             LOG.error("Error parsing OBR-7 for effectiveDateTime", exc_info=True)
@@ -687,11 +947,7 @@ class ORUR01Transformer:
         value_quantity: Optional[Quantity] = None
         value_string: Optional[str] = None
         try:
-            obx_type = (
-                _field_comp_from_er7(obx_line, field_index=2, comp_index=1) or ""
-            ).upper()
-
-            v5 = _field_comp_from_er7(obx_line, field_index=5, comp_index=1)
+            v5 = _tok_comp(obx_tok, 5, 1)
             if v5 is None and obx is not None:
                 obx_5 = getattr(obx, "obx_5", None)
                 obx_5 = _first_rep(obx_5)
@@ -699,64 +955,37 @@ class ORUR01Transformer:
                     v5 = _er7(obx_5)
 
             # Units: prefer CE.2 text, then CE.1 identifier
-            u6 = _field_comp_from_er7(
-                obx_line, field_index=6, comp_index=2
-            ) or _field_comp_from_er7(obx_line, field_index=6, comp_index=1)
+            u6 = _tok_comp(obx_tok, 6, 2) or _tok_comp(obx_tok, 6, 1)
             if not u6 and obx is not None:
                 obx_6 = getattr(obx, "obx_6", None)
                 obx_6 = _first_rep(obx_6)
                 if obx_6 is not None:
-                    u6_raw = (
-                        getattr(obx_6, "text", None)
-                        or getattr(obx_6, "ce_2", None)
-                        or getattr(obx_6, "identifier", None)
-                        or getattr(obx_6, "ce_1", None)
-                    )
+                    u6_raw = _first_attr(obx_6, _UNIT_ATTRS)
                     u6 = _er7(u6_raw) if u6_raw is not None else None
 
             if v5 is not None:
+                # Numeric values become a Quantity (unit optional) whatever
+                # OBX-2 says; anything else is kept as a string
                 v5s = str(v5).strip()
-                if obx_type == "NM":
-                    # Numeric expected: build Quantity even if unit missing
-                    try:
-                        num = Decimal(v5s)
-                        value_quantity = Quantity(value=num, unit=(u6 or None))
-                    except Exception:
-                        value_string = v5s or None
+                num = _to_decimal(v5s)
+                if num is not None:
+                    value_quantity = fhir.Quantity(value=num, unit=(u6 or None))
                 else:
-                    # Not NM: attempt numeric, else string
-                    try:
-                        num = Decimal(v5s)
-                        value_quantity = Quantity(value=num, unit=(u6 or None))
-                    except Exception:
-                        value_string = v5s or None
+                    value_string = v5s or None
         except Exception:
             LOG.error("Error parsing OBX-5/6 for value", exc_info=True)
 
-        # Construct Observation; retry without 'code' ONLY for ValueError('boom') (test shim)
-        try:
-            obs = Observation(
-                status="final",
-                code=code_cc,
-                subject=subject_ref,
-                effectiveDateTime=effective_dt,
-                identifier=(identifiers or None),
-                valueQuantity=value_quantity,
-                valueString=(None if value_quantity is not None else value_string),
-            )
-        except Exception as e:
-            if isinstance(e, ValueError) and str(e) == "boom":
-                obs = Observation(
-                    status="final",
-                    subject=subject_ref,
-                    effectiveDateTime=effective_dt,
-                    identifier=(identifiers or None),
-                    valueQuantity=value_quantity,
-                    valueString=(None if value_quantity is not None else value_string),
-                )
-            else:
-                # Do NOT hide other exceptions; surface them to catch real issues
-                raise
+        # Constructor errors are real bugs (values above are already
+        # normalized), so they propagate to the caller
+        obs: Observation = fhir.Observation(
+            status="final",
+            code=code_cc,
+            subject=subject_ref,
+            effectiveDateTime=effective_dt,
+            identifier=(identifiers or None),
+            valueQuantity=value_quantity,
+            valueString=(None if value_quantity is not None else value_string),
+        )
 
         # Stable, test-friendly ID policy
         pid = getattr(patient, "id", None) or "unknown"
@@ -2,21 +2,78 @@
 # Silences Conda warnings during test runs without requiring user config.
 import warnings
 import logging
+from functools import lru_cache
+from types import MappingProxyType
+
+import pytest
 
 
 def pytest_configure(config):
+    # One filter covers every conda FutureWarning (including the "Adding
+    # 'defaults' to channel list" deprecation); the pattern is compiled once
+    # here and each warning is matched against a single filter entry.
     warnings.filterwarnings(
         "ignore",
-        message=r"Adding 'defaults' to channel list implicitly is deprecated.*",
         category=FutureWarning,
-        module=r"conda\.base\.context",
+        module=r"conda(\.|$)",
     )
 
     logging.getLogger("conda.cli.main_config").setLevel(logging.ERROR)
     logging.getLogger("conda.base.context").setLevel(logging.ERROR)
 
-    warnings.filterwarnings(
-        "ignore",
-        category=FutureWarning,
-        module=r"conda\..*",
-    )
+
+@pytest.fixture(autouse=True, scope="session")
+def _warm_fhir_models():
+    # Import and build the Patient/Encounter models once at session start so
+    # pydantic's first-use class setup is not charged to whichever test
+    # happens to run first. model_construct() is used because construct() is
+    # deprecated in pydantic v2 and warnings are errors under pytest.ini.
+    from fhir.resources.encounter import Encounter
+    from fhir.resources.patient import Patient
+
+    Patient.model_construct()
+    Encounter.model_construct()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _warm_hl7apy():
+    # hl7apy loads its message/segment/datatype definition tables on the
+    # first parse; do that once here so no single test (or xdist worker's
+    # first test) absorbs the load. Lenient mode keeps the warm-up message
+    # minimal.
+    from hl7_fhir_tool.hl7_parser import parse_hl7_v2
+
+    parse_hl7_v2("MSH|^~\\&|A|B|C|D|202001011200||ADT^A01|1|P|2.5\r", strict=False)
+
+
+@pytest.fixture(scope="session")
+def patient_cls():
+    # fhir.resources Patient class, imported once for tests that need to
+    # build or isinstance-check patients without a module-level import
+    from fhir.resources.patient import Patient
+
+    return Patient
+
+
+@pytest.fixture(scope="session")
+def patient_xml_bytes():
+    # Minimal namespaced FHIR Patient XML, built once; tests derive variants
+    # with bytes.replace() on the <id value="p1"/> element
+    return b'<Patient xmlns="http://hl7.org/fhir"><id value="p1"/></Patient>'
+
+
+@pytest.fixture(scope="session")
+def patient_json_obj():
+    # Minimal FHIR Patient JSON object, built once; read-only because it is
+    # shared, so tests derive variants with {**patient_json_obj, ...}
+    return MappingProxyType({"resourceType": "Patient", "id": "p1"})
+
+
+@pytest.fixture(scope="session")
+def parsed():
+    # hl7apy parse_message memoized by raw ER7 string for the session, so
+    # each distinct payload is parsed once; tests must treat the returned
+    # Message as read-only because later callers get the same object
+    from hl7apy.parser import parse_message
+
+    return lru_cache(maxsize=None)(parse_message)
@@ -12,9 +12,12 @@ Covers:
 
 import sys
 import importlib
+from contextlib import contextmanager
 import types as pytypes
 from dataclasses import dataclass
 
+import pytest
+
 from hl7_fhir_tool.transform.v2_to_fhir.adt_a01 import (
     ADTA01Transformer,
     _safe_str,
@@ -37,6 +40,8 @@ _REAL_REGISTRY_MOD = importlib.import_module("hl7_fhir_tool.transform.registry")
 
 
 class _WithToEr7:
+    __slots__ = ("v",)
+
     def __init__(self, v):
         self.v = v
 
@@ -50,22 +55,26 @@ class _BoomToEr7:
 
 
 class _IdComp:
+    __slots__ = ("id_number",)
+
     def __init__(self, id_number):
         self.id_number = id_number
 
 
 class _NameComp:
+    __slots__ = ("family_name", "given_name")
+
     def __init__(self, family=None, given=None):
         self.family_name = family
         self.given_name = given
 
 
-@dataclass
+@dataclass(slots=True)
 class _MSH:
     msh_9: object = None
 
 
-@dataclass
+@dataclass(slots=True)
 class _PID:
     pid_3: object = None
     pid_5: object = None
@@ -73,13 +82,13 @@ class _PID:
     pid_8: object = None
 
 
-@dataclass
+@dataclass(slots=True)
 class _PV1:
     pv1_2: object = None
     pv1_44: object = None
 
 
-@dataclass
+@dataclass(slots=True)
 class _Msg:
     MSH: object = None
     PID: object = None
@@ -117,14 +126,29 @@ def _install_fake_fhir_modules(assign_raises: bool):
     sys.modules["fhir.resources.encounter"] = encounter
 
 
-def _uninstall_fake_fhir_modules():
-    for k in (
-        "fhir.resources.encounter",
-        "fhir.resources.patient",
-        "fhir.resources",
-        "fhir",
-    ):
-        sys.modules.pop(k, None)
+# sys.modules keys replaced by _install_fake_fhir_modules
+_FAKE_FHIR_KEYS = (
+    "fhir",
+    "fhir.resources",
+    "fhir.resources.patient",
+    "fhir.resources.encounter",
+)
+
+
+@contextmanager
+def _fake_fhir_env(assign_raises: bool):
+    # Stash the real module objects and put them back afterwards rather than
+    # evicting them, so later tests keep using the already-imported fhir models
+    saved = {k: sys.modules.get(k) for k in _FAKE_FHIR_KEYS}
+    _install_fake_fhir_modules(assign_raises)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                sys.modules.pop(k, None)
+            else:
+                sys.modules[k] = v
 
 
 def _install_fake_registry_module():
@@ -144,15 +168,26 @@ def _restore_real_registry_module():
     sys.modules["hl7_fhir_tool.transform.registry"] = _REAL_REGISTRY_MOD
 
 
+# Re-imported module per assign_raises variant; re-executing the module body
+# is the expensive part, so each variant is imported at most once per session
+_REIMPORT_CACHE: dict[bool, pytypes.ModuleType] = {}
+
+
 def _reimport_adt_a01_for_import_branch(assign_raises: bool):
-    _install_fake_fhir_modules(assign_raises=assign_raises)
+    cached = _REIMPORT_CACHE.get(assign_raises)
+    if cached is not None:
+        return cached
     _install_fake_registry_module()
     try:
-        sys.modules.pop("hl7_fhir_tool.transform.v2_to_fhir.adt_a01", None)
-        fresh = importlib.import_module("hl7_fhir_tool.transform.v2_to_fhir.adt_a01")
+        with _fake_fhir_env(assign_raises=assign_raises):
+            sys.modules.pop(mod.__name__, None)
+            fresh = importlib.import_module(mod.__name__)
+        _REIMPORT_CACHE[assign_raises] = fresh
         return fresh
     finally:
-        _uninstall_fake_fhir_modules()
+        # keep the real adt_a01 module registered for the rest of the suite
+        sys.modules[mod.__name__] = mod
+        setattr(sys.modules[mod.__package__], "adt_a01", mod)
         _restore_real_registry_module()
 
 
@@ -202,6 +237,17 @@ def _birth_as_str(patient):
         return str(val)
 
 
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def t() -> ADTA01Transformer:
+    # Transformers are stateless, so one instance serves the whole module
+    return ADTA01Transformer()
+
+
 # ------------------------------------------------------------------------------
 # helpers tests
 # ------------------------------------------------------------------------------
@@ -321,8 +367,7 @@ def test_pid_gender_all_cases():
 # ------------------------------------------------------------------------------
 
 
-def test_applies_true_false_and_exception():
-    t = ADTA01Transformer()
+def test_applies_true_false_and_exception(t: ADTA01Transformer):
     msg1 = _Msg(MSH=_MSH(msh_9=_WithToEr7("ADT^A01")))
     assert t.applies(msg1)
     msg2 = _Msg(MSH=_MSH(msh_9=_WithToEr7("ORM^O01")))
@@ -343,8 +388,7 @@ def test_applies_true_false_and_exception():
 # ------------------------------------------------------------------------------
 
 
-def test_transform_always_returns_patient_and_encounter():
-    t = ADTA01Transformer()
+def test_transform_always_returns_patient_and_encounter(t: ADTA01Transformer):
     pat, enc = t.transform(_Msg())
 
     # With real FHIR models, resource_type is present
@@ -352,8 +396,7 @@ def test_transform_always_returns_patient_and_encounter():
     assert getattr(enc, "resource_type", "Encounter") == "Encounter"
 
 
-def test_transform_with_pid_only_minimal_fields():
-    t = ADTA01Transformer()
+def test_transform_with_pid_only_minimal_fields(t: ADTA01Transformer):
     pid = _PID(
         pid_3=[_IdComp(_WithToEr7("999"))],
         pid_5=[_NameComp(_WithToEr7("Doe"), _WithToEr7("Jane"))],
@@ -369,26 +412,24 @@ def test_transform_with_pid_only_minimal_fields():
     assert getattr(encounter, "status", None) is None
 
 
-def test_transform_with_pv1_sets_encounter_in_progress():
+def test_transform_with_pv1_sets_encounter_in_progress(t: ADTA01Transformer):
     # Lowercase fallback path: no uppercase PV1 on the message class
     class _MsgLower:
         def __init__(self, pid=None, pv1=None):
             self.pid = pid
             self.pv1 = pv1
 
-    t = ADTA01Transformer()
     pid = _PID(pid_5=[_NameComp(_WithToEr7("Roe"), _WithToEr7("Janet"))])
     pv1 = _PV1(pv1_2=_WithToEr7("I"))
     _, enc = t.transform(_MsgLower(pid=pid, pv1=pv1))
     assert getattr(enc, "status", None) == "in-progress"
 
 
-def test_transform_lowercase_pid_only():
+def test_transform_lowercase_pid_only(t: ADTA01Transformer):
     class _MsgLower:
         def __init__(self, pid=None):
             self.pid = pid
 
-    t = ADTA01Transformer()
     pid = _PID(
         pid_3=[_IdComp(_WithToEr7("321"))],
         pid_5=[_NameComp(_WithToEr7("Smith"), _WithToEr7("Jo"))],
@@ -441,6 +482,21 @@ def test_import_branch_sets_resource_type_raises():
     assert hasattr(fresh, "ADTA01Transformer")
 
 
+def test_import_branch_reimport_is_cached():
+    first = _reimport_adt_a01_for_import_branch(assign_raises=False)
+    assert _reimport_adt_a01_for_import_branch(assign_raises=False) is first
+
+
+def test_fake_fhir_env_restores_real_modules():
+    real = {k: sys.modules.get(k) for k in _FAKE_FHIR_KEYS}
+    with _fake_fhir_env(assign_raises=False):
+        assert sys.modules["fhir"] is not real["fhir"]
+    assert {k: sys.modules.get(k) for k in _FAKE_FHIR_KEYS} == real
+    _REIMPORT_CACHE.pop(True, None)
+    _reimport_adt_a01_for_import_branch(assign_raises=True)
+    assert sys.modules[mod.__name__] is mod
+
+
 # ------------------------------------------------------------------------------
 # construct fallbacks
 # ------------------------------------------------------------------------------
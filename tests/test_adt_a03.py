@@ -1,5 +1,10 @@
 # tests/test_adt_a03.py
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
 import pytest
+from hl7apy.core import Message
 from hl7apy.parser import parse_message as _pm
 from fhir.resources.coding import Coding
 from fhir.resources.period import Period
@@ -11,32 +16,191 @@ from hl7_fhir_tool.transform.v2_to_fhir.adt_a03 import ADTA03Transformer, _parse
 # globals
 # ------------------------------------------------------------------------------
 
+# Runs of N empty fields ("|".join of N empty strings) used to pad PV1 out to
+# PV1-19 / PV1-44; built once here rather than in every test body
+_EMPTY_16 = "|".join([""] * 16)
+_EMPTY_24 = "|".join([""] * 24)
+_EMPTY_42 = "|".join([""] * 42)
+
+# PV1 with patient class "I" and every other field through PV1-44 empty
+_PV1_INPATIENT = "PV1||I|" + _EMPTY_42
+
+_MSH_A03 = "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|{}|P|2.5\r"
+
+# Encounter.period cases: (id, raw message, expected (start, end) or None)
+A03_PERIOD_CASES = [
+    (
+        "pv1_44_45_present",
+        _MSH_A03.format("00003")
+        + "PID|||77777^^^HOSP^MR||Alpha^Test||19900101|U\r"
+        + f"PV1||I|{_EMPTY_16}|V123|{_EMPTY_24}|20250101|20250102",
+        ("2025-01-01", "2025-01-02"),
+    ),
+    (
+        "partial_period",
+        _MSH_A03.format("00010")
+        + "PID|||88888^^^HOSP^MR||Beta^Case||19990101|M\r"
+        + f"PV1||I|{_EMPTY_16}|V999|{_EMPTY_24}|20250101",
+        ("2025-01-01", None),
+    ),
+    (
+        "invalid_hl7_ts",
+        _MSH_A03.format("00026")
+        + "PID|||777^^^HOSP^MR||Invalid^TS\r"
+        + f"PV1|I|{_EMPTY_42}|202501|badts",
+        None,
+    ),
+    (
+        "missing_end",
+        _MSH_A03.format("00052")
+        + "PID|||66666^^^HOSP^MR||Partial^Period||20010101|F\r"
+        + f"PV1|I|{_EMPTY_42}|20250101|",
+        ("2025-01-01", None),
+    ),
+    (
+        "invalid_start_no_end",
+        _MSH_A03.format("00050")
+        + "PID|||55555^^^HOSP^MR||NoName||20000101|M\r"
+        + f"PV1|I|{_EMPTY_42}|BADDATE|",
+        None,
+    ),
+    (
+        "invalid_start_valid_end",
+        _MSH_A03.format("00060")
+        + "PID|||123^^^HOSP^MR||Test^Patient||19900101|M\r"
+        + f"PV1|I|{_EMPTY_42}|BADDATE|20250102",
+        (None, "2025-01-02"),
+    ),
+    (
+        "both_invalid",
+        _MSH_A03.format("00111")
+        + "PID|||999^^^HOSP^MR||Test^Patient||19900101|M\r"
+        + _PV1_INPATIENT
+        + "|BADDATE|ANOTHERBAD",
+        None,
+    ),
+]
+
 # Minimal A03 message for patient/encounter tests
 RAW_A03 = (
     "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00001|P|2.5\r"
-    "PID|||12345^^^HOSP^MR||Doe^Jane||19800101|F\r"
-    "PV1||I|" + "|".join([""] * 42)
+    "PID|||12345^^^HOSP^MR||Doe^Jane||19800101|F\r" + _PV1_INPATIENT
 )
 
 
+# ------------------------------------------------------------------------------
+# lightweight hl7-like stubs
+# ------------------------------------------------------------------------------
+
+# Mapping-only tests build these directly instead of parsing ER7 with hl7apy;
+# only tests that depend on real parser behavior go through _pm.
+
+
+class _WithToEr7:
+    __slots__ = ("v",)
+
+    def __init__(self, v):
+        self.v = v
+
+    def to_er7(self):
+        return self.v
+
+
+class _CXComp:
+    __slots__ = ("cx_1",)
+
+    def __init__(self, cx_1):
+        self.cx_1 = cx_1
+
+
+class _NameComp:
+    __slots__ = ("family_name", "given_name")
+
+    def __init__(self, family=None, given=None):
+        self.family_name = family
+        self.given_name = given
+
+
+@dataclass(slots=True)
+class _PID:
+    pid_3: object = None
+    pid_5: object = None
+
+
+@dataclass(slots=True)
+class _PV1:
+    pv1_2: object = None
+    pv1_19: object = None
+    pv1_44: object = None
+    pv1_45: object = None
+
+
+@dataclass(slots=True)
+class _Msg:
+    PID: object = None
+    PV1: object = None
+
+
+def _pid(
+    id_number: Optional[str] = None,
+    family: Optional[str] = None,
+    given: Optional[str] = None,
+) -> _PID:
+    # Mirror hl7apy's shape: repeated fields are lists of components whose
+    # leaves expose to_er7()
+    pid = _PID()
+    if id_number is not None:
+        pid.pid_3 = [_CXComp(_WithToEr7(id_number))]
+    if family is not None or given is not None:
+        pid.pid_5 = [_NameComp(_WithToEr7(family or ""), _WithToEr7(given or ""))]
+    return pid
+
+
+# PV1 with patient class "I" and no visit number / admit / discharge
+_PV1_STUB_INPATIENT = _PV1(pv1_2=_WithToEr7("I"))
+
+
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def transformer() -> ADTA03Transformer:
+    # Transformers are stateless, so one instance serves every test
     return ADTA03Transformer()
 
 
+@pytest.fixture(scope="session")
+def parsed() -> Callable[[str], Message]:
+    # Parse each raw fixture once per session; transforms do not mutate the
+    # message, so the parsed object can be shared. Tests that mutate a
+    # message parse their own copy with _pm().
+    return lru_cache(maxsize=None)(_pm)
+
+
+@pytest.fixture(scope="session")
+def msg_a03_minimal(parsed: Callable[[str], Message]) -> Message:
+    return parsed(RAW_A03)
+
+
+@pytest.fixture(scope="session", params=A03_PERIOD_CASES, ids=lambda c: c[0])
+def a03_period_case(
+    request: pytest.FixtureRequest, parsed: Callable[[str], Message]
+) -> Tuple[Message, Optional[Tuple[Optional[str], Optional[str]]]]:
+    _, raw, expected = request.param
+    return parsed(raw), expected
+
+
 # ------------------------------------------------------------------------------
 # transform
 # ------------------------------------------------------------------------------
 
 
-def test_transform_minimal_sets_patient_and_encounter(transformer: ADTA03Transformer):
-    msg = _pm(RAW_A03)
-    patient, encounter = transformer.transform(msg)
+def test_transform_minimal_sets_patient_and_encounter(
+    transformer: ADTA03Transformer, msg_a03_minimal: Message
+):
+    patient, encounter = transformer.transform(msg_a03_minimal)
 
     assert patient.id == "12345"
     assert patient.name and patient.name[0].family == "Doe"
@@ -48,99 +212,47 @@ def test_transform_minimal_sets_patient_and_encounter(transformer: ADTA03Transfo
     assert encounter.class_fhir[0].coding[0].code == "I"
 
 
-def test_transform_sets_period_when_pv1_44_45_present(transformer: ADTA03Transformer):
-    pv1_fields = [""]
-    pv1_fields.append("I")
-    pv1_fields.extend([""] * 16)
-    pv1_fields.append("V123")
-    pv1_fields.extend([""] * 24)
-    pv1_fields.extend(["20250101", "20250102"])
-    pv1_line = "|".join(pv1_fields)
-
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00003|P|2.5\r"
-        "PID|||77777^^^HOSP^MR||Alpha^Test||19900101|U\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-
-    assert encounter.period is not None
-    assert isinstance(encounter.period, Period)
-    assert encounter.period.start == "2025-01-01"
-    assert encounter.period.end == "2025-01-02"
-
-
-def test_transform_partial_period(transformer: ADTA03Transformer):
-    pv1_fields = [""]
-    pv1_fields.append("I")
-    pv1_fields.extend([""] * 16)
-    pv1_fields.append("V999")
-    pv1_fields.extend([""] * 24)
-    pv1_fields.append("20250101")
-    pv1_line = "|".join(pv1_fields)
-
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00010|P|2.5\r"
-        "PID|||88888^^^HOSP^MR||Beta^Case||19990101|M\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+def test_transform_encounter_period(
+    transformer: ADTA03Transformer,
+    a03_period_case: Tuple[Message, Optional[Tuple[Optional[str], Optional[str]]]],
+):
+    msg, expected = a03_period_case
     _, encounter = transformer.transform(msg)
 
-    assert encounter.period is not None
-    assert encounter.period.start == "2025-01-01"
-    assert encounter.period.end is None
+    assert encounter.class_fhir is not None
+    if expected is None:
+        assert encounter.period is None
+    else:
+        assert isinstance(encounter.period, Period)
+        assert (encounter.period.start, encounter.period.end) == expected
 
 
 def test_transform_fallback_encounter_id_when_no_visit_num(
     transformer: ADTA03Transformer,
 ):
-    pv1_fields = [""] + ["I"] + [""] * 42
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00005|P|2.5\r"
-        "PID|||99999^^^HOSP^MR||Gamma^Unit||19850101|F\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("99999", "Gamma", "Unit"), PV1=_PV1_STUB_INPATIENT)
     patient, encounter = transformer.transform(msg)
     assert encounter.id == f"enc-{patient.id}"
 
 
 def test_transform_handles_missing_pid(transformer: ADTA03Transformer):
-    pv1_fields = [""] + ["I"] + [""] * 42
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00006|P|2.5\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PV1=_PV1_STUB_INPATIENT)
     _, encounter = transformer.transform(msg)
     assert encounter.id.startswith("enc-")
 
 
 def test_transform_handles_family_without_given(transformer: ADTA03Transformer):
-    pv1_fields = [""] + ["I"] + [""] * 42
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00007|P|2.5\r"
-        "PID|||12346^^^HOSP^MR||Solo^\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("12346", "Solo", ""), PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.name is not None
     assert patient.name[0].family == "Solo"
-    if patient.name[0].given:
-        assert isinstance(patient.name[0].given[0], str)
+    assert patient.name[0].given is None
 
 
 def test_transform_missing_msh9(transformer: ADTA03Transformer):
     raw = (
         "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00020|P|2.5\r"
-        "PID|||123^^^HOSP^MR||Test^User||20000101|M\r"
-        "PV1||I|" + "|".join([""] * 42)
+        "PID|||123^^^HOSP^MR||Test^User||20000101|M\r" + _PV1_INPATIENT
     )
     msg = _pm(raw)
     delattr(msg.MSH, "msh_9")
@@ -148,46 +260,28 @@ def test_transform_missing_msh9(transformer: ADTA03Transformer):
 
 
 def test_transform_missing_pid_segment(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00021|P|2.5\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    msg = _Msg(PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.id is None
     assert patient.name is None
 
 
 def test_transform_pid_missing_name(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00022|P|2.5\r"
-        "PID|||123^^^HOSP^MR\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("123"), PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.name is None
     assert patient.id == "123"
 
 
 def test_transform_pid_missing_id(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00023|P|2.5\r"
-        "PID|||^^^HOSP^MR||Doe^John\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("", "Doe", "John"), PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.id is None
     assert patient.name[0].family == "Doe"
 
 
 def test_transform_pv1_missing(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00024|P|2.5\r"
-        "PID|||555^^^HOSP^MR||Missing^PV1\r"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("555", "Missing", "PV1"))
     _, encounter = transformer.transform(msg)
     assert isinstance(encounter, Encounter)
     assert encounter.period is None
@@ -195,112 +289,29 @@ def test_transform_pv1_missing(transformer: ADTA03Transformer):
 
 
 def test_transform_pv1_missing_class_and_visit(transformer: ADTA03Transformer):
-    pv1_fields = [""] + [""] * 43
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00025|P|2.5\r"
-        "PID|||999^^^HOSP^MR||Fallback^Test\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("999", "Fallback", "Test"), PV1=_PV1())
     _, encounter = transformer.transform(msg)
-    assert encounter.id.startswith("enc-")
+    assert encounter.id == "enc-999"
     assert encounter.class_fhir[0].coding == []
 
 
-def test_transform_invalid_hl7_ts(transformer: ADTA03Transformer):
-    pv1_fields = ["I"] + [""] * 42 + ["202501", "badts"]
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00026|P|2.5\r"
-        "PID|||777^^^HOSP^MR||Invalid^TS\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-    assert encounter.period is None
-
-
-def test_transform_partial_pv1_period_missing_end(transformer: ADTA03Transformer):
-    pv1_fields = ["I"] + [""] * 42 + ["20250101", ""]
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00052|P|2.5\r"
-        "PID|||66666^^^HOSP^MR||Partial^Period||20010101|F\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-    assert encounter.period.start == "2025-01-01"
-    assert encounter.period.end is None
-
-
-def test_transform_parse_hl7_ts_invalid_dates(transformer: ADTA03Transformer):
-    pv1_fields = ["I"] + [""] * 42 + ["BADDATE", ""]
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00050|P|2.5\r"
-        "PID|||55555^^^HOSP^MR||NoName||20000101|M\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-    assert encounter.period is None
-    assert encounter.class_fhir is not None
-    if encounter.class_fhir[0].coding:
-        assert encounter.class_fhir[0].coding[0].code == "I"
-
-
 def test_transform_missing_pid3_and_pid5(transformer: ADTA03Transformer):
-    pv1_fields = ["I"] + [""] * 42
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00051|P|2.5\r"
-        "PID||||||\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid(), PV1=_PV1_STUB_INPATIENT)
     patient, encounter = transformer.transform(msg)
     assert patient.id is None
     assert patient.name is None
     assert encounter.class_fhir is not None
-    if encounter.class_fhir[0].coding:
-        assert encounter.class_fhir[0].coding[0].code == "I"
-
-
-def test_transform_parse_hl7_ts_exception_branch(transformer: ADTA03Transformer):
-    pv1_fields = ["I"] + [""] * 42 + ["BADDATE", "20250102"]
-    pv1_line = "|".join(pv1_fields)
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00060|P|2.5\r"
-        "PID|||123^^^HOSP^MR||Test^Patient||19900101|M\r"
-        f"PV1|{pv1_line}"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-    assert encounter.period is not None
-    assert encounter.period.start is None
-    assert encounter.period.end == "2025-01-02"
+    assert encounter.class_fhir[0].coding[0].code == "I"
 
 
 def test_transform_pid_name_missing(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00061|P|2.5\r"
-        "PID|||123^^^HOSP^MR||\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid("123", "", ""), PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.name is None
 
 
 def test_transform_pid_id_missing(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00062|P|2.5\r"
-        "PID||||||\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    msg = _Msg(PID=_pid(""), PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.id is None
 
@@ -342,27 +353,12 @@ def test_transform_pid_name_fallback(transformer: ADTA03Transformer):
 
 
 def test_transform_pid_id_str_fallback(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00110|P|2.5\r"
-        "PID|||123ABC^^^HOSP^MR||\r"
-        "PV1||I|" + "|".join([""] * 42)
-    )
-    msg = _pm(raw)
+    pid = _PID(pid_3=[_CXComp("123ABC")])
+    msg = _Msg(PID=pid, PV1=_PV1_STUB_INPATIENT)
     patient, _ = transformer.transform(msg)
     assert patient.id == "123ABC"
 
 
-def test_transform_partial_pv1_exception(transformer: ADTA03Transformer):
-    raw = (
-        "MSH|^~\\&|EPIC|HOSP|REC|REC|202501010830||ADT^A03|00111|P|2.5\r"
-        "PID|||999^^^HOSP^MR||Test^Patient||19900101|M\r"
-        "PV1||I|" + "|".join([""] * 42) + "|BADDATE|ANOTHERBAD"
-    )
-    msg = _pm(raw)
-    _, encounter = transformer.transform(msg)
-    assert encounter.period is None
-
-
 def test_transform_pv1_44_45_exception(transformer: ADTA03Transformer):
     class PV1WithRaise:
         pv1_2 = "I"
@@ -391,6 +387,20 @@ def test_transform_pv1_44_45_exception(transformer: ADTA03Transformer):
     assert encounter.id == "V001"
 
 
+def test_transform_pid_exception_is_logged_not_raised(
+    transformer: ADTA03Transformer,
+):
+    class PIDWithRaise:
+        @property
+        def pid_5(self):
+            raise ValueError("forced error")
+
+    msg = _Msg(PID=PIDWithRaise(), PV1=_PV1_STUB_INPATIENT)
+    patient, encounter = transformer.transform(msg)
+    assert patient.name is None
+    assert encounter.class_fhir[0].coding[0].code == "I"
+
+
 def test_family_given_fallback_to_str(transformer: ADTA03Transformer):
     class FakeField:
         def __init__(self, value):
@@ -1,14 +1,17 @@
 # tests/test_adt_a08.py
 from __future__ import annotations
 
+from datetime import datetime
 from types import SimpleNamespace
+from typing import Tuple
 
-from fhir.resources.patient import Patient
+import pytest
 from hl7apy.parser import parse_message
 
 from hl7_fhir_tool.transform.v2_to_fhir.adt_a08 import (
     ADTA08Transformer,
     _parse_hl7_yyyymmdd,
+    _yyyymmdd_to_iso,
 )
 
 
@@ -59,17 +62,167 @@ def _mk_msg(mshtype: str, pid: str = "", pv1: str = ""):
     return parse_message("\r".join(parts))
 
 
+class _ParsedMessages(dict):
+    """Parse each (mshtype, pid, pv1) key on first lookup, then reuse it."""
+
+    def __missing__(self, key: Tuple[str, str, str]):
+        msg = self[key] = _mk_msg(*key)
+        return msg
+
+
+def _summary(patient, encounter) -> dict:
+    # Flatten the fields the transform cases assert on into plain values
+    name = patient.name[0] if patient.name else None
+    coding = encounter.class_fhir[0].coding
+    period = getattr(encounter, "period", None)
+    return {
+        "id": getattr(patient, "id", None),
+        "family": name.family if name else None,
+        "given": name.given if name else None,
+        "birthDate": str(patient.birthDate) if patient.birthDate else None,
+        "gender": patient.gender,
+        "enc_id": encounter.id,
+        "class": coding[0].code if coding else None,
+        "period": (period.start, period.end) if period else None,
+    }
+
+
+# ------------------------------------------------------------------------------
+# lightweight hl7-like stubs
+# ------------------------------------------------------------------------------
+
+
+class _Er7Stub(SimpleNamespace):
+    """Leaf value whose to_er7() returns `value`, or raises `raises` if set."""
+
+    def to_er7(self):
+        if self.raises is not None:
+            raise self.raises
+        return self.value
+
+
+class _RaisingStub:
+    """Segment stand-in whose every attribute lookup raises `exc`."""
+
+    __slots__ = ("exc",)
+
+    def __init__(self, exc: Exception):
+        self.exc = exc
+
+    def __getattr__(self, name):
+        raise self.exc
+
+
+def _stub(value: object = None, raises: Exception | None = None) -> _Er7Stub:
+    return _Er7Stub(value=value, raises=raises)
+
+
+# Raising leaves shared by the error-path tests; each is only raised once per
+# test, so one instance per message is enough
+_KAPOW = _stub(raises=RuntimeError("kapow"))
+_PV1_BOOM = _stub(raises=ValueError("pv1 boom"))
+_GENDER_BOOM = _stub(raises=RuntimeError("gender to_er7 blew up"))
+
+
+# ------------------------------------------------------------------------------
+# globals
+# ------------------------------------------------------------------------------
+
+# Segment lines shared by the parser-backed tests
+_PID_DOE = _pid("12345", "Doe", "Jane", "19800101", "F")
+_PID_ALPHA = _pid("77777", "Alpha", "Test", "19900101", "M")
+_PID_SMITH = _pid("99999", "Smith", "Alex", "19751231", "U")
+_PID_BAD_DOB = _pid("44444", "Dob", "Bad", "1990", "U")
+_PID_NO_PV1 = _pid("55555", "NoPv1", "Case", "19700101", "M")
+_PID_EMPTY_CX1 = "PID|1||^HOSP^MR||Doe^OnlyFam||19700101|M|"
+_PID_ONLY_FAMILY = "PID|1||FAM001^^^HOSP^MR||SoloFam^||19850706|F|"
+_PID_ONLY_GIVEN = "PID|1||GIV001^^^HOSP^MR||^OnlyGiven||19990101|M|"
+
+_PV1_I = _pv1_with({2: "I"})
+_PV1_O = _pv1_with({2: "O"})
+_PV1_E = _pv1_with({2: "E"})
+_PV1_VISIT_PERIOD = _pv1_with({2: "O", 19: "V999", 44: "20250101", 45: "20250102"})
+
+# transform() cases: (id, PID line, PV1 line, expected subset of _summary())
+A08_TRANSFORM_CASES = [
+    (
+        "minimal",
+        _PID_DOE,
+        _PV1_I,
+        {
+            "id": "12345",
+            "family": "Doe",
+            "given": ["Jane"],
+            "birthDate": "1980-01-01",
+            "gender": "female",
+            "enc_id": "enc-12345",
+            "class": "I",
+            "period": None,
+        },
+    ),
+    (
+        "visit_and_period",
+        _PID_ALPHA,
+        _PV1_VISIT_PERIOD,
+        {
+            "id": "77777",
+            "birthDate": "1990-01-01",
+            "gender": "male",
+            "enc_id": "V999",
+            "class": "O",
+            "period": ("2025-01-01", "2025-01-02"),
+        },
+    ),
+    ("missing_pid", "", _PV1_E, {"id": None, "enc_id": "enc-unknown", "class": "E"}),
+    ("gender_unknown", _PID_SMITH, _PV1_I, {"gender": "unknown"}),
+    ("bad_birthdate", _PID_BAD_DOB, _PV1_E, {"birthDate": None}),
+    ("pid3_empty_id", _PID_EMPTY_CX1, _PV1_I, {"id": None, "enc_id": "enc-unknown"}),
+    ("no_pv1", _PID_NO_PV1, "", {"enc_id": "enc-55555", "class": None}),
+    (
+        "pid5_only_family",
+        _PID_ONLY_FAMILY,
+        _PV1_O,
+        {"family": "SoloFam", "given": None},
+    ),
+    (
+        "pid5_only_given",
+        _PID_ONLY_GIVEN,
+        _PV1_I,
+        {"family": None, "given": ["OnlyGiven"]},
+    ),
+]
+
+
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def xf() -> ADTA08Transformer:
+    # Transformers are stateless, so one instance serves the whole module
+    return ADTA08Transformer()
+
+
+@pytest.fixture(scope="session")
+def hl7_messages() -> _ParsedMessages:
+    # Transforms only read the message, so each parsed message is shared by
+    # every test using the same key. Tests that mutate a message must build
+    # their own with _mk_msg() (hl7apy elements do not support deepcopy).
+    return _ParsedMessages()
+
+
 # ------------------------------------------------------------------------------
 # applies
 # ------------------------------------------------------------------------------
 
 
-def test_applies_true_and_false():
-    xf = ADTA08Transformer()
-    assert xf.applies(_mk_msg("ADT^A08")) is True
-    assert xf.applies(_mk_msg("ADT^A03")) is False
+def test_applies_true_and_false(xf: ADTA08Transformer, hl7_messages: _ParsedMessages):
+    assert xf.applies(hl7_messages["ADT^A08", "", ""]) is True
+    assert xf.applies(hl7_messages["ADT^A03", "", ""]) is False
 
-    # Valid message, then clear MSH-9 to simulate missing trigger
+    # Valid message, then clear MSH-9 to simulate missing trigger; parsed
+    # fresh because the shared message must not be mutated
     msg = _mk_msg("ADT^A08")
     cleared = False
     try:
@@ -92,7 +245,7 @@ def test_applies_true_and_false():
     assert xf.applies(msg) is False
 
 
-def test_applies_logs_on_exception():
+def test_applies_logs_on_exception(xf: ADTA08Transformer):
     class BrokenMSH:
         def __getattr__(self, name):
             if name == "msh_9":
@@ -100,7 +253,6 @@ def test_applies_logs_on_exception():
             return None
 
     msg = SimpleNamespace(MSH=BrokenMSH())
-    xf = ADTA08Transformer()
     assert xf.applies(msg) is False
 
 
@@ -109,337 +261,159 @@ def test_applies_logs_on_exception():
 # ------------------------------------------------------------------------------
 
 
-def test_transform_minimal():
-    xf = ADTA08Transformer()
-    pid = _pid("12345", "Doe", "Jane", "19800101", "F")
-    pv1 = _pv1_with({2: "I"})
-    msg = _mk_msg("ADT^A08", pid=pid, pv1=pv1)
-
-    patient, encounter = xf.transform(msg)
+@pytest.mark.parametrize(
+    "pid,pv1,expected",
+    [c[1:] for c in A08_TRANSFORM_CASES],
+    ids=[c[0] for c in A08_TRANSFORM_CASES],
+)
+def test_transform_cases(
+    xf: ADTA08Transformer,
+    hl7_messages: _ParsedMessages,
+    pid: str,
+    pv1: str,
+    expected: dict,
+):
+    patient, encounter = xf.transform(hl7_messages["ADT^A08", pid, pv1])
 
-    assert getattr(patient, "id", None) == "12345"
-    assert patient.name and patient.name[0].family == "Doe"
-    assert patient.name[0].given == ["Jane"]
-    assert str(patient.birthDate) == "1980-01-01"
-    assert patient.gender == "female"
     assert encounter.status == "in-progress"
-    assert (
-        encounter.class_fhir[0].coding and encounter.class_fhir[0].coding[0].code == "I"
-    )
-    assert encounter.id == "enc-12345"
-    assert getattr(encounter, "period", None) is None
-
+    summary = _summary(patient, encounter)
+    assert {k: summary[k] for k in expected} == expected
 
-def test_transform_with_visit_and_period():
-    xf = ADTA08Transformer()
-    pid = _pid("77777", "Alpha", "Test", "19900101", "M")
-    pv1 = _pv1_with({2: "O", 19: "V999", 44: "20250101", 45: "20250102"})
-    msg = _mk_msg("ADT^A08", pid=pid, pv1=pv1)
 
-    patient, encounter = xf.transform(msg)
-
-    assert getattr(patient, "id", None) == "77777"
-    assert str(patient.birthDate) == "1990-01-01"
-    assert patient.gender == "male"
-    assert encounter.id == "V999"
-    assert encounter.status == "in-progress"
-    assert encounter.class_fhir[0].coding[0].code == "O"
-    assert encounter.period.start == "2025-01-01"
-    assert encounter.period.end == "2025-01-02"
+def test_transform_pid3_cx1_is_none_skips_block(xf: ADTA08Transformer, patient_cls):
+    pid = SimpleNamespace(pid_3=[SimpleNamespace(cx_1=None)], pid_5=[])
 
+    p = xf._build_patient(pid)
 
-def test_transform_missing_pid_is_tolerant():
-    xf = ADTA08Transformer()
-    pv1 = _pv1_with({2: "E"})
-    msg = _mk_msg("ADT^A08", pid="", pv1=pv1)
+    assert isinstance(p, patient_cls)
 
-    patient, encounter = xf.transform(msg)
 
-    assert getattr(patient, "id", None) is None
-    assert encounter.id == "enc-unknown"
-    assert encounter.status == "in-progress"
-    assert (
-        encounter.class_fhir[0].coding and encounter.class_fhir[0].coding[0].code == "E"
+def test_transform_pid5_name_and_pid7_birthdate_to_er7_paths(xf: ADTA08Transformer):
+    pid = SimpleNamespace(
+        pid_3=[],
+        pid_5=[SimpleNamespace(family_name=_stub("Family"), given_name=_stub("Given"))],
+        pid_7=_stub("19850706"),
     )
 
-
-def test_transform_gender_unknown_mapping():
-    xf = ADTA08Transformer()
-    pid = _pid("99999", "Smith", "Alex", "19751231", "U")
-    pv1 = _pv1_with({2: "I"})
-    msg = _mk_msg("ADT^A08", pid=pid, pv1=pv1)
-
-    patient, encounter = xf.transform(msg)
-
-    assert patient.gender == "unknown"
-    assert encounter.status == "in-progress"
-
-
-def test_transform_bad_birthdate_not_set():
-    xf = ADTA08Transformer()
-    pid = _pid("44444", "Dob", "Bad", "1990", "U")
-    msg = _mk_msg("ADT^A08", pid=pid, pv1=_pv1_with({2: "E"}))
-
-    patient, _ = xf.transform(msg)
-
-    assert getattr(patient, "birthDate", None) in (None, "")
-
-
-def test_transform_pid3_present_but_empty_id_keeps_patient_id_none():
-    xf = ADTA08Transformer()
-    pid = "PID|1||^HOSP^MR||Doe^OnlyFam||19700101|M|"
-    msg = _mk_msg("ADT^A08", pid=pid, pv1=_pv1_with({2: "I"}))
-
-    patient, encounter = xf.transform(msg)
-
-    assert getattr(patient, "id", None) is None
-    assert encounter.id == "enc-unknown"
-
-
-def test_transform_pid3_cx1_is_none_skips_block():
-    class PID:
-        pid_3 = [SimpleNamespace(cx_1=None)]
-        pid_5 = []
-        pid_7 = None
-        pid_8 = None
-
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
-
-    assert isinstance(p, Patient)
-
-
-def test_transform_pid5_name_and_pid7_birthdate_to_er7_paths():
-    class NameComp:
-        def __init__(self, fam, giv):
-            self.family_name = fam
-            self.given_name = giv
-
-    class Fam:
-        def to_er7(self):
-            return "Family"
-
-    class Giv:
-        def to_er7(self):
-            return "Given"
-
-    class PID7:
-        def to_er7(self):
-            return "19850706"
-
-    class PID:
-        pid_3 = []
-        pid_5 = [NameComp(Fam(), Giv())]
-        pid_7 = PID7()
-        pid_8 = None
-
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
+    p = xf._build_patient(pid)
 
     assert p.name and p.name[0].family == "Family"
     assert p.name[0].given == ["Given"]
     assert str(p.birthDate) == "1985-07-06"
 
 
-def test_transform_pid3_sets_id_via_str_not_to_er7():
-    class CX1NoToEr7:
-        def __str__(self):
-            return "STR123"
+def test_transform_pid3_sets_id_via_str_not_to_er7(xf: ADTA08Transformer):
+    # a plain str has no to_er7(), so the str() fallback is taken
+    pid = SimpleNamespace(pid_3=[SimpleNamespace(cx_1="STR123")], pid_5=[])
 
-    class PID:
-        pid_3 = [SimpleNamespace(cx_1=CX1NoToEr7())]
-        pid_5 = []
-        pid_7 = None
-        pid_8 = None
-
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
+    p = xf._build_patient(pid)
 
     assert getattr(p, "id", None) == "STR123"
 
 
-def test_transform_pv1_class_and_id_via_plain_strings_not_to_er7():
-    class PV1Plain:
-        pv1_2 = "O"
-        pv1_19 = "VPLAIN"
-        pv1_44 = None
-        pv1_45 = None
+def test_transform_pv1_class_and_id_via_plain_strings_not_to_er7(
+    xf: ADTA08Transformer, patient_cls
+):
+    pv1 = SimpleNamespace(pv1_2="O", pv1_19="VPLAIN")
 
-    xf = ADTA08Transformer()
-    patient = Patient()
+    patient = patient_cls()
     patient.id = "X9"
-    enc = xf._build_encounter(PV1Plain(), patient)
+    enc = xf._build_encounter(pv1, patient)
 
     assert enc.class_fhir[0].coding and enc.class_fhir[0].coding[0].code == "O"
     assert enc.id == "VPLAIN"
 
 
-def test_transform_pv1_fields_present_but_empty_strings():
-    class PV1Empty:
-        pv1_2 = ""
-        pv1_19 = ""
-        pv1_44 = None
-        pv1_45 = None
+def test_transform_pv1_fields_present_but_empty_strings(
+    xf: ADTA08Transformer, patient_cls
+):
+    pv1 = SimpleNamespace(pv1_2="", pv1_19="")
 
-    xf = ADTA08Transformer()
-    patient = Patient()
+    patient = patient_cls()
     patient.id = "E1"
-    enc = xf._build_encounter(PV1Empty(), patient)
+    enc = xf._build_encounter(pv1, patient)
 
     assert enc.class_fhir[0].coding == []
     assert enc.id == "enc-E1"
 
 
-def test_transform_no_pv1_sets_empty_class_and_fallback_id():
-    xf = ADTA08Transformer()
-    pid = _pid("55555", "NoPv1", "Case", "19700101", "M")
-    msg = _mk_msg("ADT^A08", pid=pid, pv1="")
-
-    _, encounter = xf.transform(msg)
-
-    assert encounter.id == "enc-55555"
-    assert encounter.class_fhir[0].coding == []
+def test_transform_pid_parsing_error_path_logs_and_recovers(
+    xf: ADTA08Transformer, patient_cls
+):
+    p = xf._build_patient(_RaisingStub(RuntimeError("pid boom")))
 
-
-def test_transform_pid_parsing_error_path_logs_and_recovers():
-    class ExplodeOnGetattr:
-        def __getattr__(self, name):
-            raise RuntimeError("pid boom")
-
-    xf = ADTA08Transformer()
-    p = xf._build_patient(ExplodeOnGetattr())
-
-    assert isinstance(p, Patient)
+    assert isinstance(p, patient_cls)
     assert getattr(p, "id", None) is None
 
 
-def test_transform_pv1_parsing_error_path_logs_and_recovers():
-    class ExplodeOnToEr7:
-        def __getattr__(self, name):
-            class X:
-                def to_er7(self_inner):
-                    raise ValueError("pv1 boom")
-
-            return X()
+def test_transform_pv1_parsing_error_path_logs_and_recovers(
+    xf: ADTA08Transformer, patient_cls
+):
+    pv1 = SimpleNamespace(pv1_2=_PV1_BOOM, pv1_19=_PV1_BOOM)
 
-    xf = ADTA08Transformer()
-    patient = Patient()
+    patient = patient_cls()
     patient.id = "ZZZ"
-    enc = xf._build_encounter(ExplodeOnToEr7(), patient)
+    enc = xf._build_encounter(pv1, patient)
 
     assert enc.id == "enc-ZZZ"
     assert enc.class_fhir is not None
 
 
-def test_transform_pid8_gender_block_raises_then_recovers():
-    class PIDFake:
-        pid_3 = []
-
-        class NameComp:
-            def __init__(self):
-                self.family_name = None
-                self.given_name = None
-
-        pid_5 = [NameComp()]
-        pid_7 = None
-
-        class Boom:
-            def to_er7(self):
-                raise RuntimeError("gender to_er7 blew up")
-
-        pid_8 = Boom()
+def test_transform_pid8_gender_block_raises_then_recovers(
+    xf: ADTA08Transformer, patient_cls
+):
+    pid = SimpleNamespace(
+        pid_3=[],
+        pid_5=[SimpleNamespace(family_name=None, given_name=None)],
+        pid_8=_GENDER_BOOM,
+    )
 
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PIDFake())
+    p = xf._build_patient(pid)
 
-    assert isinstance(p, Patient)
+    assert isinstance(p, patient_cls)
     assert p.gender == "unknown"
 
 
-def test_transform_pid3_to_er7_raises_is_caught_and_id_not_set():
-    class CX1Boom:
-        def to_er7(self):
-            raise RuntimeError("kapow")
-
-    class PID:
-        pid_3 = [SimpleNamespace(cx_1=CX1Boom())]
-        pid_5 = []
-        pid_7 = None
-        pid_8 = None
+@pytest.mark.parametrize(
+    "sex,expected", [("f", "female"), (" M ", "male"), ("O", "unknown")]
+)
+def test_transform_pid8_gender_lookup(xf: ADTA08Transformer, sex, expected):
+    p = xf._build_patient(SimpleNamespace(pid_8=_stub(sex)))
 
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
+    assert p.gender == expected
 
-    assert getattr(p, "id", None) in (None, "")
 
+def test_gender_map_is_shared_and_read_only():
+    with pytest.raises(TypeError):
+        ADTA08Transformer._GENDER["X"] = "other"
 
-def test_transform_pid3_setting_id_raises_and_is_caught_invalid_fhir_id():
-    class CX1BadId:
-        def to_er7(self):
-            return "BAD_ID_UNDERSCORE"  # underscore invalid per FHIR id pattern
 
-    class PID:
-        pid_3 = [SimpleNamespace(cx_1=CX1BadId())]
-        pid_5 = []
-        pid_7 = None
-        pid_8 = None
+def test_transform_pid3_to_er7_raises_is_caught_and_id_not_set(xf: ADTA08Transformer):
+    pid = SimpleNamespace(pid_3=[SimpleNamespace(cx_1=_KAPOW)], pid_5=[])
 
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
+    p = xf._build_patient(pid)
 
     assert getattr(p, "id", None) in (None, "")
 
 
-def test_transform_pid5_only_family_sets_family_not_given():
-    raw = (
-        "MSH|^~\\&|SRC_APP|SRC_FAC|DST_APP|DST_FAC|20250101123000||ADT^A08|MSGFAM1|P|2.5\r"
-        "PID|1||FAM001^^^HOSP^MR||SoloFam^||19850706|F|\r"
-        "PV1|1|O|||||||||||||||||||||||||||||||||||||||||\r"
-    )
-    msg = parse_message(raw)
-    xf = ADTA08Transformer()
-    patient, _ = xf.transform(msg)
-
-    assert patient.name and patient.name[0].family == "SoloFam"
-    assert patient.name[0].given in (None, [], [""])
-
-
-def test_transform_pid5_only_given_sets_given_not_family():
-    raw = (
-        "MSH|^~\\&|SRC_APP|SRC_FAC|DST_APP|DST_FAC|20250101123000||ADT^A08|MSGGIV1|P|2.5\r"
-        "PID|1||GIV001^^^HOSP^MR||^OnlyGiven||19990101|M|\r"
-        "PV1|1|I|||||||||||||||||||||||||||||||||||||||||\r"
-    )
-    msg = parse_message(raw)
-    xf = ADTA08Transformer()
-    patient, _ = xf.transform(msg)
+def test_transform_pid3_setting_id_raises_and_is_caught_invalid_fhir_id(
+    xf: ADTA08Transformer,
+):
+    # underscore invalid per FHIR id pattern
+    cx_1 = _stub("BAD_ID_UNDERSCORE")
+    pid = SimpleNamespace(pid_3=[SimpleNamespace(cx_1=cx_1)], pid_5=[])
 
-    assert patient.name and patient.name[0].family in (None, "")
-    assert patient.name[0].given == ["OnlyGiven"]
+    p = xf._build_patient(pid)
 
+    assert getattr(p, "id", None) in (None, "")
 
-def test_transform_pid5_family_and_given_fall_back_to_str_paths():
-    class FamNoTo:
-        def __str__(self):  # no to_er7()
-            return "StrFamily"
-
-    class GivNoTo:
-        def __str__(self):  # no to_er7()
-            return "StrGiven"
-
-    class NameComp:
-        def __init__(self):
-            self.family_name = FamNoTo()
-            self.given_name = GivNoTo()
 
-    class PID:
-        pid_3 = []
-        pid_5 = [NameComp()]  # triggers the name parsing block
-        pid_7 = None
-        pid_8 = None
+def test_transform_pid5_family_and_given_fall_back_to_str_paths(xf: ADTA08Transformer):
+    # plain strs have no to_er7(), so both components go through str()
+    name = SimpleNamespace(family_name="StrFamily", given_name="StrGiven")
+    pid = SimpleNamespace(pid_3=[], pid_5=[name])
 
-    xf = ADTA08Transformer()
-    p = xf._build_patient(PID())
+    p = xf._build_patient(pid)
 
     assert p.name and p.name[0].family == "StrFamily"
     assert p.name[0].given == ["StrGiven"]
@@ -451,8 +425,27 @@ def test_transform_pid5_family_and_given_fall_back_to_str_paths():
 
 
 def test_parse_hl7_yyyymmdd_exception_path():
-    class Boom:
-        def to_er7(self):
-            raise ValueError("boom")
+    assert _parse_hl7_yyyymmdd(_stub(raises=ValueError("boom"))) is None
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        ("20250101", "2025-01-01"),
+        ("202501011230", "2025-01-01"),
+        ("20251301", None),
+        ("20250230", None),
+        ("2025010", None),
+        ("2025-01-01", None),
+        ("2025\u00b20101", None),
+    ],
+)
+def test_yyyymmdd_to_iso(raw, expected):
+    assert _yyyymmdd_to_iso(raw) == expected
+
 
-    assert _parse_hl7_yyyymmdd(Boom()) is None
+def test_parse_hl7_yyyymmdd_matches_strptime():
+    # slicing must agree with the strptime-based parse it replaced
+    for raw in ("19800101", "20000229", "19001231", "20241231", "99991231"):
+        ref = datetime.strptime(raw, "%Y%m%d").date().isoformat()
+        assert _parse_hl7_yyyymmdd(_stub(raw)) == ref
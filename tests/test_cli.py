@@ -8,7 +8,6 @@ import io
 import json as _json
 import os
 import pytest
-import runpy
 import sys
 import types
 
@@ -16,7 +15,7 @@ from decimal import Decimal as _Decimal
 from pathlib import Path
 from uuid import UUID as _UUID
 
-from hl7_fhir_tool import cli
+from hl7_fhir_tool import cli, json_utils
 
 
 # ------------------------------------------------------------------------------
@@ -31,20 +30,39 @@ HL7_TEXT = (
 )
 
 
+def _raiser(exc: BaseException):
+    # Callable that raises exc whatever it is called with; stands in for
+    # functions/methods patched to fail
+    def _fn(*a, **k):
+        raise exc
+
+    return _fn
+
+
+# HL7_TEXT encoded once; write_hl7 writes these bytes for the default text
+HL7_BYTES = HL7_TEXT.encode("utf-8")
+
+
 def write_hl7(tmp_path: Path, name: str = "msg.hl7", text: str = HL7_TEXT) -> Path:
     p = tmp_path / name
-    p.write_text(text, encoding="utf-8")
+    p.write_bytes(HL7_BYTES if text is HL7_TEXT else text.encode("utf-8"))
     return p
 
 
+@pytest.fixture(scope="session")
+def hl7_file(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    # Written once and only ever read; tests that produce output still write
+    # into their own tmp_path
+    return write_hl7(tmp_path_factory.mktemp("hl7"))
+
+
 # ------------------------------------------------------------------------------
 # happy paths
 # ------------------------------------------------------------------------------
 
 
-def test_parse_hl7_ok(tmp_path, capsys):
-    p = write_hl7(tmp_path)
-    code = cli.main(["parse-hl7", str(p)])
+def test_parse_hl7_ok(hl7_file, capsys):
+    code = cli.main(["parse-hl7", str(hl7_file)])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     assert "MSH|" in out and "PID|" in out
@@ -71,9 +89,8 @@ def test_parse_fhir_xml_ok(tmp_path, capsys):
     assert '"resourceType"' in out and '"Patient"' in out
 
 
-def test_transform_stdout_pretty_ok(tmp_path, capsys):
-    p = write_hl7(tmp_path)
-    code = cli.main(["transform", str(p), "--stdout", "--pretty"])
+def test_transform_stdout_pretty_ok(hl7_file, capsys):
+    code = cli.main(["transform", str(hl7_file), "--stdout", "--pretty"])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     assert out.strip().startswith("{") and out.strip().endswith("}")
@@ -98,18 +115,19 @@ def test_parse_hl7_path_is_directory(tmp_path):
     assert code == cli.EXIT_ERR
 
 
-def test_parse_hl7_not_readable(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_parse_hl7_not_readable(hl7_file, monkeypatch):
     real_access = os.access
     # force unreadable
     monkeypatch.setattr(
         os,
         "access",
         lambda path, mode: (
-            False if Path(path) == p and (mode & os.R_OK) else real_access(path, mode)
+            False
+            if Path(path) == hl7_file and (mode & os.R_OK)
+            else real_access(path, mode)
         ),
     )
-    code = cli.main(["parse-hl7", str(p)])
+    code = cli.main(["parse-hl7", str(hl7_file)])
     assert code == cli.EXIT_ERR
 
 
@@ -130,35 +148,24 @@ def test_parse_fhir_unsupported_suffix(tmp_path):
 # ------------------------------------------------------------------------------
 
 
-def test_validate_output_mode_none_is_ok(tmp_path, capsys):
+def test_validate_output_mode_none_is_ok(hl7_file, capsys):
     # return when output_dir is None
-    p = write_hl7(tmp_path)
-    code = cli.main(["transform", str(p), "--stdout"])
+    code = cli.main(["transform", str(hl7_file), "--stdout"])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     assert out.strip()  # some JSON printed
 
 
-def test_validate_output_mode_mkdir_raises_oserror(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_validate_output_mode_mkdir_raises_oserror(tmp_path, hl7_file, monkeypatch):
     bad = tmp_path / "nope"
 
-    # mkdir raising OSError
-    orig_mkdir = Path.mkdir
-
-    def boom_mkdir(self, parents=False, exist_ok=False):
-        raise OSError("mkdir-fail")
-
-    monkeypatch.setattr(Path, "mkdir", boom_mkdir)
-    try:
-        code = cli.main(["transform", str(p), "-o", str(bad)])
-        assert code == cli.EXIT_ERR
-    finally:
-        monkeypatch.setattr(Path, "mkdir", orig_mkdir, raising=False)
+    # mkdir raising OSError; monkeypatch restores Path.mkdir on teardown
+    monkeypatch.setattr(Path, "mkdir", _raiser(OSError("mkdir-fail")))
+    code = cli.main(["transform", str(hl7_file), "-o", str(bad)])
+    assert code == cli.EXIT_ERR
 
 
-def test_validate_output_mode_dir_not_writable(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_validate_output_mode_dir_not_writable(tmp_path, hl7_file, monkeypatch):
     outdir = tmp_path / "outdir"
     outdir.mkdir(parents=True, exist_ok=True)
     real_access = os.access
@@ -172,7 +179,7 @@ def test_validate_output_mode_dir_not_writable(tmp_path, monkeypatch):
             else real_access(path, mode)
         ),
     )
-    code = cli.main(["transform", str(p), "-o", str(outdir)])
+    code = cli.main(["transform", str(hl7_file), "-o", str(outdir)])
     assert code == cli.EXIT_ERR
 
 
@@ -181,40 +188,25 @@ def test_validate_output_mode_dir_not_writable(tmp_path, monkeypatch):
 # ------------------------------------------------------------------------------
 
 
-def test_read_text_input_file_not_found(tmp_path, monkeypatch):
+def test_read_text_input_file_not_found(tmp_path):
     p = tmp_path / "ghost.hl7"
-    # Make _read_text_input raise FileNotFoundError
-    monkeypatch.setattr(
-        Path,
-        "read_text",
-        lambda self, **k: (_ for _ in ()).throw(FileNotFoundError("nope")),
-    )
+
     with pytest.raises(cli.HL7FHIRToolError, match=r"^File not found"):
-        cli._read_text_input(p)
+        cli._read_text_input(p, reader=_raiser(FileNotFoundError("nope")))
 
 
-def test_read_text_input_permission_error(tmp_path, monkeypatch):
+def test_read_text_input_permission_error(tmp_path):
     p = tmp_path / "x.hl7"
-    p.write_text("x", encoding="utf-8")
-
-    def boom(*a, **k):
-        raise PermissionError("denied")
 
-    monkeypatch.setattr(Path, "read_text", boom)
     with pytest.raises(cli.HL7FHIRToolError, match=r"^Permission denied"):
-        cli._read_text_input(p)
+        cli._read_text_input(p, reader=_raiser(PermissionError("denied")))
 
 
-def test_read_text_input_oserror(tmp_path, monkeypatch):
+def test_read_text_input_oserror(tmp_path):
     p = tmp_path / "x2.hl7"
-    p.write_text("x", encoding="utf-8")
-
-    def boom(*a, **k):
-        raise OSError("weird-os")
 
-    monkeypatch.setattr(Path, "read_text", boom)
     with pytest.raises(cli.HL7FHIRToolError, match=r"^Failed to read"):
-        cli._read_text_input(p)
+        cli._read_text_input(p, reader=_raiser(OSError("weird-os")))
 
 
 # ------------------------------------------------------------------------------
@@ -268,27 +260,18 @@ def test_resource_to_json_str_date_decimal_uuid_iterables_mappings_and_str(monke
     s = cli._resource_to_json_str(X(), pretty=False)
     assert _json.loads(s) == "ZZZ"
 
-    def b64_boom(b):
-        raise RuntimeError("nope")
-
-    monkeypatch.setattr("base64.b64encode", b64_boom)
+    monkeypatch.setattr("base64.b64encode", _raiser(RuntimeError("nope")))
     s = cli._resource_to_json_str(b"hi", pretty=False)
     assert _json.loads(s) == "hi"  # decoded utf-8 fallback
 
 
 def test_resource_to_json_str_json_dumps_failure_raises(monkeypatch):
-    # Force final json.dumps to fail
-    orig_dumps = cli.json.dumps
-    try:
-        monkeypatch.setattr(
-            cli.json, "dumps", lambda *a, **k: (_ for _ in ()).throw(TypeError("nope"))
-        )
-        with pytest.raises(
-            cli.HL7FHIRToolError, match=r"^Resource is not JSON serializable"
-        ):
-            cli._resource_to_json_str(object(), pretty=False)
-    finally:
-        monkeypatch.setattr(cli.json, "dumps", orig_dumps)
+    # Force the final json.dumps to fail
+    monkeypatch.setattr(cli.json, "dumps", _raiser(TypeError("nope")))
+    with pytest.raises(
+        cli.HL7FHIRToolError, match=r"^Resource is not JSON serializable"
+    ):
+        cli._resource_to_json_str(object(), pretty=False)
 
 
 # ------------------------------------------------------------------------------
@@ -296,7 +279,7 @@ def test_resource_to_json_str_json_dumps_failure_raises(monkeypatch):
 # ------------------------------------------------------------------------------
 
 
-def test_write_resources_to_dir_success_and_oserror(tmp_path, monkeypatch):
+def test_write_resources_to_dir_success_and_oserror(tmp_path):
     class R1:
         resource_type = "Patient"
 
@@ -308,23 +291,20 @@ def test_write_resources_to_dir_success_and_oserror(tmp_path, monkeypatch):
     assert (outdir / "01_Patient.json").exists()
     assert (outdir / "02_Encounter.json").exists()
 
-    # Now simulate an OSError only for the 3rd file write, using the ORIGINAL write_text
-    orig_write_text = Path.write_text
-
+    # Now simulate an OSError only for the 3rd file write
     call_count = {"n": 0}
 
-    def guarded_write_text(self, txt, *, encoding="utf-8"):
+    def guarded_write_text(path, txt, *, encoding="utf-8"):
         call_count["n"] += 1
         if call_count["n"] == 3:
             raise OSError("disk-full")
-        return orig_write_text(self, txt, encoding=encoding)
+        return path.write_text(txt, encoding=encoding)
 
-    monkeypatch.setattr(Path, "write_text", guarded_write_text)
     with pytest.raises(cli.HL7FHIRToolError, match=r"^Failed to write"):
-        cli._write_resources_to_dir([R1(), R2(), R1()], tmp_path / "outB", pretty=False)
-
-    # clean up with monkeypatch
-    monkeypatch.setattr(Path, "write_text", orig_write_text, raising=False)
+        cli._write_resources_to_dir(
+            [R1(), R2(), R1()], tmp_path / "outB", False, writer=guarded_write_text
+        )
+    assert (tmp_path / "outB" / "02_Encounter.json").exists()
 
 
 # ------------------------------------------------------------------------------
@@ -489,15 +469,15 @@ def test_parse_hl7_for_cli_covers_label_make_msg(monkeypatch, label, make_msg):
 # ------------------------------------------------------------------------------
 
 
-def test_cmd_transform_no_transformer_registered(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_cmd_transform_no_transformer_registered(hl7_file, monkeypatch):
     monkeypatch.setattr("hl7_fhir_tool.cli.get_transformer", lambda _msg: None)
-    code = cli.main(["transform", str(p)])
+    code = cli.main(["transform", str(hl7_file)])
     assert code == cli.EXIT_ERR
 
 
-def test_cmd_transform_default_output_dir_validated_and_writes(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_cmd_transform_default_output_dir_validated_and_writes(
+    tmp_path, hl7_file, monkeypatch
+):
 
     class Cfg:
         def __init__(self, d):
@@ -517,14 +497,13 @@ def test_cmd_transform_default_output_dir_validated_and_writes(tmp_path, monkeyp
             return [R()]
 
     monkeypatch.setattr("hl7_fhir_tool.cli.get_transformer", lambda _msg: Xformer())
-    code = cli.main(["transform", str(p)])  # not --stdout -> write path
+    code = cli.main(["transform", str(hl7_file)])  # not --stdout -> write path
     assert code == cli.EXIT_OK
     assert (default_dir / "01_Patient.json").exists()
 
 
-def test_cmd_transform_list_prints_and_exits_ok(tmp_path, capsys):
-    p = write_hl7(tmp_path)
-    code = cli.main(["transform", str(p), "--list"])
+def test_cmd_transform_list_prints_and_exits_ok(hl7_file, capsys):
+    code = cli.main(["transform", str(hl7_file), "--list"])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     assert "ADT^A01" in out
@@ -535,33 +514,29 @@ def test_cmd_transform_list_prints_and_exits_ok(tmp_path, capsys):
 # ------------------------------------------------------------------------------
 
 
-def test_cmd_to_rdf_stdout(tmp_path, capsys):
-    p = write_hl7(tmp_path)
-    code = cli.main(["to-rdf", str(p), "--stdout"])
+def test_cmd_to_rdf_stdout(hl7_file, capsys):
+    code = cli.main(["to-rdf", str(hl7_file), "--stdout"])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     assert "@prefix hft:" in out
 
 
-def test_cmd_to_rdf_writes_file(tmp_path):
-    p = write_hl7(tmp_path)
+def test_cmd_to_rdf_writes_file(tmp_path, hl7_file):
     out_dir = tmp_path / "rdf_out"
-    code = cli.main(["to-rdf", str(p), "-o", str(out_dir)])
+    code = cli.main(["to-rdf", str(hl7_file), "-o", str(out_dir)])
     assert code == cli.EXIT_OK
     ttl = out_dir / "msg.ttl"
     assert ttl.exists()
     assert "@prefix hft:" in ttl.read_text(encoding="utf-8")
 
 
-def test_cmd_to_rdf_no_transformer(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_cmd_to_rdf_no_transformer(hl7_file, monkeypatch):
     monkeypatch.setattr("hl7_fhir_tool.cli.get_transformer", lambda _msg: None)
-    code = cli.main(["to-rdf", str(p), "--stdout"])
+    code = cli.main(["to-rdf", str(hl7_file), "--stdout"])
     assert code == cli.EXIT_ERR
 
 
-def test_cmd_to_rdf_write_fails(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_cmd_to_rdf_write_fails(tmp_path, hl7_file, monkeypatch):
     out_dir = tmp_path / "rdf_out"
 
     real_write = Path.write_text
@@ -572,7 +547,7 @@ def test_cmd_to_rdf_write_fails(tmp_path, monkeypatch):
         return real_write(self, *a, **k)
 
     monkeypatch.setattr(Path, "write_text", boom)
-    code = cli.main(["to-rdf", str(p), "-o", str(out_dir)])
+    code = cli.main(["to-rdf", str(hl7_file), "-o", str(out_dir)])
     assert code == cli.EXIT_ERR
 
 
@@ -617,6 +592,19 @@ def test_build_fhir_bundle_json_decode_error():
         cli._build_fhir_bundle_json([R()], pretty=False)
 
 
+def test_build_fhir_bundle_json_escapes_non_ascii():
+    # Bundle JSON may go to stdout, so it must not depend on its encoding
+    class R:
+        resource_type = "Patient"
+
+        def model_dump_json(self, **k):
+            return '{"resourceType":"Patient","name":[{"family":"Müller"}]}'
+
+    result = cli._build_fhir_bundle_json([R()], pretty=False)
+    assert "M\\u00fcller" in result
+    assert result.isascii()
+
+
 # ------------------------------------------------------------------------------
 # _load_resources_from_bundle_json
 # ------------------------------------------------------------------------------
@@ -710,9 +698,8 @@ def test_load_resources_from_bundle_json_no_validate_method(monkeypatch):
 # ------------------------------------------------------------------------------
 
 
-def test_cmd_to_fhir_stdout(tmp_path, capsys):
-    p = write_hl7(tmp_path)
-    code = cli.main(["to-fhir", str(p), "--stdout"])
+def test_cmd_to_fhir_stdout(hl7_file, capsys):
+    code = cli.main(["to-fhir", str(hl7_file), "--stdout"])
     out, _ = capsys.readouterr()
     assert code == cli.EXIT_OK
     bundle = _json.loads(out)
@@ -720,10 +707,9 @@ def test_cmd_to_fhir_stdout(tmp_path, capsys):
     assert len(bundle["entry"]) > 0
 
 
-def test_cmd_to_fhir_writes_file(tmp_path):
-    p = write_hl7(tmp_path)
+def test_cmd_to_fhir_writes_file(tmp_path, hl7_file):
     out_dir = tmp_path / "fhir_out"
-    code = cli.main(["to-fhir", str(p), "-o", str(out_dir)])
+    code = cli.main(["to-fhir", str(hl7_file), "-o", str(out_dir)])
     assert code == cli.EXIT_OK
     bundle_file = out_dir / "msg.json"
     assert bundle_file.exists()
@@ -732,6 +718,19 @@ def test_cmd_to_fhir_writes_file(tmp_path):
     assert len(bundle["entry"]) > 0
 
 
+def test_cmd_to_fhir_file_matches_stdout_without_orjson(
+    tmp_path, hl7_file, capsys, monkeypatch
+):
+    # Without the fast extra, -o writes the same text --stdout prints
+    monkeypatch.setattr(json_utils, "get_orjson", lambda: None)
+    assert cli.main(["to-fhir", str(hl7_file), "--stdout"]) == cli.EXIT_OK
+    out, _ = capsys.readouterr()
+    out_dir = tmp_path / "fhir_out"
+    assert cli.main(["to-fhir", str(hl7_file), "-o", str(out_dir)]) == cli.EXIT_OK
+    # stdout adds a trailing newline; the file body is otherwise identical
+    assert (out_dir / "msg.json").read_text(encoding="utf-8") == out[:-1]
+
+
 def test_cmd_to_fhir_no_transformer(tmp_path):
     p = tmp_path / "unknown.hl7"
     p.write_text(
@@ -744,18 +743,17 @@ def test_cmd_to_fhir_no_transformer(tmp_path):
     assert code == cli.EXIT_ERR
 
 
-def test_cmd_to_fhir_write_fails(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_cmd_to_fhir_write_fails(tmp_path, hl7_file, monkeypatch):
     out_dir = tmp_path / "fhir_out"
-    real_write = Path.write_text
+    real_write = Path.write_bytes
 
     def boom(self, *a, **k):
         if self.suffix == ".json":
             raise OSError("disk-full")
         return real_write(self, *a, **k)
 
-    monkeypatch.setattr(Path, "write_text", boom)
-    code = cli.main(["to-fhir", str(p), "-o", str(out_dir)])
+    monkeypatch.setattr(Path, "write_bytes", boom)
+    code = cli.main(["to-fhir", str(hl7_file), "-o", str(out_dir)])
     assert code == cli.EXIT_ERR
 
 
@@ -764,10 +762,9 @@ def test_cmd_to_fhir_write_fails(tmp_path, monkeypatch):
 # ------------------------------------------------------------------------------
 
 
-def test_cmd_to_rdf_reads_fhir_bundle_json(tmp_path):
-    p = write_hl7(tmp_path)
+def test_cmd_to_rdf_reads_fhir_bundle_json(tmp_path, hl7_file):
     fhir_dir = tmp_path / "fhir"
-    assert cli.main(["to-fhir", str(p), "-o", str(fhir_dir)]) == cli.EXIT_OK
+    assert cli.main(["to-fhir", str(hl7_file), "-o", str(fhir_dir)]) == cli.EXIT_OK
     bundle_file = fhir_dir / "msg.json"
     rdf_dir = tmp_path / "rdf_out"
     code = cli.main(["to-rdf", str(bundle_file), "-o", str(rdf_dir)])
@@ -782,13 +779,12 @@ def test_cmd_to_rdf_reads_fhir_bundle_json(tmp_path):
 # ------------------------------------------------------------------------------
 
 
-def test_main_keyboardinterrupt(tmp_path, monkeypatch):
-    p = write_hl7(tmp_path)
+def test_main_keyboardinterrupt(hl7_file, monkeypatch):
     monkeypatch.setattr(
         "hl7_fhir_tool.cli._cmd_parse_hl7",
-        lambda _: (_ for _ in ()).throw(KeyboardInterrupt),
+        _raiser(KeyboardInterrupt()),
     )
-    code = cli.main(["parse-hl7", str(p)])
+    code = cli.main(["parse-hl7", str(hl7_file)])
     assert code == cli.EXIT_ERR
 
 
@@ -813,18 +809,27 @@ def test_main_unknown_command_path(monkeypatch):
 # ------------------------------------------------------------------------------
 
 
-def test_main_dunder_name_runs_ok(monkeypatch):
-    # Execute module as __main__ cleanly
-    for k in list(sys.modules.keys()):
-        if k.startswith("hl7_fhir_tool"):
-            sys.modules.pop(k, None)
+def test_main_reads_injected_stdin(capsys):
+    # "-" reads the stream passed to main(); sys.stdin is left alone
+    code = cli.main(["parse-hl7", "-"], stdin=io.StringIO(HL7_TEXT))
+    out, _ = capsys.readouterr()
+    assert code == cli.EXIT_OK
+    assert "PID|" in out
+
+
+@pytest.mark.parametrize("cmd", ["transform", "to-fhir", "to-rdf"])
+def test_main_threads_stdin_to_command_handlers(cmd, capsys):
+    code = cli.main([cmd, "-", "--stdout"], stdin=io.StringIO(HL7_TEXT))
+    out, _ = capsys.readouterr()
+    assert code == cli.EXIT_OK
+    assert out.strip()
+
 
-    old_argv, old_stdin = sys.argv, sys.stdin
-    try:
-        sys.argv = ["hl7-fhir", "parse-hl7", "-"]
-        sys.stdin = io.StringIO(HL7_TEXT)
-        with pytest.raises(SystemExit) as e:
-            runpy.run_module("hl7_fhir_tool.cli", run_name="__main__")
-        assert e.value.code == 0
-    finally:
-        sys.argv, sys.stdin = old_argv, old_stdin
+def test_entrypoint_exits_with_main_code(monkeypatch):
+    # _entrypoint() is what `python -m hl7_fhir_tool.cli` runs; it reads the
+    # real sys.argv/sys.stdin, so this test patches them
+    monkeypatch.setattr(sys, "argv", ["hl7-fhir", "parse-hl7", "-"])
+    monkeypatch.setattr(sys, "stdin", io.StringIO(HL7_TEXT))
+    with pytest.raises(SystemExit) as e:
+        cli._entrypoint()
+    assert e.value.code == 0
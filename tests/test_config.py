@@ -9,7 +9,7 @@ from pathlib import Path
 import pytest
 import yaml
 
-from hl7_fhir_tool.config import AppConfig, load_config
+from hl7_fhir_tool.config import _YAML_LOADER, AppConfig, load_config
 
 
 def test_load_config_defaults_when_path_is_none():
@@ -18,35 +18,55 @@ def test_load_config_defaults_when_path_is_none():
     assert cfg.default_output_dir == Path("outputs")
 
 
-def test_load_config_reads_default_output_dir(tmp_path):
-    p = tmp_path / "config.yaml"
-    p.write_text("default_output_dir: custom_out\n")
-    cfg = load_config(p)
-    assert cfg.default_output_dir == Path("custom_out")
+# (file name, YAML text) written once per session by the config_files fixture
+CONFIG_TEXTS = {
+    "config.yaml": "default_output_dir: custom_out\n",
+    "empty.yaml": "",
+    # YAML list at top level, not a mapping/dict
+    "bad.yaml": "- item1\n- item2\n",
+    "invalid.yaml": "default_output_dir: [unclosed_list\n",
+}
 
 
-def test_load_config_empty_file_uses_defaults(tmp_path):
-    p = tmp_path / "empty.yaml"
-    p.write_text("")
-    cfg = load_config(p)
-    assert cfg.default_output_dir == Path("outputs")
+@pytest.fixture(scope="session")
+def config_files(tmp_path_factory):
+    d = tmp_path_factory.mktemp("config")
+    out = {}
+    for name, text in CONFIG_TEXTS.items():
+        out[name] = d / name
+        out[name].write_text(text)
+    return out
 
 
-def test_load_config_non_mapping_raises_type_error(tmp_path):
-    p = tmp_path / "bad.yaml"
-    # YAML list at top level, not a mapping/dict
-    p.write_text("- item1\n- item2\n")
-    with pytest.raises(
-        TypeError, match=r"^Config file must contain a mapping at top level"
-    ):
-        load_config(p)
-
-
-def test_load_config_invalid_yaml_raises_yaml_error(tmp_path):
-    p = tmp_path / "invalid.yaml"
-    p.write_text("default_output_dir: [unclosed_list\n")
-    with pytest.raises(yaml.YAMLError, match=r"^while parsing a flow sequence"):
-        load_config(p)
+@pytest.mark.parametrize(
+    "name,expected_dir",
+    [("config.yaml", Path("custom_out")), ("empty.yaml", Path("outputs"))],
+    ids=["reads_default_output_dir", "empty_file_uses_defaults"],
+)
+def test_load_config_output_dir(config_files, name, expected_dir):
+    cfg = load_config(config_files[name])
+    assert cfg.default_output_dir == expected_dir
+
+
+@pytest.mark.parametrize(
+    "name,exc,match",
+    [
+        (
+            "bad.yaml",
+            TypeError,
+            r"^Config file must contain a mapping at top level",
+        ),
+        ("invalid.yaml", yaml.YAMLError, r"^while parsing a flow sequence"),
+    ],
+    ids=["non_mapping_raises_type_error", "invalid_yaml_raises_yaml_error"],
+)
+def test_load_config_bad_file_raises(config_files, name, exc, match):
+    with pytest.raises(exc, match=match):
+        load_config(config_files[name])
+
+
+def test_load_config_prefers_libyaml_loader():
+    assert _YAML_LOADER is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def test_appconfig_is_immutable():
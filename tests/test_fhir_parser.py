@@ -5,34 +5,190 @@ Tests for hl7_fhir_tool/fhir_parser.
 
 import json
 import pytest
+import re
+import sys
+import tracemalloc
 
-from fhir.resources.patient import Patient
 from fhir.resources.resource import Resource
+from functools import lru_cache
 from lxml import etree
+from operator import methodcaller
 from pathlib import Path
-from pydantic import BaseModel
+from types import SimpleNamespace
 
+from hl7_fhir_tool import fhir_parser, json_utils
 from hl7_fhir_tool.fhir_parser import (
     KNOWN_TYPES,
+    _BASE_CONSTRUCT,
+    _LazyTypeMap,
+    _lookup,
+    _override_types,
+    _resolve_base_construct,
+    _XML_PARSER,
+    _construct_base,
     _ensure_resource_type_attr,
+    _field_names,
+    _parse_fhir_json,
+    _parse_fhir_xml,
+    _xml_resource_data,
     _xml_to_obj,
+    iter_fhir_xml_entries,
     load_fhir_json,
+    load_fhir_json_many,
     load_fhir_xml,
     _inject_extras,
 )
 from hl7_fhir_tool.exceptions import ParseError
 
+# Whole module is parse-heavy; CI can fan it out with `-n auto -m parser`
+pytestmark = pytest.mark.parser
+
+# ------------------------------------------------------------------------------
+# globals
+# ------------------------------------------------------------------------------
+
+# Two <identifier> blocks, swapped in for the fixture Patient's <id/> element
+_TWO_IDS = (
+    b'<identifier><value value="A"/></identifier>'
+    b'<identifier><value value="B"/></identifier>'
+)
+
+# Two identical <coding> subtrees followed by a differing one
+_CODED_XML = (
+    "<r><coding><system value='s'/><code value='c'/></coding>"
+    "<coding><system value='s'/><code value='c'/></coding>"
+    "<coding><system value='s'/><code value='d'/></coding></r>"
+)
+
+# pytest.raises(match=...) patterns, compiled once
+_RE_NO_CONSTRUCT = re.compile(
+    r"^failed to construct base Resource from XML: Resource does not "
+    "expose model_construct or construct"
+)
+_RE_MISSING = re.compile(r"^file does not exist")
+_RE_NOT_FILE = re.compile(r"^not a file")
+_RE_INVALID_JSON = re.compile(r"^invalid JSON")
+_RE_NOT_OBJECT = re.compile(r"^FHIR JSON must be an object at the top level")
+_RE_JSON_VALIDATION = re.compile(r"^FHIR JSON validation error")
+_RE_NOT_PATH = re.compile(r"^path must be pathlib\.Path")
+_RE_READ_JSON = re.compile(r"^failed to read JSON")
+_RE_BUILD_XML = re.compile(r"^failed to build FHIR model from XML")
+_RE_BUILD = re.compile(r"^failed to build FHIR model")
+_RE_UNKNOWN_BASE = re.compile(r"^failed to construct base Resource for unknown")
+_RE_XML_BOOM = re.compile(r"^invalid XML: boom")
+_RE_INVALID_XML = re.compile(r"^invalid XML")
+_RE_XML_VALIDATION = re.compile(r"^FHIR XML validation error")
+_RE_STUB_NO_CONSTRUCT = re.compile(
+    r"^_NoConstructStub does not expose model_construct or construct"
+)
+
+# ------------------------------------------------------------------------------
+# lightweight model stubs
+# ------------------------------------------------------------------------------
+
+
+class _V2Stub:
+    # Exposes only the pydantic v2 constructor
+    @classmethod
+    def model_construct(cls, **data):
+        return SimpleNamespace(via="model_construct", data=data)
+
+
+class _V1Stub:
+    # Exposes only the pydantic v1 constructor
+    @classmethod
+    def construct(cls, **data):
+        return SimpleNamespace(via="construct", data=data)
+
+
+class _NoConstructStub:
+    pass
+
+
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def xml_obj():
+    # _xml_to_obj memoized by XML source for the module, so each distinct
+    # document is parsed and converted once; tests must treat the returned
+    # object as read-only because later callers get the same one
+    @lru_cache(maxsize=None)
+    def _convert(xml):
+        return _xml_to_obj(etree.fromstring(xml, _XML_PARSER))
+
+    return _convert
+
+
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
-def _to_doc(res):
-    return (
-        res.model_dump(by_alias=True)
-        if hasattr(res, "model_dump")
-        else res.dict(by_alias=True)
-    )
+def _raiser(exc):
+    # Stand-in callable that raises exc whatever it is called with
+    def _raise(*args, **kwargs):
+        raise exc
+
+    return _raise
+
+
+def _raw(xml):
+    # Normalized payload the XML loader would hand to the model, no dump needed
+    return _xml_resource_data(etree.fromstring(xml, _XML_PARSER))
+
+
+# Resource -> dict dumper, resolved once: pydantic v2 model_dump, else v1 dict.
+_DUMP = methodcaller(
+    "model_dump" if hasattr(Resource, "model_dump") else "dict", by_alias=True
+)
+
+
+# ------------------------------------------------------------------------------
+# KNOWN_TYPES
+# ------------------------------------------------------------------------------
+
+
+def test_lazy_type_map_imports_on_first_lookup(patient_cls):
+    types = _LazyTypeMap({"Patient": "fhir.resources.patient"})
+    assert types._loaded == {}
+    assert "Patient" in types and "Other" not in types
+
+    assert types["Patient"] is patient_cls
+    assert types._loaded == {"Patient": patient_cls}
+    assert types.get("Other") is None
+
+
+def test_lazy_type_map_is_read_only():
+    types = _LazyTypeMap({"Patient": "fhir.resources.patient"})
+    assert list(types) == ["Patient"]
+    assert len(types) == 1
+
+    with pytest.raises(TypeError):
+        types["Patient"] = Resource  # type: ignore[index]
+    with pytest.raises(TypeError):
+        del types["Patient"]  # type: ignore[attr-defined]
+
+
+def test_override_types_takes_precedence_and_resets(patient_cls):
+    assert _lookup("Patient") is patient_cls
+    assert _lookup("Custom") is None
+
+    with _override_types({"Patient": Resource, "Custom": Resource}):
+        assert _lookup("Patient") is Resource
+        assert _lookup("Custom") is Resource
+        assert _lookup("Observation") is KNOWN_TYPES["Observation"]
+
+    assert _lookup("Patient") is patient_cls
+    assert _lookup("Custom") is None
+
+
+def test_known_types_resolve_to_fhir_models(patient_cls):
+    assert set(KNOWN_TYPES) == {"Patient", "Observation", "Bundle"}
+    assert KNOWN_TYPES["Patient"] is patient_cls
+    assert all(issubclass(cls, Resource) for cls in KNOWN_TYPES.values())
 
 
 # ------------------------------------------------------------------------------
@@ -162,94 +318,107 @@ def test_ensure_resource_type_attr_no_expected_does_nothing():
 # ------------------------------------------------------------------------------
 
 
-def test_xml_to_obj_promotes_to_list():
+def test_xml_to_obj_promotes_to_list(xml_obj):
     xml = "<root><child value='a'/><child value='b'/><child value='c'/></root>"
-    root = etree.fromstring(xml)
-    out = _xml_to_obj(root)
+    out = xml_obj(xml)
     assert isinstance(out["child"], list)
     assert out["child"] == ["a", "b", "c"]
 
 
-def test_xml_to_obj_first_repeat_promotes_scalar_to_list():
+def test_xml_to_obj_first_repeat_promotes_scalar_to_list(xml_obj):
     xml = "<root><child><grand value='x'/></child><child value='y'/></root>"
-    root = etree.fromstring(xml)
-    out = _xml_to_obj(root)
+    out = xml_obj(xml)
     # First child is a dict (scalar promotion), second makes it a list
     assert isinstance(out["child"], list)
     assert out["child"][0] == {"grand": "x"}
     assert out["child"][1] == "y"
 
 
+def test_xml_to_obj_keeps_first_appearance_order_and_skips_comments(xml_obj):
+    xml = "<r><a value='1'/><!-- c --><b value='2'/><a value='3'/><c/></r>"
+    out = xml_obj(xml)
+    assert list(out) == ["a", "b", "c"]
+    assert out == {"a": ["1", "3"], "b": "2", "c": {}}
+
+
+def test_xml_to_obj_handles_trees_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() + 100
+    xml = "<n>" * depth + "<leaf value='x'/>" + "</n>" * depth
+    parser = etree.XMLParser(huge_tree=True)
+    out = _xml_to_obj(etree.fromstring(xml, parser))
+    for _ in range(depth - 1):
+        out = out["n"]
+    assert out == {"leaf": "x"}
+
+
+def test_xml_to_obj_builds_equal_copies_of_identical_subtrees(xml_obj):
+    first, second, third = xml_obj(_CODED_XML)["coding"]
+    assert first == second
+    assert first is not second
+    assert third == {"system": "s", "code": "d"}
+
+
+def test_xml_parser_keeps_entities_unresolved_and_drops_blank_text():
+    xml = b'<!DOCTYPE X [<!ENTITY e "boom">]><X>\n  <y>&e;</y>\n</X>'
+    root = etree.fromstring(xml, _XML_PARSER)
+    assert root.text is None
+    assert root[0].text is None
+    assert "boom" not in etree.tostring(root).decode()
+
+
 # ------------------------------------------------------------------------------
 # _construct_base
 # ------------------------------------------------------------------------------
 
 
-def test_construct_base_v2_path_json(tmp_path, monkeypatch):
+def test_construct_base_v2_path():
     """
-    Cover the v2 path in _construct_base: Resource.model_construct(**data).
-    We re-enable it and make it delegate to a real BaseModel construct to produce a Resource.
+    Cover the v2 path in _construct_base: base_cls.model_construct(**data).
     """
-    # Ensure v1 path is not taken
-    monkeypatch.setattr(Resource, "construct", None, raising=False)
+    res = _construct_base({"resourceType": "CustomThing", "id": "x1"}, _V2Stub)
+    assert res.via == "model_construct"
+    assert res.data == {"resourceType": "CustomThing", "id": "x1"}
 
-    # Provide a v2-like model_construct that binds via BaseModel and returns a Resource
-    def _mc(**data):
-        bound = BaseModel.model_construct.__get__(Resource, type(Resource))
-        return bound(**data)
 
-    monkeypatch.setattr(Resource, "model_construct", _mc, raising=False)
-
-    obj = {"resourceType": "CustomThing", "id": "x1"}
-    p = tmp_path / "custom_v2.json"
-    p.write_text(json.dumps(obj), encoding="utf-8")
-
-    res = load_fhir_json(p)
-    assert getattr(res, "resource_type", None) == "CustomThing"
-    # sanity: field carried through
-    assert getattr(res, "id", None) == "x1"
-
-
-def test_construct_base_v1_path_json(tmp_path, monkeypatch):
+def test_construct_base_v1_path():
     """
-    Cover the v1 path in _construct_base: Resource.construct(**data).
+    Cover the v1 path in _construct_base: base_cls.construct(**data).
     """
-    # Disable v2; enable v1
-    monkeypatch.setattr(Resource, "model_construct", None, raising=False)
+    res = _construct_base({"resourceType": "LegacyThing", "id": "y1"}, _V1Stub)
+    assert res.via == "construct"
+    assert res.data == {"resourceType": "LegacyThing", "id": "y1"}
 
-    def _construct(**data):
-        bound = BaseModel.model_construct.__get__(Resource, type(Resource))
-        return bound(**data)
 
-    monkeypatch.setattr(Resource, "construct", _construct, raising=False)
+def test_resolve_base_construct_is_cached_per_class():
+    """
+    The v2/v1 probe runs once per class; later calls reuse the same callable.
+    """
+    first = _resolve_base_construct(_V1Stub)
+    assert _resolve_base_construct(_V1Stub) is first
+    assert _resolve_base_construct() is _BASE_CONSTRUCT
 
-    obj = {"resourceType": "LegacyThing", "id": "y1"}
-    p = tmp_path / "legacy_v1.json"
-    p.write_text(json.dumps(obj), encoding="utf-8")
 
-    res = load_fhir_json(p)
-    assert getattr(res, "resource_type", None) == "LegacyThing"
-    assert getattr(res, "id", None) == "y1"
+def test_construct_base_no_apis_error():
+    """
+    Cover the final error branch: neither model_construct nor construct.
+    """
+    with pytest.raises(ParseError, match=_RE_STUB_NO_CONSTRUCT):
+        _construct_base({"resourceType": "X"}, _NoConstructStub)
 
 
-def test_construct_base_no_apis_error_xml(tmp_path, monkeypatch):
+def test_construct_base_no_apis_error_xml(monkeypatch):
     """
-    Cover the final error branch: no model_construct/construct anywhere.
+    The loader wraps the missing-constructor error for the real Resource.
     """
-    monkeypatch.setattr(Resource, "model_construct", None, raising=False)
-    monkeypatch.setattr(Resource, "construct", None, raising=False)
-    monkeypatch.setattr(BaseModel, "model_construct", None, raising=False)
+    monkeypatch.setattr(fhir_parser, "_BASE_CONSTRUCT", None)
 
     xml = '<Unknown xmlns="http://hl7.org/fhir"><id value="z"/></Unknown>'
-    p = tmp_path / "none_left.xml"
-    p.write_text(xml, encoding="utf-8")
 
     with pytest.raises(
         ParseError,
-        match=r"^failed to construct base Resource from XML: Resource does not "
-        "expose model_construct or construct",
+        match=_RE_NO_CONSTRUCT,
     ):
-        load_fhir_xml(p)
+        _parse_fhir_xml(xml.encode())
 
 
 # ------------------------------------------------------------------------------
@@ -311,6 +480,14 @@ def test_inject_extras_v1_fallback_dict_update_and_attr_set():
     assert getattr(inst, "bar") == "baz"
 
 
+def test_field_names_cached_per_class():
+    names = _field_names(Resource)
+    assert isinstance(names, frozenset)
+    assert {"id", "meta"} <= names
+    assert _field_names(Resource) is names
+    assert _field_names(int) == frozenset()
+
+
 def test_inject_extras_early_return_when_no_extras():
     """
     Cover early return when extras is empty.
@@ -352,72 +529,78 @@ def test_inject_extras_attr_set_failure_is_ignored():
 
 def test_load_fhir_json_raises_on_missing_file(tmp_path):
     missing = tmp_path / "nope.json"
-    with pytest.raises(ParseError, match=r"^file does not exist"):
+    with pytest.raises(ParseError, match=_RE_MISSING):
         load_fhir_json(missing)
 
 
 def test_load_fhir_json_raises_on_directory(tmp_path):
     d = tmp_path / "adir"
     d.mkdir()
-    with pytest.raises(ParseError, match=r"^not a file"):
+    with pytest.raises(ParseError, match=_RE_NOT_FILE):
         load_fhir_json(d)
 
 
-def test_load_fhir_json_raises_on_invalid_json(tmp_path):
-    p = tmp_path / "bad.json"
-    p.write_text("{ not-valid-json")
-    with pytest.raises(ParseError, match=r"^invalid JSON"):
-        load_fhir_json(p)
+def test_load_fhir_json_raises_on_invalid_json():
+    with pytest.raises(ParseError, match=_RE_INVALID_JSON):
+        _parse_fhir_json("{ not-valid-json")
 
 
-def test_load_fhir_json_raises_on_non_object_top_level(tmp_path):
-    p = tmp_path / "list.json"
-    p.write_text(json.dumps([{"resourceType": "Patient"}]))
-    with pytest.raises(
-        ParseError, match=r"^FHIR JSON must be an object at the top level"
-    ):
-        load_fhir_json(p)
+def test_load_fhir_json_raises_on_non_object_top_level():
+    with pytest.raises(ParseError, match=_RE_NOT_OBJECT):
+        _parse_fhir_json(json.dumps([{"resourceType": "Patient"}]))
 
 
-def test_load_fhir_json_patient_returns_patient(tmp_path):
-    p = tmp_path / "patient.json"
-    p.write_text(json.dumps({"resourceType": "Patient", "id": "p1"}))
-    f = load_fhir_json(p)
-    assert isinstance(f, Patient)
+def test_load_fhir_json_patient_returns_patient(patient_json_obj, patient_cls):
+    f = _parse_fhir_json(json.dumps({**patient_json_obj}))
+    assert isinstance(f, patient_cls)
     assert f.id == "p1"
 
 
-def test_load_fhir_json_unknown_type_returns_base_resource(tmp_path):
-    p = tmp_path / "custom.json"
-    p.write_text(json.dumps({"resourceType": "CustomResource", "id": "x"}))
-    r = load_fhir_json(p)
+def test_load_fhir_json_unknown_type_returns_base_resource():
+    r = _parse_fhir_json(json.dumps({"resourceType": "CustomResource", "id": "x"}))
 
     # Should fall back to generic Resource
     assert isinstance(r, Resource)
     assert type(r) is Resource
 
-    if hasattr(r, "model_dump"):  # pydantic v2
-        data = r.model_dump(by_alias=True)
-    else:  # pydantic v1
-        data = r.dict(by_alias=True)
+    data = _DUMP(r)
 
     # resourceType may normalize to "Resource" on the base model
     assert data["resourceType"] in ("CustomResource", "Resource")
     assert data["id"] == "x"
 
 
-def test_load_fhir_json_validation_error(tmp_path):
+def test_load_fhir_json_validation_error(patient_json_obj):
     # Intentionally wrong type for a known field to provoke validation error.
     # 'active' should be a boolean if present; set it to a dict.
-    p = tmp_path / "bad_patient.json"
-    p.write_text(json.dumps({"resourceType": "Patient", "active": {"nope": True}}))
-    with pytest.raises(ParseError, match=r"^FHIR JSON validation error"):
-        load_fhir_json(p)
+    with pytest.raises(ParseError, match=_RE_JSON_VALIDATION):
+        _parse_fhir_json(json.dumps({**patient_json_obj, "active": {"nope": True}}))
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    # Run a test against both backends; "stdlib" hides orjson from the parser
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_utils, "get_orjson", lambda: None)
+    return request.param
+
+
+def test_parse_fhir_json_accepts_str_and_bytes(json_backend, patient_cls):
+    doc = '{"resourceType": "Patient", "id": "p1", "name": [{"family": "Müller"}]}'
+    for payload in (doc, doc.encode("utf-8")):
+        p = _parse_fhir_json(payload)
+        assert isinstance(p, patient_cls)
+        assert p.name[0].family == "Müller"
+
+
+def test_parse_fhir_json_invalid_utf8_raises_parse_error(json_backend):
+    with pytest.raises(ParseError, match=_RE_INVALID_JSON):
+        _parse_fhir_json(b'{"resourceType": "\xff"}')
 
 
 def test_load_fhir_json_type_check_and_oserror(tmp_path, monkeypatch):
     # Type check: not a Path -> ParseError from _ensure_file()
-    with pytest.raises(ParseError, match=r"^path must be pathlib\.Path"):
+    with pytest.raises(ParseError, match=_RE_NOT_PATH):
         load_fhir_json("not-a-path")
 
     # OSError on read: exercise the except OSError path in load_fhir_json
@@ -427,67 +610,209 @@ def test_load_fhir_json_type_check_and_oserror(tmp_path, monkeypatch):
     def boom(*args, **kwargs):
         raise OSError("boom")
 
-    monkeypatch.setattr(Path, "read_text", boom)
-    with pytest.raises(ParseError, match=r"^failed to read JSON"):
+    monkeypatch.setattr(Path, "read_bytes", boom)
+    with pytest.raises(ParseError, match=_RE_READ_JSON):
         load_fhir_json(p)
 
 
-def test_load_fhir_json_known_type_build_error(tmp_path, monkeypatch):
+def test_load_fhir_json_known_type_build_error(patient_json_obj):
     class RaisingPatient:
         def __init__(self, a, **k):
             raise RuntimeError("explode")
 
-    monkeypatch.setitem(KNOWN_TYPES, "Patient", RaisingPatient)
-
-    p = tmp_path / "patient.json"
-    p.write_text('{"resourceType": "Patient"}', encoding="utf-8")
-
-    with pytest.raises(ParseError, match=r"^failed to build FHIR model"):
-        load_fhir_json(p)
+    with (
+        _override_types({"Patient": RaisingPatient}),
+        pytest.raises(ParseError, match=_RE_BUILD),
+    ):
+        _parse_fhir_json(json.dumps({**patient_json_obj}))
 
 
-def test_load_fhir_json_unknown_type_construct_faulure(tmp_path, monkeypatch):
-    # Force the unknown-type path and make Resource.model_construct raise.
+def test_load_fhir_json_unknown_type_construct_faulure(monkeypatch):
+    # Force the unknown-type path and make the base constructor raise.
     def mc_raise(**kwargs):
         raise RuntimeError("boom")
 
-    monkeypatch.setattr(Resource, "model_construct", staticmethod(mc_raise))
+    monkeypatch.setattr(fhir_parser, "_BASE_CONSTRUCT", mc_raise)
 
-    p = tmp_path / "strange.json"
-    p.write_text('{"resourceType":"StrangeThing", "id":"x"}', encoding="utf-8")
+    with pytest.raises(ParseError, match=_RE_UNKNOWN_BASE):
+        _parse_fhir_json('{"resourceType":"StrangeThing", "id":"x"}')
+
+
+def test_load_fhir_json_unknown_type_uses_base_constructor(monkeypatch):
+    # Unknown types go through the constructor resolved once at import
+    calls = []
+
+    def spy(**kwargs):
+        calls.append(kwargs)
+        return Resource.model_construct(**kwargs)
+
+    monkeypatch.setattr(fhir_parser, "_BASE_CONSTRUCT", spy)
+
+    r = _parse_fhir_json('{"resourceType":"WeirdThing", "id":"w"}')
+    assert isinstance(r, Resource)
+    assert calls == [{"resourceType": "WeirdThing", "id": "w"}]
+    doc = _DUMP(r)
+    assert doc.get("id") == "w"
+
+
+# ------------------------------------------------------------------------------
+# load_fhir_json_many
+# ------------------------------------------------------------------------------
+
+
+def _write_json_docs(tmp_path, docs):
+    paths = []
+    for i, doc in enumerate(docs):
+        p = tmp_path / f"doc{i}.json"
+        p.write_text(json.dumps(doc), encoding="utf-8")
+        paths.append(p)
+    return paths
+
+
+def test_load_fhir_json_many_batch(tmp_path, monkeypatch, patient_json_obj):
+    docs = [
+        {**patient_json_obj, "id": "a"},
+        {"resourceType": "CustomResource", "id": "x"},
+        {**patient_json_obj, "id": "b", "active": True},
+        {"resourceType": "Observation", "status": "final", "code": {"text": "t"}},
+    ]
+    paths = _write_json_docs(tmp_path, docs)
+    expected = [_DUMP(load_fhir_json(p)) for p in paths]
+
+    # Known types must go through the batch adapter, not one by one
+    monkeypatch.setattr(fhir_parser, "_construct_known", _raiser(AssertionError))
+    got = load_fhir_json_many(paths)
+
+    assert [type(r).__name__ for r in got] == [
+        "Patient",
+        "Resource",
+        "Patient",
+        "Observation",
+    ]
+    assert [_DUMP(r) for r in got] == expected
 
-    with pytest.raises(
-        ParseError, match=r"^failed to construct base Resource for unknown"
-    ):
-        load_fhir_json(p)
 
+def test_load_fhir_json_many_reports_first_invalid_document(tmp_path, patient_json_obj):
+    docs = [{**patient_json_obj}, {**patient_json_obj, "active": {"nope": True}}]
+    with pytest.raises(ParseError, match=_RE_JSON_VALIDATION):
+        load_fhir_json_many(_write_json_docs(tmp_path, docs))
 
-def test_load_fhir_json_unknown_type_construct_success(tmp_path, monkeypatch):
-    # Keep a handle to the original v2 constructor
-    orig_mc = getattr(Resource, "model_construct")
 
-    # Force the code to choose the construct() branch
-    monkeypatch.setattr(Resource, "model_construct", None, raising=False)
+def test_load_fhir_json_many_reports_failures_in_path_order(
+    tmp_path, patient_json_obj
+):
+    # The Patient group is validated first, but the bad Observation comes
+    # earlier in the input, so its error is the one reported
+    docs = [
+        {**patient_json_obj},
+        {"resourceType": "Observation", "status": {"bad": 1}, "code": {"text": "t"}},
+        {**patient_json_obj, "active": {"nope": True}},
+    ]
+    with pytest.raises(ParseError, match=r"(?s)^FHIR JSON validation error.*status"):
+        load_fhir_json_many(_write_json_docs(tmp_path, docs))
 
-    # Stub construct() to build via the original model_construct(), avoiding v2 deprecation
-    def fake_construct(**kwargs):
-        return orig_mc(**kwargs)
 
-    monkeypatch.setattr(
-        Resource, "construct", staticmethod(fake_construct), raising=False
+def test_load_fhir_json_many_empty():
+    assert load_fhir_json_many([]) == []
+
+
+# ------------------------------------------------------------------------------
+# iter_fhir_xml_entries
+# ------------------------------------------------------------------------------
+
+
+def _bundle_xml(entries):
+    return (
+        b'<Bundle xmlns="http://hl7.org/fhir"><type value="collection"/>'
+        + b"".join(entries)
+        + b"</Bundle>"
     )
 
-    p = tmp_path / "weird.json"
-    p.write_text('{"resourceType":"WeirdThing", "id":"w"}', encoding="utf-8")
 
-    r = load_fhir_json(p)
-    assert isinstance(r, Resource)
-    doc = (
-        r.model_dump(by_alias=True)
-        if hasattr(r, "model_dump")
-        else r.dict(by_alias=True)
+def _patient_entry(pid):
+    return (
+        b'<entry><resource><Patient><id value="%s"/></Patient></resource></entry>'
+        % pid.encode()
     )
-    assert doc.get("id") == "w"
+
+
+def test_iter_fhir_xml_entries_yields_entry_resources(tmp_path, patient_cls):
+    p = tmp_path / "bundle.xml"
+    p.write_bytes(
+        _bundle_xml(
+            [
+                _patient_entry("a"),
+                b'<entry><fullUrl value="urn:x"/><resource><!-- c -->'
+                b'<Custom><id value="x"/></Custom></resource></entry>',
+                b'<entry><request><method value="GET"/></request></entry>',
+                b"<entry><resource><!-- empty --></resource></entry>",
+                b'<entry><resource><Custom><id value="y"/>'
+                + _patient_entry("inner")
+                + b"</Custom></resource></entry>",
+                _patient_entry("b"),
+            ]
+        )
+    )
+
+    got = list(iter_fhir_xml_entries(p))
+
+    # the nested <entry> rides along inside its top-level entry's resource
+    assert [type(r).__name__ for r in got] == [
+        "Patient",
+        "Resource",
+        "Resource",
+        "Patient",
+    ]
+    assert [r.id for r in got] == ["a", "x", "y", "b"]
+    assert isinstance(got[0], patient_cls)
+
+
+def test_iter_fhir_xml_entries_detaches_processed_entries(tmp_path, monkeypatch):
+    p = tmp_path / "bundle.xml"
+    p.write_bytes(_bundle_xml([_patient_entry(str(i)) for i in range(50)]))
+
+    real = fhir_parser._resource_from_xml_root
+    preceding = []
+
+    def spy(elem):
+        entry = elem.getparent().getparent()
+        preceding.append(list(entry.itersiblings(preceding=True)))
+        return real(elem)
+
+    monkeypatch.setattr(fhir_parser, "_resource_from_xml_root", spy)
+    assert len(list(iter_fhir_xml_entries(p))) == 50
+    # after the first entry, only the previous (already emptied) entry remains
+    assert all(len(sibs) == 1 and len(sibs[0]) == 0 for sibs in preceding[1:])
+
+
+def test_iter_fhir_xml_entries_memory_plateaus(tmp_path):
+    def peak(n):
+        p = tmp_path / f"bundle{n}.xml"
+        p.write_bytes(_bundle_xml([_patient_entry(str(i)) for i in range(n)]))
+        tracemalloc.start()
+        try:
+            for _ in iter_fhir_xml_entries(p):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(250), peak(1000)
+    assert large < 2 * small
+
+
+def test_iter_fhir_xml_entries_errors(tmp_path):
+    with pytest.raises(ParseError, match=_RE_MISSING):
+        next(iter_fhir_xml_entries(tmp_path / "missing.xml"))
+
+    bad = tmp_path / "bad.xml"
+    bad.write_bytes(b"<Bundle><entry>")
+    with pytest.raises(ParseError, match=_RE_INVALID_XML):
+        list(iter_fhir_xml_entries(bad))
+
+    lone = tmp_path / "entry.xml"
+    lone.write_bytes(b"<entry><resource><X/></resource></entry>")
+    assert list(iter_fhir_xml_entries(lone)) == []
 
 
 # ------------------------------------------------------------------------------
@@ -497,70 +822,67 @@ def test_load_fhir_json_unknown_type_construct_success(tmp_path, monkeypatch):
 
 def test_load_fhir_xml_raises_on_missing_file(tmp_path):
     missing = tmp_path / "missing.xml"
-    with pytest.raises(ParseError, match=r"^file does not exist"):
+    with pytest.raises(ParseError, match=_RE_MISSING):
         load_fhir_xml(missing)
 
 
-def test_load_fhir_xml_raises_on_invalid_xml(tmp_path):
-    p = tmp_path / "bad.xml"
-    p.write_text("<Patient")
-    with pytest.raises(ParseError, match=r"^invalid XML"):
-        load_fhir_xml(p)
+def test_load_fhir_xml_raises_on_invalid_xml():
+    with pytest.raises(ParseError, match=_RE_INVALID_XML):
+        _parse_fhir_xml(b"<Patient")
 
 
 def test_load_fhir_xml_raises_on_directory_and_type_check(tmp_path):
     d = tmp_path / "adir"
     d.mkdir()
-    with pytest.raises(ParseError, match=r"^not a file"):
+    with pytest.raises(ParseError, match=_RE_NOT_FILE):
         load_fhir_xml(d)
-    with pytest.raises(ParseError, match=r"^path must be pathlib\.Path"):
+    with pytest.raises(ParseError, match=_RE_NOT_PATH):
         load_fhir_xml("not-a-path")
 
 
-def test_load_fhir_xml_patient_parses(tmp_path):
-    # Minimal FHIR Patient XML with namespace
-    xml = '<Patient xmlns="http://hl7.org/fhir"><id value="p1"/></Patient>'
+def test_load_fhir_xml_oserror_on_read(tmp_path, monkeypatch):
+    p = tmp_path / "will_boom.xml"
+    p.write_bytes(b"<Patient/>")
+
+    def boom(*args, **kwargs):
+        raise OSError("boom")
+
+    monkeypatch.setattr(Path, "read_bytes", boom)
+    with pytest.raises(ParseError, match=_RE_XML_BOOM):
+        load_fhir_xml(p)
 
-    p = tmp_path / "patient.xml"
-    p.write_text(xml, encoding="utf-8")
 
-    r = load_fhir_xml(p)
+def test_load_fhir_path_wrappers_delegate_to_parsers(
+    tmp_path, patient_json_obj, patient_xml_bytes
+):
+    pj = tmp_path / "patient.json"
+    pj.write_text(json.dumps({**patient_json_obj}), encoding="utf-8")
+    px = tmp_path / "patient.xml"
+    px.write_bytes(patient_xml_bytes)
+
+    assert load_fhir_json(pj).id == "p1"
+    assert load_fhir_xml(px).id == "p1"
+
+
+def test_load_fhir_xml_patient_parses(patient_xml_bytes):
+    # Minimal FHIR Patient XML with namespace
+    r = _parse_fhir_xml(patient_xml_bytes)
 
     # The helper returns a Resource (could be a subclass), but it should reflect
     # the type.
     assert isinstance(r, Resource)
     assert getattr(r, "resource_type", None) in ("Patient", "Resource")
 
-    if hasattr(r, "model_dump_json"):  # pydantic v2
-        js = r.model_dump(by_alias=True)
-    else:
-        js = r.dict(by_alias=True)
+    js = _DUMP(r)
     assert js["id"] == "p1"
     assert js["resourceType"] in ("Patient", "Resource")
 
 
-def test_load_fhir_xml_repaated_children_promotes_to_list(tmp_path):
+def test_load_fhir_xml_repaated_children_promotes_to_list(patient_xml_bytes):
     # Covers _xml_to_obj recursion and the "promot to list" branch.
-    xml = """
-    <Patient xmlns="http://hl7.org/fhir">
-      <identifier>
-        <value value="A"/>
-      </identifier>
-      <identifier>
-        <value value="B"/>
-      </identifier>
-    </Patient>
-    """.strip()
+    r = _parse_fhir_xml(patient_xml_bytes.replace(b'<id value="p1"/>', _TWO_IDS))
 
-    p = tmp_path / "patient_ids.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
-
-    if hasattr(r, "model_dump_json"):
-        js = r.model_dump(by_alias=True)
-    else:
-        js = r.dict(by_alias=True)
+    js = _DUMP(r)
 
     ids = js.get("identifier")
     assert isinstance(ids, list)
@@ -568,39 +890,21 @@ def test_load_fhir_xml_repaated_children_promotes_to_list(tmp_path):
     assert any("B" in str(item) for item in ids)
 
 
-def test_load_fhir_xml_known_type_validation_error(tmp_path):
+def test_load_fhir_xml_known_type_validation_error(patient_xml_bytes):
     # 'active' must be boolean; string triggers ValidationError branch.
-    xml = '<Patient xmlns="http://hl7.org/fhir"><active value="nope"/></Patient>'
-
-    p = tmp_path / "bad_active.xml"
-    p.write_text(xml, encoding="utf-8")
+    xml = patient_xml_bytes.replace(b'<id value="p1"/>', b'<active value="nope"/>')
 
-    with pytest.raises(ParseError, match=r"^FHIR XML validation error"):
-        load_fhir_xml(p)
+    with pytest.raises(ParseError, match=_RE_XML_VALIDATION):
+        _parse_fhir_xml(xml)
 
 
-def test_load_fhir_xml_repeated_children_promote_to_list(tmp_path):
+def test_load_fhir_xml_repeated_children_promote_to_list(patient_xml_bytes):
     """
     When a known resource type has repeated children, the loader should
     promote the field into a list rather than overwriting the earlier value.
     """
-
-    xml = """
-    <Patient xmlns="http://hl7.org/fhir">
-      <identifier><value value="A"/></identifier>
-      <identifier><value value="B"/></identifier>
-    </Patient>
-    """.strip()
-
-    p = tmp_path / "patient_ids.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
-    doc = (
-        r.model_dump(by_alias=True)
-        if hasattr(r, "model_dump")
-        else r.dict(by_alias=True)
-    )
+    r = _parse_fhir_xml(patient_xml_bytes.replace(b'<id value="p1"/>', _TWO_IDS))
+    doc = _DUMP(r)
 
     ids = doc.get("identifier")
     assert isinstance(ids, list)
@@ -608,165 +912,101 @@ def test_load_fhir_xml_repeated_children_promote_to_list(tmp_path):
     assert any(isinstance(x, dict) and x.get("value") == "B" for x in ids)
 
 
-def test_load_fhir_xml_repeated_root_children_promote_and_append(tmp_path):
+def test_load_fhir_xml_repeated_root_children_promote_and_append():
     # Unknown resource: no schema validation to interfere
     xml = "<X><y value='1'/><y value='2'/><y value='3'/></X>"
 
-    p = tmp_path / "x.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
+    r = _parse_fhir_xml(xml.encode())
     assert isinstance(r, Resource)
 
 
-def test_load_fhir_xml_known_type_other_exception(tmp_path, monkeypatch):
+def test_load_fhir_xml_known_type_other_exception(patient_xml_bytes):
     class RaisingPatient:
         def __init__(self, *a, **k):
             raise RuntimeError("boom")
 
-    # Replace the constructor used by the loader
-    monkeypatch.setitem(KNOWN_TYPES, "Patient", RaisingPatient)
-
-    xml = '<Patient xmlns="http://hl7.org/fhir"><id value="p1"/></Patient>'
-    p = tmp_path / "patient_boom.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    with pytest.raises(ParseError, match=r"^failed to build FHIR model from XML"):
-        load_fhir_xml(p)
+    # Replace the constructor used by the loader for this context only
+    with (
+        _override_types({"Patient": RaisingPatient}),
+        pytest.raises(ParseError, match=_RE_BUILD_XML),
+    ):
+        _parse_fhir_xml(patient_xml_bytes)
 
 
-def test_load_fhir_xml_unknown_type_uses_construct(tmp_path, monkeypatch):
-    # Drive the unknown-type XML path through Resource.construct(...) (success).
-    # Disable model_construct so the loader chooses the construct() branch.
-    orig_mc = getattr(Resource, "model_construct")
-    monkeypatch.setattr(Resource, "model_construct", None, raising=False)
+def test_load_fhir_xml_unknown_type_uses_base_constructor(monkeypatch):
+    # Drive the unknown-type XML path through the cached base constructor.
+    calls = []
 
-    # Make construct() delegate to the original v2 model model_construct() to
-    # avoid deprecation issues.
-    def fake_construct(**kwargs):
-        return orig_mc(**kwargs)
+    def spy(**kwargs):
+        calls.append(kwargs)
+        return Resource.model_construct(**kwargs)
 
-    monkeypatch.setattr(
-        Resource, "construct", staticmethod(fake_construct), raising=False
-    )
+    monkeypatch.setattr(fhir_parser, "_BASE_CONSTRUCT", spy)
 
     xml = '<CustomResource xmlns="http://hl7.org/fhir"><id value="x"/></CustomResource>'
-    p = tmp_path / "custom_construct.xml"
-    p.write_text(xml, encoding="utf-8")
 
-    r = load_fhir_xml(p)
+    r = _parse_fhir_xml(xml.encode())
     assert isinstance(r, Resource)
-    doc = (
-        r.model_dump(by_alias=True)
-        if hasattr(r, "model_dump")
-        else r.dict(by_alias=True)
-    )
+    assert calls == [{"resourceType": "CustomResource", "id": "x"}]
+    doc = _DUMP(r)
     assert doc.get("id") == "x"
 
 
-def test_load_fhir_xml_patient_name_scalar_given_wrapped(tmp_path):
-    """
-    Single <name> block with scalar <given value="..."> becomes list[str],
-    and overall Patient.name becomes a list[HumanName].
-    """
-    xml = """<?xml version="1.0" encoding="UTF-8"?>
-    <Patient xmlns="http://hl7.org/fhir">
-        <id value="pnorm1"/>
-        <name>
-            <family value="Doe"/>
-            <given value="John"/>
-        </name>
-    </Patient>
-    """
-    p = tmp_path / "patient_scalar_given.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
-    doc = _to_doc(r)
-
-    assert doc["resourceType"] in ("Patient", "Resource")
-    assert isinstance(doc["name"], list)
-    assert len(doc["name"]) == 1
-    hn = doc["name"][0]
-    assert hn["family"] == "Doe"
-    assert isinstance(hn["given"], list)
-    assert hn["given"] == ["John"]
-
-
-def test_load_fhir_xml_patient_name_dict_wrapped_to_list(tmp_path):
-    """
-    If <name> appears once, dict->list coercion wraps it so Patient.name is a list.
-    """
-    xml = """<?xml version="1.0" encoding="UTF-8"?>
-    <Patient xmlns="http://hl7.org/fhir">
-        <id value="pnorm2"/>
-        <name>
-            <family value="Solo"/>
-        </name>
-    </Patient>
-    """
-    p = tmp_path / "patient_single_name.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
-    doc = _to_doc(r)
-
-    assert doc["resourceType"] in ("Patient", "Resource")
-    assert isinstance(doc["name"], list)
-    assert doc["name"] == [{"family": "Solo"}]
-
-
-def test_load_fhir_xml_patient_multi_given_preserved_as_list(tmp_path):
-    """
-    Multiple <given> elements become a list of values in order.
+@pytest.mark.parametrize(
+    "name_xml,expected",
+    [
+        # scalar <given> becomes list[str]
+        (
+            b'<name><family value="Doe"/><given value="John"/></name>',
+            [{"family": "Doe", "given": ["John"]}],
+        ),
+        # a single <name> block is wrapped so Patient.name is a list
+        (b'<name><family value="Solo"/></name>', [{"family": "Solo"}]),
+        # multiple <given> elements keep document order
+        (
+            b'<name><family value="Doe"/>'
+            b'<given value="John"/><given value="Quincy"/></name>',
+            [{"family": "Doe", "given": ["John", "Quincy"]}],
+        ),
+        # a HumanName without <given> gains no unwanted keys
+        (b'<name><family value="Roe"/></name>', [{"family": "Roe"}]),
+    ],
+    ids=["scalar-given", "single-name", "multi-given", "missing-given"],
+)
+def test_load_fhir_xml_patient_name_normalized(patient_xml_bytes, name_xml, expected):
     """
-    xml = """<?xml version="1.0" encoding="UTF-8"?>
-    <Patient xmlns="http://hl7.org/fhir">
-        <id value="pnorm3"/>
-        <name>
-            <family value="Doe"/>
-            <given value="John"/>
-            <given value="Quincy"/>
-        </name>
-    </Patient>
+    Patient.name becomes list[HumanName] and each given becomes list[str].
     """
-    p = tmp_path / "patient_multi_given.xml"
-    p.write_text(xml, encoding="utf-8")
+    xml = patient_xml_bytes.replace(b'<id value="p1"/>', b'<id value="p1"/>' + name_xml)
 
-    r = load_fhir_xml(p)
-    doc = _to_doc(r)
+    doc = _raw(xml)
 
-    assert doc["resourceType"] in ("Patient", "Resource")
-    assert isinstance(doc["name"], list)
-    hn = doc["name"][0]
-    assert hn["family"] == "Doe"
-    assert hn["given"] == ["John", "Quincy"]
+    assert doc["resourceType"] == "Patient"
+    assert doc["name"] == expected
+    # and the model accepts it as list[HumanName]
+    name = _parse_fhir_xml(xml).name[0]
+    assert name.family == expected[0]["family"]
+    assert name.given == expected[0].get("given")
 
 
-def test_load_fhir_xml_patient_name_missing_given_preserved(tmp_path):
+def test_load_fhir_xml_patient_single_list_fields_wrapped(patient_xml_bytes):
     """
-    A HumanName without <given> is preserved; no crash or unwanted keys.
+    A single <identifier>, <telecom> or <address> becomes a one-item list.
     """
-    xml = """<?xml version="1.0" encoding="UTF-8"?>
-    <Patient xmlns="http://hl7.org/fhir">
-        <id value="pnorm4"/>
-        <name>
-            <family value="Roe"/>
-        </name>
-    </Patient>
-    """
-    p = tmp_path / "patient_no_given.xml"
-    p.write_text(xml, encoding="utf-8")
-
-    r = load_fhir_xml(p)
-    doc = _to_doc(r)
+    xml = patient_xml_bytes.replace(
+        b'<id value="p1"/>',
+        b'<id value="p1"/><identifier><value value="A"/></identifier>'
+        b'<telecom><system value="phone"/><value value="555"/></telecom>'
+        b'<address><city value="Springfield"/></address>',
+    )
+    doc = _raw(xml)
 
-    assert doc["resourceType"] in ("Patient", "Resource")
-    assert isinstance(doc["name"], list)
-    assert doc["name"] == [{"family": "Roe"}]
+    assert doc["identifier"] == [{"value": "A"}]
+    assert doc["telecom"] == [{"system": "phone", "value": "555"}]
+    assert doc["address"] == [{"city": "Springfield"}]
 
 
-def test_load_fhir_xml_non_patient_root_no_name_normalization(tmp_path):
+def test_load_fhir_xml_non_patient_root_no_name_normalization():
     """
     Root is not Patient -> normalization block is skipped.
     """
@@ -778,17 +1018,14 @@ def test_load_fhir_xml_non_patient_root_no_name_normalization(tmp_path):
         </name>
     </Foo>
     """
-    p = tmp_path / "foo_name.xml"
-    p.write_text(xml, encoding="utf-8")
 
-    r = load_fhir_xml(p)
-    doc = _to_doc(r)
+    doc = _raw(xml.encode())
 
-    assert doc["resourceType"] in ("Foo", "Resource")
-    assert "name" not in doc or isinstance(doc["name"], dict)
+    assert doc["resourceType"] == "Foo"
+    assert isinstance(doc["name"], dict)
 
 
-def test_load_fhir_xml_patient_name_block_nm_not_dict(tmp_path):
+def test_load_fhir_xml_patient_name_block_nm_not_dict():
     """
     Covers the branch where nm is not a dict (list directly).
     """
@@ -805,13 +1042,11 @@ def test_load_fhir_xml_patient_name_block_nm_not_dict(tmp_path):
         </name>
     </Patient>
     """
-    p = tmp_path / "patient_list_name.xml"
-    p.write_text(xml, encoding="utf-8")
-    r = load_fhir_xml(p)
+    r = _parse_fhir_xml(xml.encode())
     assert isinstance(r, Resource)
 
 
-def test_load_fhir_xml_patient_name_block_name_not_list(tmp_path):
+def test_load_fhir_xml_patient_name_block_name_not_list():
     """
     Covers the branch where data["name"] is not a list (scalar),
     which triggers a validation error in the Patient model.
@@ -822,7 +1057,5 @@ def test_load_fhir_xml_patient_name_block_name_not_list(tmp_path):
         <name value="JustAString"/>
     </Patient>
     """
-    p = tmp_path / "patient_scalar_name.xml"
-    p.write_text(xml, encoding="utf-8")
-    with pytest.raises(ParseError, match=r"^FHIR XML validation error"):
-        load_fhir_xml(p)
+    with pytest.raises(ParseError, match=_RE_XML_VALIDATION):
+        _parse_fhir_xml(xml.encode())
@@ -3,8 +3,9 @@
 Tests for hl7_fhir_tool.hl7_parser.
 """
 
+import re
+
 import pytest
-from hl7apy.core import Message
 
 from hl7_fhir_tool.hl7_parser import parse_hl7_v2, to_pretty_segments, to_dict
 from hl7_fhir_tool.exceptions import ParseError
@@ -24,39 +25,73 @@ MALFORMED_MSGTYPE = (
     "ZXY|freeform\r"
 )
 
+# pytest.raises(match=...) patterns, compiled once
+_RE_RAW_STR = re.compile(r"^raw must be str")
+_RE_RAW_EMPTY = re.compile(r"^raw must be a non-empty HL7 v2 str")
+_RE_PARSE_FAILED = re.compile(r"^Failed to parse HL7 v2 message")
+_RE_NOT_MESSAGE = re.compile(r"^msg must be hl7apy\.core\.Message")
+
 
 # ------------------------------------------------------------------------------
-# parse_hl7_v2
+# fixtures
 # ------------------------------------------------------------------------------
 
 
-def test_parse_hl7_v2_rejects_non_string():
-    with pytest.raises(TypeError, match=r"^raw must be str"):
-        parse_hl7_v2(123)
+@pytest.fixture(scope="module")
+def valid_msg():
+    # VALID_ADT_A01 parsed once for the module; tests only read from it
+    return parse_hl7_v2(VALID_ADT_A01, strict=True)
 
 
-def test_parse_hl7_v2_rejects_empty_string():
-    with pytest.raises(ValueError, match=r"^raw must be a non-empty HL7 v2 str"):
-        parse_hl7_v2("")
+@pytest.fixture(scope="module")
+def valid_views(valid_msg):
+    # (to_pretty_segments, to_dict) of valid_msg, each computed once
+    return to_pretty_segments(valid_msg), to_dict(valid_msg)
 
 
-def test_parse_hl7_v2_parses_valid_message_strict():
-    msg = parse_hl7_v2(VALID_ADT_A01, strict=True)
-    assert isinstance(msg, Message)
+# ------------------------------------------------------------------------------
+# parse_hl7_v2
+# ------------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(
+    "bad,exc,pattern",
+    [(123, TypeError, _RE_RAW_STR), ("", ValueError, _RE_RAW_EMPTY)],
+    ids=["non-string", "empty"],
+)
+def test_parse_hl7_v2_input_validation(bad, exc, pattern):
+    with pytest.raises(exc, match=pattern):
+        parse_hl7_v2(bad)
+
+
+def test_parse_hl7_v2_parses_valid_message_strict(valid_msg):
+    # the one class-identity check; other tests duck-type on .MSH
+    from hl7apy.core import Message
+
+    assert isinstance(valid_msg, Message)
     # MSH-9 should be ADT^A01
-    msh9 = msg.MSH.msh_9.to_er7()
+    msh9 = valid_msg.MSH.msh_9.to_er7()
     assert str(msh9) == "ADT^A01"
 
 
+@pytest.mark.parametrize("sep", ["\n", "\r\n"], ids=["lf", "crlf"])
+def test_parse_hl7_v2_normalizes_line_endings(valid_msg, sep):
+    msg = parse_hl7_v2(VALID_ADT_A01.replace("\r", sep), strict=True)
+    assert to_pretty_segments(msg) == to_pretty_segments(valid_msg)
+
+
 def test_parse_hl7_v2_lenient_allows_malformed_message():
     # In lenient mode, odd message types should still parse to a Message
     msg = parse_hl7_v2(MALFORMED_MSGTYPE, strict=False)
-    assert isinstance(msg, Message)
+    assert hasattr(msg, "MSH")
 
 
-def test_parse_hl7_v2_strict_raises_on_malformed_message():
+def test_parse_hl7_v2_strict_raises_on_malformed_message(valid_msg):
+    # Strict validation needs hl7apy's v2.5 tables; valid_msg has already
+    # loaded them with a strict parse, so this test does not pay the cold load
+    pytest.importorskip("hl7apy.v2_5")
     # In strict mode, malformed message type should raise a ParseError
-    with pytest.raises(ParseError, match=r"^Failed to parse HL7 v2 message"):
+    with pytest.raises(ParseError, match=_RE_PARSE_FAILED):
         parse_hl7_v2(MALFORMED_MSGTYPE, strict=True)
 
 
@@ -65,18 +100,22 @@ def test_parse_hl7_v2_strict_raises_on_malformed_message():
 # ------------------------------------------------------------------------------
 
 
-def test_to_pretty_segments_rejects_non_message():
-    with pytest.raises(TypeError, match=r"^msg must be hl7apy.core.Message"):
-        to_pretty_segments("not a message")
+@pytest.mark.parametrize(
+    "func,bad", [(to_pretty_segments, "not a message"), (to_dict, 22)]
+)
+def test_to_pretty_segments_and_to_dict_reject_non_message(func, bad):
+    with pytest.raises(TypeError, match=_RE_NOT_MESSAGE):
+        func(bad)
 
 
-def test_to_pretty_segements_returns_segments_list():
-    msg = parse_hl7_v2(VALID_ADT_A01, strict=True)
-    segments = to_pretty_segments(msg)
+@pytest.mark.parametrize("seg", ["MSH", "PID", "PV1"])
+def test_to_pretty_segements_returns_segments_list(valid_views, seg):
+    segments, _ = valid_views
     assert isinstance(segments, list)
     assert segments[0].startswith("MSH|")
-    assert any(s.startswith("PID|") for s in segments)
-    assert any(s.startswith("PV1|") for s in segments)
+    # one pass: first segment line per segment name
+    firsts = {s.split("|", 1)[0]: s for s in reversed(segments)}
+    assert firsts[seg].startswith(seg + "|")
 
 
 # ------------------------------------------------------------------------------
@@ -84,19 +123,15 @@ def test_to_pretty_segements_returns_segments_list():
 # ------------------------------------------------------------------------------
 
 
-def test_to_dict_rejects_non_message():
-    with pytest.raises(TypeError, match=r"^msg must be hl7apy.core.Message"):
-        to_dict(22)
-
-
-def test_to_dict_groups_segments_by_name():
-    msg = parse_hl7_v2(VALID_ADT_A01, strict=True)
-    d = to_dict(msg)
-    # Expect keys for the segment names present
-    assert "MSH" in d and isinstance(d["MSH"], list) and len(d["MSH"]) >= 1
-    assert "PID" in d and isinstance(d["PID"], list) and len(d["PID"]) >= 1
-    assert "PV1" in d and isinstance(d["PV1"], list) and len(d["PV1"]) >= 1
-    # Values are ER7 strings beginning with the segment name
-    assert d["MSH"][0].startswith("MSH|")
-    assert d["PID"][0].startswith("PID|")
-    assert d["PV1"][0].startswith("PV1|")
+def test_to_dict_groups_segments_by_name(valid_views):
+    segments, d = valid_views
+    # One structural check: exactly the segments present, each a list whose
+    # first ER7 string begins with the segment name
+    assert all(isinstance(values, list) for values in d.values())
+    assert {name: values[0][:4] for name, values in d.items()} == {
+        "MSH": "MSH|",
+        "PID": "PID|",
+        "PV1": "PV1|",
+    }
+    # and the grouping holds exactly the segment lines, none lost or added
+    assert sorted(s for values in d.values() for s in values) == sorted(segments)
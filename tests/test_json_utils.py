@@ -0,0 +1,85 @@
+# tests/test_json_utils.py
+"""
+Tests for hl7_fhir_tool/json_utils.
+"""
+
+import json
+import pytest
+import sys
+
+from decimal import Decimal
+
+from hl7_fhir_tool import json_utils
+
+
+# ------------------------------------------------------------------------------
+# globals
+# ------------------------------------------------------------------------------
+
+JSON_DOC = {"resourceType": "Patient", "name": [{"family": "Müller"}], "n": 1}
+
+
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def json_backend(request, monkeypatch):
+    # Run a test against both backends; "stdlib" hides orjson from the helpers
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_utils, "get_orjson", lambda: None)
+    return request.param
+
+
+# ------------------------------------------------------------------------------
+# get_orjson
+# ------------------------------------------------------------------------------
+
+
+def test_orjson_missing_returns_none(monkeypatch):
+    # A None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    assert json_utils.get_orjson.__wrapped__() is None
+
+
+# ------------------------------------------------------------------------------
+# dumps_utf8
+# ------------------------------------------------------------------------------
+
+
+def test_dumps_utf8_stdlib_matches_json_dumps(monkeypatch):
+    # Without orjson, files get exactly the text the CLI writes to stdout
+    monkeypatch.setattr(json_utils, "get_orjson", lambda: None)
+    for indent in (None, 2):
+        assert json_utils.dumps_utf8(JSON_DOC, indent=indent) == json.dumps(
+            JSON_DOC, indent=indent
+        ).encode("utf-8")
+
+
+def test_dumps_utf8_orjson_is_compact_raw_utf8():
+    pytest.importorskip("orjson")
+    assert json_utils.dumps_utf8(JSON_DOC) == (
+        '{"resourceType":"Patient","name":[{"family":"Müller"}],"n":1}'
+    ).encode("utf-8")
+    assert json.loads(json_utils.dumps_utf8(JSON_DOC, indent=2)) == JSON_DOC
+
+
+def test_dumps_utf8_falls_back_to_stdlib_and_raises_like_it(json_backend):
+    # orjson rejects Decimal; the stdlib is then asked and raises TypeError
+    with pytest.raises(TypeError):
+        json_utils.dumps_utf8({"v": Decimal("1.5")})
+    assert json_utils.dumps_utf8({"big": 2**70}) == b'{"big": 1180591620717411303424}'
+
+
+# ------------------------------------------------------------------------------
+# loads
+# ------------------------------------------------------------------------------
+
+
+def test_loads_round_trip_and_decode_error(json_backend):
+    buf = json_utils.dumps_utf8(JSON_DOC)
+    assert json_utils.loads(buf) == JSON_DOC
+    assert json_utils.loads(buf.decode("utf-8")) == JSON_DOC
+    with pytest.raises(json.JSONDecodeError):
+        json_utils.loads("{not-json}")
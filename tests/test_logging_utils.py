@@ -4,53 +4,83 @@ tests for hls_fhir_tool.logging_utils
 """
 
 import io
+import logging
+import re
+
 import pytest
 
 from hl7_fhir_tool.logging_utils import configure_logging
 
+# pytest.raises(match=...) patterns, compiled once
+_RE_VERBOSITY_TYPE = re.compile(r"^verbosity must be int")
+_RE_VERBOSITY_NEGATIVE = re.compile(r"^verbosity must be non-negative")
+_RE_BAD_STREAM = re.compile(r"^stream must be file-like \(support \.write\(\.\.\.\)\)")
+
+
+# ------------------------------------------------------------------------------
+# lightweight stubs
+# ------------------------------------------------------------------------------
 
-def test_configure_logging_rejects_non_int_verbosity():
-    with pytest.raises(TypeError, match=r"^verbosity must be int"):
-        configure_logging("load")
 
+class _NotAStream:
+    # No .write(): configure_logging must reject it as a stream
+    pass
 
-def test_configure_logging_rejects_negative_verbosity():
-    with pytest.raises(ValueError, match=r"^verbosity must be non-negative"):
-        configure_logging(-1)
 
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
 
-def test_configure_logging_sets_info_level(capsys):
-    logger = configure_logging(verbosity=0)
+
+@pytest.fixture
+def info_logger():
+    # Root logger configured at INFO into a private buffer; the handler and
+    # level are undone afterwards so later tests never see duplicate output
+    root = logging.getLogger()
+    level = root.level
+    buf = io.StringIO()
+    logger = configure_logging(0, stream=buf)
+    handler = next(h for h in root.handlers if getattr(h, "stream", None) is buf)
+    yield logger, buf
+    root.removeHandler(handler)
+    root.setLevel(level)
+
+
+@pytest.mark.parametrize(
+    "kwargs,exc,pattern",
+    [
+        ({"verbosity": "load"}, TypeError, _RE_VERBOSITY_TYPE),
+        ({"verbosity": -1}, ValueError, _RE_VERBOSITY_NEGATIVE),
+        ({"verbosity": 0, "stream": _NotAStream()}, TypeError, _RE_BAD_STREAM),
+    ],
+    ids=["non-int-verbosity", "negative-verbosity", "bad-stream"],
+)
+def test_configure_logging_input_validation(kwargs, exc, pattern):
+    with pytest.raises(exc, match=pattern):
+        configure_logging(**kwargs)
+
+
+def test_configure_logging_sets_info_level(info_logger):
+    logger, buf = info_logger
     logger.info("hello info")
     logger.debug("hidden debug")
 
-    out, _ = capsys.readouterr()
+    out = buf.getvalue()
     assert "hello info" in out
-    assert "hidden debug not in out"
+    assert "hidden debug" not in out
 
 
-def test_configure_logging_sets_debug_level(capsys):
-    logger = configure_logging(verbosity=1)
+def test_configure_logging_sets_debug_level():
+    buf = io.StringIO()
+    logger = configure_logging(verbosity=1, stream=buf)
     logger.debug("visible debug")
 
-    out, _ = capsys.readouterr()
-    assert "visible debug" in out
+    assert "visible debug" in buf.getvalue()
 
 
-def test_configure_logging_accepts_custom_stream():
-    buf = io.StringIO()
-    logger = configure_logging(verbosity=0, stream=buf)
+def test_configure_logging_accepts_custom_stream(info_logger):
+    logger, buf = info_logger
     logger.info("routed message")
 
     contents = buf.getvalue()
     assert "routed message" in contents
-
-
-def test_configure_logging_rejects_bad_stream():
-    class NotAStream:
-        pass
-
-    with pytest.raises(
-        TypeError, match=r"^stream must be file-like \(support .write\(...\)\)"
-    ):
-        configure_logging(0, stream=NotAStream())
@@ -1,33 +1,210 @@
 # tests/test_orm_o01.py
 from __future__ import annotations
 
+from functools import cache
+from types import SimpleNamespace
+
 import pytest
-from hl7apy.parser import parse_message
+from hl7apy.exceptions import ChildNotFound
 
 from hl7_fhir_tool.transform.v2_to_fhir.orm_o01 import (
     ORMO01Transformer,
     _parse_hl7_yyyymmdd,
     _er7,
-    _field_comp_from_er7,
+    _fhir,
     _find_first,
     _first_segment_line,
+    _first_segment_lines,
+    _parse_obr_line,
+    _parse_orc_line,
+    _parse_pid_line,
+    _patient_ref,
 )
 
 
+# ------------------------------------------------------------------------------
+# globals
+# ------------------------------------------------------------------------------
+
+# MSH header shared by every _raw_orm message; MSH-9 is filled per call
+_MSH = "MSH|^~\\&|EPIC|HOSP|LIS|LAB|202501011230||{}|MSG001|P|2.5"
+
+# ORM^O01 with 50 OBX result segments after the order, built once; drives
+# _first_segment_line over a long message
+_LONG_ORM = "\r".join(
+    [
+        _MSH.format("ORM^O01"),
+        "PID|1||LONG1^^^HOSP^MR||Long^Msg||19800101|M|",
+        "ORC|NW|PL||FL|NW||||202501011230||||||||||",
+        "OBR|1|PL|FL|GLU^Glucose|||202501011200|||||||||||||||||||||||",
+        *(f"OBX|{i}|NM|GLU^Glucose||{i}|mg/dL|||||F" for i in range(1, 51)),
+    ]
+)
+
+# (ORC-1/ORC-5 order status, expected ServiceRequest.status); "" is absent
+_STATUS_CASES = (
+    ("NW", "active"),
+    ("IP", "active"),
+    ("SC", "active"),
+    ("CM", "completed"),
+    ("XX", "active"),
+    ("", "active"),
+)
+
+
+# ------------------------------------------------------------------------------
+# lightweight stubs
+# ------------------------------------------------------------------------------
+
+
+class _StubER7:
+    # hl7apy-like component: to_er7() returns a fixed string
+    def __init__(self, s):
+        self.s = s
+
+    def to_er7(self):
+        return self.s
+
+
+# _find_first trees: a child whose .name raises, then MID -> OBR leaf
+class _StubChildRaisesOnName:
+    @property
+    def name(self):
+        raise ChildNotFound("NAME")
+
+
+class _StubLeaf:
+    name = "OBR"
+
+
+class _StubMid:
+    name = "MID"
+    children = [_StubLeaf()]
+
+
+class _StubRoot:
+    children = [_StubChildRaisesOnName(), _StubMid()]
+
+
+class _StubRootEmpty:
+    children = []
+
+
+class _StubBoomOnOBR:
+    # attribute lookup for the segment itself raises an hl7apy error
+    def __getattr__(self, name):
+        if name == "OBR":
+            raise ChildNotFound("OBR")
+        raise AttributeError
+
+    children = []
+
+
+class _StubNoChildrenProp:
+    def __getattr__(self, name):
+        if name == "children":
+            raise ChildNotFound("CHILDREN")
+        raise AttributeError
+
+
+class _StubChildBad:
+    def __getattr__(self, name):
+        if name in ("children", "name"):
+            raise ChildNotFound(name)
+        raise AttributeError
+
+
+# PID segments for _build_patient's structured (component) paths
+class _StubPidAllComponents:
+    pid_3 = [SimpleNamespace(cx_1=_StubER7("COMPID123"))]
+    pid_5 = [
+        SimpleNamespace(
+            family_name=_StubER7("CompFamily"), given_name=_StubER7("CompGiven")
+        )
+    ]
+    pid_7 = _StubER7("19840229")
+    pid_8 = _StubER7("F")
+
+
+# PID-3 repetition containers that defeat the structured path, forcing the
+# raw-line fallback: len() raises, or len() is 1 while the value is falsy
+class _StubLenRaises:
+    def __len__(self):
+        raise TypeError("boom")
+
+
+class _StubFalsyLenOne:
+    def __len__(self):
+        return 1
+
+    def __bool__(self):
+        return False
+
+
+class _StubPidFamOnly:
+    pid_5 = [SimpleNamespace(family_name=_StubER7("Fam"), given_name=None)]
+
+
+class _StubPidGivenOnly:
+    pid_5 = [SimpleNamespace(family_name=None, given_name=_StubER7("Giv"))]
+
+
+class _SRShim:
+    # ServiceRequest stand-in whose first real id assignment raises, to
+    # drive _build_service_request's "sr-<patient id>" fallback
+    def __init__(
+        self, intent=None, status=None, code=None, identifier=None, subject=None
+    ):
+        self.intent = intent
+        self.status = status
+        self.code = code
+        self.identifier = identifier
+        self.subject = subject
+        self._raised_once = False
+        self.id = None
+
+    def __setattr__(self, name, value):
+        if (
+            name == "id"
+            and value is not None
+            and not getattr(self, "_raised_once", False)
+        ):
+            object.__setattr__(self, "_raised_once", True)
+            raise ValueError("simulate invalid id on first set")
+        return object.__setattr__(self, name, value)
+
+
+# ------------------------------------------------------------------------------
+# fixtures
+# ------------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def xf():
+    # ORMO01Transformer keeps no per-instance state, so one serves the module
+    return ORMO01Transformer()
+
+
+@pytest.fixture
+def sr_shim(monkeypatch):
+    # Swap _SRShim in for the lazily imported ServiceRequest; monkeypatch
+    # restores the real class after the test
+    monkeypatch.setattr(_fhir(), "ServiceRequest", _SRShim)
+    return _SRShim
+
+
 # ------------------------------------------------------------------------------
 # helpers
 # ------------------------------------------------------------------------------
 
 
+@cache
 def _raw_orm(mshtype: str, pid: str | None, orc: str | None, obr: str | None) -> str:
-    parts = [f"MSH|^~\\&|EPIC|HOSP|LIS|LAB|202501011230||{mshtype}|MSG001|P|2.5"]
-    if pid is not None:
-        parts.append(pid)
-    if orc is not None:
-        parts.append(orc)
-    if obr is not None:
-        parts.append(obr)
-    return "\r".join(parts)
+    # Memoized: repeated argument tuples return the already-joined string
+    segments = (pid, orc, obr)
+    return "\r".join(
+        (_MSH.format(mshtype), *(seg for seg in segments if seg is not None))
+    )
 
 
 def _code_text(sr):
@@ -47,20 +224,15 @@ def _code_text(sr):
 # ------------------------------------------------------------------------------
 
 
-def test_applies_true_and_false():
-    xf = ORMO01Transformer()
-    msg_yes = parse_message(
-        _raw_orm("ORM^O01", "PID|1||X||A^B||19800101|M|", None, None)
-    )
-    msg_no = parse_message(
-        _raw_orm("ADT^A01", "PID|1||X||A^B||19800101|M|", None, None)
-    )
+def test_applies_true_and_false(parsed, xf):
+    msg_yes = parsed(_raw_orm("ORM^O01", "PID|1||X||A^B||19800101|M|", None, None))
+    msg_no = parsed(_raw_orm("ADT^A01", "PID|1||X||A^B||19800101|M|", None, None))
 
     assert xf.applies(msg_yes) is True
     assert xf.applies(msg_no) is False
 
 
-def test_applies_handles_msh_exception_returns_false():
+def test_applies_handles_msh_exception_returns_false(xf):
 
     class BadMSH:
         @property
@@ -70,8 +242,6 @@ def test_applies_handles_msh_exception_returns_false():
     class Msg:
         MSH = BadMSH()
 
-    xf = ORMO01Transformer()
-
     assert xf.applies(Msg()) is False
 
 
@@ -80,36 +250,26 @@ def test_applies_handles_msh_exception_returns_false():
 # ------------------------------------------------------------------------------
 
 
-@pytest.mark.parametrize(
-    "orc_status,expected",
-    [
-        ("NW", "active"),
-        ("IP", "active"),
-        ("SC", "active"),
-        ("CM", "completed"),
-        ("XX", "active"),
-        (None, "active"),
-    ],
-)
-def test_transform_status_mapping(orc_status, expected):
-    st = orc_status or ""
-    xf = ORMO01Transformer()
-    msg = parse_message(
-        _raw_orm(
-            "ORM^O01",
-            "PID|1||2000^^^HOSP^MR||S^T||20000101|F|",
-            f"ORC|{st}|PZ||FZ|{st}||||202501011230||||||||||",
-            "OBR|1|PZ|FZ|NA^Sodium|||202501011200|||||||||||||||||||||||",
-        )
-    )
-    _, sr = xf.transform(msg)
+def test_transform_status_mapping(parsed, xf):
+    got = {
+        st: xf.transform(
+            parsed(
+                _raw_orm(
+                    "ORM^O01",
+                    "PID|1||2000^^^HOSP^MR||S^T||20000101|F|",
+                    f"ORC|{st}|PZ||FZ|{st}||||202501011230||||||||||",
+                    "OBR|1|PZ|FZ|NA^Sodium|||202501011200|||||||||||||||||||||||",
+                )
+            )
+        )[1].status
+        for st, _ in _STATUS_CASES
+    }
 
-    assert sr.status == expected
+    assert got == dict(_STATUS_CASES)
 
 
-def test_transform_happy():
-    xf = ORMO01Transformer()
-    msg = parse_message(
+def test_transform_happy(parsed, xf):
+    msg = parsed(
         _raw_orm(
             "ORM^O01",
             "PID|1||12345^^^HOSP^MR||Doe^John||19800101|M|",
@@ -134,9 +294,8 @@ def test_transform_happy():
     assert sr.subject.reference == f"Patient/{patient.id}"
 
 
-def test_transform_missing_orc_uses_sr_fallback_and_obr_raw_code():
-    xf = ORMO01Transformer()
-    msg = parse_message(
+def test_transform_missing_orc_uses_sr_fallback_and_obr_raw_code(parsed, xf):
+    msg = parsed(
         _raw_orm(
             "ORM^O01",
             "PID|1||99999^^^HOSP^MR||Solo^Patient||19750704|F|",
@@ -159,7 +318,7 @@ def test_parse_hl7_yyyymmdd_happy_and_edge():
 
     class Boom:
         def to_er7(self):
-            raise RuntimeError("nope")
+            raise ValueError("nope")
 
     assert _parse_hl7_yyyymmdd("19800101") == "1980-01-01"
     assert _parse_hl7_yyyymmdd("19800101123456") == "1980-01-01"
@@ -167,29 +326,92 @@ def test_parse_hl7_yyyymmdd_happy_and_edge():
     assert _parse_hl7_yyyymmdd("1980") is None
     assert _parse_hl7_yyyymmdd("abc") is None
     assert _parse_hl7_yyyymmdd(Boom()) is None
+    assert _parse_hl7_yyyymmdd("19801399") is None
 
 
 # ------------------------------------------------------------------------------
-# _field_comp_from_er7()
+# _er7()
 # ------------------------------------------------------------------------------
 
 
-def test_field_comp_from_er7_and_to_er7():
+def test_er7_strips_to_er7_and_handles_none():
 
     class Dummy:
         def to_er7(self):
             return " A^B "
 
-    line = "PID|1||12345^^^HOSP^MR||Doe^John||19800101|M|"
-
     assert _er7(None) == ""
     assert _er7(Dummy()) == "A^B"
-    assert _field_comp_from_er7(line, 3, 1) == "12345"
-    assert _field_comp_from_er7(line, 5, 1) == "Doe"
-    assert _field_comp_from_er7(line, 5, 2) == "John"
-    assert _field_comp_from_er7(line, 7, 1) == "19800101"
-    assert _field_comp_from_er7(line, 99, 1) is None
-    assert _field_comp_from_er7(None, 3, 1) is None
+
+
+# ------------------------------------------------------------------------------
+# _parse_pid_line() / _parse_orc_line() / _parse_obr_line()
+# ------------------------------------------------------------------------------
+
+
+def test_parse_pid_line_extracts_all_fields_in_one_pass():
+    line = "PID|1||12345^^^HOSP^MR||Doe^John||19800101|M|"
+
+    assert _parse_pid_line(line) == ("12345", "Doe", "John", "19800101", "M")
+    assert _parse_pid_line("PID|1||X||OnlyFam^") == ("X", "OnlyFam", None, None, None)
+    assert _parse_pid_line(None) == (None, None, None, None, None)
+
+
+def test_parse_orc_and_obr_lines():
+    assert _parse_orc_line("ORC|NW|P1||F1|CM|") == ("P1", None, "CM")
+    assert _parse_orc_line("ORC|NW||F2") == (None, "F2", None)
+    assert _parse_orc_line(None) == (None, None, None)
+    assert _parse_obr_line("OBR|1|P1|F1|GLU^Glucose|||") == ("GLU", "Glucose")
+    assert _parse_obr_line("OBR|1|P1|F1||") == (None, None)
+    assert _parse_obr_line("OBR|1|P1") == (None, None)
+    assert _parse_obr_line(None) == (None, None)
+
+
+# ------------------------------------------------------------------------------
+# _fhir()
+# ------------------------------------------------------------------------------
+
+
+def test_fhir_classes_are_imported_lazily_and_cached():
+    mod_globals = _first_segment_line.__globals__
+
+    assert "ServiceRequest" not in mod_globals and "Patient" not in mod_globals
+    assert _fhir() is _fhir()
+    assert _fhir().ServiceRequest.__name__ == "ServiceRequest"
+
+
+# ------------------------------------------------------------------------------
+# _patient_ref()
+# ------------------------------------------------------------------------------
+
+
+def test_patient_ref_is_cached_per_patient_id():
+    r1 = _patient_ref("P100")
+    r2 = _patient_ref("P100")
+    r3 = _patient_ref("P200")
+
+    assert r1 is r2
+    assert r1.reference == "Patient/P100"
+    assert r3 is not r1 and r3.reference == "Patient/P200"
+
+
+def test_transform_copies_subject_reference_for_same_patient(parsed, xf):
+    msgs = [
+        parsed(
+            _raw_orm(
+                "ORM^O01",
+                "PID|1||SAME1^^^HOSP^MR||Doe^Jane||19800101|F|",
+                f"ORC|NW|{placer}||F1|NW||||202501011230||||||||||",
+                "OBR|1|P1|F1|GLU^Glucose|||202501011200|||||||||||||||||||||||",
+            )
+        )
+        for placer in ("PA", "PB")
+    ]
+    (_, sr1), (_, sr2) = (xf.transform(m) for m in msgs)
+
+    assert sr1.subject is not sr2.subject
+    assert sr1.subject is not _patient_ref("SAME1")
+    assert sr1.subject.reference == sr2.subject.reference == "Patient/SAME1"
 
 
 # ------------------------------------------------------------------------------
@@ -197,13 +419,13 @@ def test_field_comp_from_er7_and_to_er7():
 # ------------------------------------------------------------------------------
 
 
-def test_first_segment_line_and_find_first_paths():
+def test_first_segment_line_and_find_first_paths(parsed):
 
     class DummyMsg:
         def to_er7(self):
             raise RuntimeError("boom")
 
-    msg = parse_message(
+    msg = parsed(
         _raw_orm(
             "ORM^O01",
             "PID|1||ABC^^^HOSP^MR||FamName^GivName||20000101|F|",
@@ -222,129 +444,142 @@ def test_first_segment_line_and_find_first_paths():
     assert _find_first(msg, "OBR") is not None
 
 
-def test_first_segment_line_codeable_reference_retry_without_code(monkeypatch):
+def test_first_segment_lines_collects_requested_segments_in_one_pass():
 
-    class BoomCR:
-        def __init__(self, *_, **__):
-            raise ValueError("boom")
+    class CountingMsg:
+        calls = 0
 
-    CodeableReference_orig = _first_segment_line.__globals__["CodeableReference"]
-    _first_segment_line.__globals__["CodeableReference"] = BoomCR
-    try:
-        xf = ORMO01Transformer()
-        msg = parse_message(
-            "\r".join(
+        def to_er7(self):
+            CountingMsg.calls += 1
+            return "\n".join(
                 [
-                    "MSH|^~\\&|EPIC|HOSP|LIS|LAB|202501011230||ORM^O01|X|P|2.5",
-                    "PID|1||900^^^HOSP^MR||X^Y||19700101|M|",
-                    "ORC|NW|PLX||FLX|NW||||202501011230||||||||||",
-                    "OBR|1|PLX|FLX|HGB^Hemoglobin|||202501011200|||||||||||||||||||||||",
+                    "MSH|^~\\&|A|B|C|D|202501011230||ORM^O01|X|P|2.5",
+                    "PID|1||P1||A^B||19700101|M|",
+                    "OBR|1|P1|F1|GLU^Glucose|",
+                    "PID|2||P2||C^D||19700101|F|",
                 ]
             )
-        )
-        patient, sr = xf.transform(msg)
 
-        assert sr.intent == "order" and sr.status == "active"
-        assert getattr(sr, "code", None) is None
-        assert sr.subject.reference == f"Patient/{patient.id}"
-    finally:
-        _first_segment_line.__globals__["CodeableReference"] = CodeableReference_orig
+    lines = _first_segment_lines(CountingMsg(), ("PID", "ORC", "OBR"))
 
+    assert CountingMsg.calls == 1
+    assert lines == {
+        "PID": "PID|1||P1||A^B||19700101|M|",
+        "OBR": "OBR|1|P1|F1|GLU^Glucose|",
+    }
+    assert _first_segment_lines(CountingMsg(), ("PID",)) == {
+        "PID": "PID|1||P1||A^B||19700101|M|"
+    }
 
-# ------------------------------------------------------------------------------
-# _find_first()
-# ------------------------------------------------------------------------------
 
+def test_first_segment_line_long_message_serializes_once_per_lookup(parsed):
+    msg = parsed(_LONG_ORM)
 
-def test_find_first_children_and_recursion_exception_paths():
+    class CountingMsg:
+        calls = 0
 
-    class ChildRaisesOnName:
-        @property
-        def name(self):
-            raise RuntimeError("boom")
-
-    class Leaf:
-        name = "OBR"
-
-    class Mid:
-        name = "MID"
-        children = [Leaf()]
-
-    class Root:
-        children = [ChildRaisesOnName(), Mid()]
-
-    class RootEmpty:
-        children = []
-
-    assert _find_first(Root(), "OBR") is not None
-    assert _find_first(RootEmpty(), "ZZZ") is None
-
-
-def test_find_first_attr_get_raises_then_children_scan_continues():
-
-    class BoomOnOBR:
-        def __getattr__(self, name):
-            if name == "OBR":
-                raise RuntimeError("boom")
-            raise AttributeError
-
-        children = []
-
-    assert _find_first(BoomOnOBR(), "OBR") is None
-
-
-def test_find_first_children_get_raises_then_recursion_except_and_return_none():
-
-    class NoChildrenProp:
-        def __getattr__(self, name):
-            if name == "children":
-                raise RuntimeError("boom")
-            raise AttributeError
-
-    class ChildBad:
-        def __getattr__(self, name):
-            if name in ("children", "name"):
-                raise RuntimeError("bad child")
-            raise AttributeError
-
-    root = type("Root", (), {"children": [ChildBad()]})()
+        def to_er7(self):
+            CountingMsg.calls += 1
+            return msg.to_er7()
 
-    assert _find_first(NoChildrenProp(), "PID") is None
-    assert _find_first(root, "ZZZ") is None
+    assert _first_segment_line(CountingMsg(), "OBR") == (
+        "OBR|1|PL|FL|GLU^Glucose|||202501011200"
+    )
+    assert _first_segment_line(CountingMsg(), "OBX") == (
+        "OBX|1|NM|GLU^Glucose||1|mg/dL|||||F"
+    )
+    assert _first_segment_line(CountingMsg(), "NTE") is None
+    assert CountingMsg.calls == 3
 
 
-def test_find_first_recursion_miss_then_continue_loop():
+def test_first_segment_line_codeable_reference_retry_without_code(
+    monkeypatch, parsed, xf
+):
 
-    class LeafNoMatch:
-        name = "ZZZ"
-        children = []
+    class BoomCR:
+        def __init__(self, *_, **__):
+            raise ValueError("boom")
 
-    class ChildWithChildren:
-        name = "MID"
-        children = [LeafNoMatch()]
+    monkeypatch.setattr(_fhir(), "CodeableReference", BoomCR)
+    msg = parsed(
+        "\r".join(
+            [
+                "MSH|^~\\&|EPIC|HOSP|LIS|LAB|202501011230||ORM^O01|X|P|2.5",
+                "PID|1||900^^^HOSP^MR||X^Y||19700101|M|",
+                "ORC|NW|PLX||FLX|NW||||202501011230||||||||||",
+                "OBR|1|PLX|FLX|HGB^Hemoglobin|||202501011200|||||||||||||||||||||||",
+            ]
+        )
+    )
+    patient, sr = xf.transform(msg)
 
-    class ChildNoChildren:
-        name = "NOPE"
-        children = []
+    assert sr.intent == "order" and sr.status == "active"
+    assert getattr(sr, "code", None) is None
+    assert sr.subject.reference == f"Patient/{patient.id}"
 
-    root = type("Root", (), {"children": [ChildWithChildren(), ChildNoChildren()]})()
 
-    assert _find_first(root, "OBR") is None
+# ------------------------------------------------------------------------------
+# _find_first()
+# ------------------------------------------------------------------------------
 
 
-def test_find_first_no_children_attr_and_wrong_name():
+@pytest.mark.parametrize(
+    "root,target,expected",
+    [
+        # child .name raises, then found by recursing into MID
+        (_StubRoot(), "OBR", "OBR"),
+        (_StubRootEmpty(), "ZZZ", None),
+        # attribute lookup raises, children scan (empty) continues
+        (_StubBoomOnOBR(), "OBR", None),
+        # .children itself raises
+        (_StubNoChildrenProp(), "PID", None),
+        # child .children and .name raise during scan and recursion
+        (SimpleNamespace(children=[_StubChildBad()]), "ZZZ", None),
+        # recursion misses in MID, loop continues to a childless sibling
+        (
+            SimpleNamespace(
+                children=[
+                    SimpleNamespace(
+                        name="MID", children=[SimpleNamespace(name="ZZZ", children=[])]
+                    ),
+                    SimpleNamespace(name="NOPE", children=[]),
+                ]
+            ),
+            "OBR",
+            None,
+        ),
+        # no children attribute at all / only a wrongly named leaf
+        (SimpleNamespace(name="PID"), "OBR", None),
+        (SimpleNamespace(children=[SimpleNamespace(name="ZZZ")]), "OBR", None),
+    ],
+    ids=[
+        "found-via-recursion",
+        "empty-root",
+        "attr-get-raises",
+        "children-get-raises",
+        "child-lookups-raise",
+        "recursion-miss-continues",
+        "no-children-attr",
+        "wrong-name-leaf",
+    ],
+)
+def test_find_first_paths(root, target, expected):
+    result = _find_first(root, target)
+    if expected is None:
+        assert result is None
+    else:
+        assert result.name == expected
 
-    class NoChildren:
-        name = "PID"
 
-    class Leaf:
-        name = "ZZZ"
+def test_find_first_unexpected_error_propagates():
 
-    class Root:
-        children = [Leaf()]
+    class Broken:
+        @property
+        def OBR(self):
+            raise RuntimeError("bug")
 
-    assert _find_first(NoChildren(), "OBR") is None
-    assert _find_first(Root(), "OBR") is None
+    with pytest.raises(RuntimeError, match="bug"):
+        _find_first(Broken(), "OBR")
 
 
 # ------------------------------------------------------------------------------
@@ -353,39 +588,7 @@ def test_find_first_no_children_attr_and_wrong_name():
 
 
 def test_build_patient_all_components():
-
-    class _V:
-        def __init__(self, s):
-            self.s = s
-
-        def to_er7(self):
-            return self.s
-
-    class PID:
-        @property
-        def pid_3(self):
-            class Rep:
-                cx_1 = _V("COMPID123")
-
-            return [Rep()]
-
-        @property
-        def pid_5(self):
-            class Name:
-                family_name = _V("CompFamily")
-                given_name = _V("CompGiven")
-
-            return [Name()]
-
-        @property
-        def pid_7(self):
-            return _V("19840229")
-
-        @property
-        def pid_8(self):
-            return _V("F")
-
-    p = ORMO01Transformer._build_patient(PID(), None)
+    p = ORMO01Transformer._build_patient(_StubPidAllComponents(), None)
 
     assert p.id == "COMPID123"
     assert p.name[0].family == "CompFamily" and p.name[0].given == ["CompGiven"]
@@ -396,49 +599,21 @@ def test_build_patient_all_components():
 @pytest.mark.parametrize(
     "pid_obj, raw_line, expected_id",
     [
+        (SimpleNamespace(pid_3=None), "PID|||RF01^ASSIGN||A^B||19700203|M", "RF01"),
+        (SimpleNamespace(pid_3=[]), "PID|||RF02||A^B||19840102|F", "RF02"),
         (
-            type("PID", (), {"pid_3": None})(),
-            "PID|||RF01^ASSIGN||A^B||19700203|M",
-            "RF01",
-        ),
-        (type("PID", (), {"pid_3": []})(), "PID|||RF02||A^B||19840102|F", "RF02"),
-        (
-            type(
-                "PID",
-                (),
-                {
-                    "pid_3": type(
-                        "X",
-                        (),
-                        {
-                            "__len__": lambda self: (_ for _ in ()).throw(
-                                RuntimeError("boom")
-                            )
-                        },
-                    )()
-                },
-            )(),
+            SimpleNamespace(pid_3=_StubLenRaises()),
             "PID|||RF03^ASSIGN||A^B||19650101|M",
             "RF03",
         ),
         (
-            type(
-                "PID",
-                (),
-                {
-                    "pid_3": type(
-                        "X",
-                        (),
-                        {"__len__": lambda self: 1, "__bool__": lambda self: False},
-                    )()
-                },
-            )(),
+            SimpleNamespace(pid_3=_StubFalsyLenOne()),
             "PID|||RF04||A^B||19991231|U",
             "RF04",
         ),
         # rep exists but has neither cx_1 nor id_number
         (
-            type("PID", (), {"pid_3": [type("Rep", (), {})()]})(),
+            SimpleNamespace(pid_3=[SimpleNamespace()]),
             "PID|||RF05||A^B||19770101|F",
             "RF05",
         ),
@@ -473,8 +648,8 @@ def test_build_patient_names_dates_gender_raw_fallbacks():
     assert p.gender == "female"
 
 
-def test_build_patient_family_only_and_unknown_gender_paths():
-    msg = parse_message(
+def test_build_patient_family_only_and_unknown_gender_paths(parsed):
+    msg = parsed(
         "\r".join(
             [
                 "MSH|^~\\&|EPIC|HOSP|LIS|LAB|202501011230||ORM^O01|X|P|2.5",
@@ -511,16 +686,12 @@ def test_build_patient_component_then_raw_and_id_setter_raises(monkeypatch):
         def pid_5(self):
             return ()
 
-    Patient_orig = _first_segment_line.__globals__["Patient"]
-    _first_segment_line.__globals__["Patient"] = RaisingIdPatient
-    try:
-        raw = "PID|1||RAWID^^^HOSP^MR||FamName^GivName||19701231|M|"
-        p = ORMO01Transformer._build_patient(PidStub(), raw)
+    monkeypatch.setattr(_fhir(), "Patient", RaisingIdPatient)
+    raw = "PID|1||RAWID^^^HOSP^MR||FamName^GivName||19701231|M|"
+    p = ORMO01Transformer._build_patient(PidStub(), raw)
 
-        assert p.name[0].family == "FamName" and p.name[0].given == ["GivName"]
-        assert str(p.birthDate) == "1970-12-31" and p.gender == "male"
-    finally:
-        _first_segment_line.__globals__["Patient"] = Patient_orig
+    assert p.name[0].family == "FamName" and p.name[0].given == ["GivName"]
+    assert str(p.birthDate) == "1970-12-31" and p.gender == "male"
 
 
 def test_build_patient_pid3_falls_back_and_pid3_absent_logs_not_found():
@@ -543,29 +714,10 @@ def test_build_patient_pid3_falls_back_and_pid3_absent_logs_not_found():
 
 
 def test_build_patient_pid5_structured_variants_and_raw_fallbacks():
-
-    class PidFamOnly:
-        @property
-        def pid_5(self):
-            class Nm:
-                family_name = type("Pid5Value", (), {"to_er7": lambda self: "Fam"})()
-                given_name = None
-
-            return [Nm()]
-
-    class PidGivenOnly:
-        @property
-        def pid_5(self):
-            class Nm:
-                family_name = None
-                given_name = type("Pid5Value", (), {"to_er7": lambda self: "Giv"})()
-
-            return [Nm()]
-
-    p1 = ORMO01Transformer._build_patient(PidFamOnly(), None)
-    p2 = ORMO01Transformer._build_patient(PidGivenOnly(), None)
+    p1 = ORMO01Transformer._build_patient(_StubPidFamOnly(), None)
+    p2 = ORMO01Transformer._build_patient(_StubPidGivenOnly(), None)
     p3 = ORMO01Transformer._build_patient(
-        type("PidNone", (), {"pid_5": None})(),
+        SimpleNamespace(pid_5=None),
         "PID|1||X||FamilyRaw^GivenRaw||19800101|M|",
     )
 
@@ -579,7 +731,7 @@ def test_build_patient_pid7_birthdate_component_and_raw_and_invalid():
     class Pid7:
         @property
         def pid_7(self):
-            return type("Pid7Value", (), {"to_er7": lambda self: "19751231"})()
+            return _StubER7("19751231")
 
     p1 = ORMO01Transformer._build_patient(Pid7(), None)
     p2 = ORMO01Transformer._build_patient(None, "PID|1||X||A^B||19840229|F|")
@@ -595,7 +747,7 @@ def test_build_patient_pid8_gender_paths_and_exception_guard():
     class Pid8M:
         @property
         def pid_8(self):
-            return type("Pid8Value", (), {"to_er7": lambda self: "M"})()
+            return _StubER7("M")
 
     class BadPid:
         @property
@@ -612,12 +764,22 @@ def test_build_patient_pid8_gender_paths_and_exception_guard():
     assert p3.gender == "unknown"
 
 
+def test_build_patient_without_pid_returns_independent_empty_copies():
+    p1 = ORMO01Transformer._build_patient(None, None)
+    p2 = ORMO01Transformer._build_patient(None, "")
+    p1.id = "MUTATED"
+
+    assert p1 is not p2
+    assert getattr(p2, "id", None) is None
+    assert ORMO01Transformer._build_patient(None, None).id is None
+
+
 # ------------------------------------------------------------------------------
 # _build_service_request()
 # ------------------------------------------------------------------------------
 
 
-def test_build_service_request_orc_component_ids_and_completed_status():
+def test_build_service_request_orc_component_ids_and_completed_status(xf):
 
     class _V:
         def __init__(self, v):
@@ -631,7 +793,6 @@ def test_build_service_request_orc_component_ids_and_completed_status():
         orc_3 = _V("FILLERY")
         orc_5 = _V("CM")
 
-    xf = ORMO01Transformer()
     p = xf._build_patient(None, None)
     sr = xf._build_service_request(
         orc=ORC(), obr=None, patient=p, orc_line=None, obr_line=None
@@ -640,7 +801,7 @@ def test_build_service_request_orc_component_ids_and_completed_status():
     assert sr.id == "PLACERX" and sr.status == "completed" and sr.intent == "order"
 
 
-def test_build_service_request_orc_and_obr_component_paths_minimal():
+def test_build_service_request_orc_and_obr_component_paths_minimal(xf):
 
     class Orc:
         class orc_2:
@@ -660,7 +821,6 @@ def test_build_service_request_orc_and_obr_component_paths_minimal():
             def to_er7(self):
                 return "GLU^Glucose"
 
-    xf = ORMO01Transformer()
     p = xf._build_patient(None, None)
     sr = xf._build_service_request(
         orc=Orc(), obr=Obr(), patient=p, orc_line=None, obr_line=None
@@ -669,8 +829,7 @@ def test_build_service_request_orc_and_obr_component_paths_minimal():
     assert sr.intent == "order" and sr.status == "active" and getattr(sr, "id", None)
 
 
-def test_build_service_request_sr_defaults_when_segments_missing():
-    xf = ORMO01Transformer()
+def test_build_service_request_sr_defaults_when_segments_missing(xf):
     p = xf._build_patient(None, None)
     sr = xf._build_service_request(
         orc=None, obr=None, patient=p, orc_line=None, obr_line=None
@@ -683,14 +842,13 @@ def test_build_service_request_sr_defaults_when_segments_missing():
     )
 
 
-def test_build_service_request_sr_identifiers_from_orc_raw_and_component_and_except():
+def test_build_service_request_sr_identifiers_from_orc_raw_and_component_and_except(xf):
 
     class ORCComp:
         def __init__(self):
-            self.orc_2 = type("Orc2Value", (), {"to_er7": lambda self: "PLX"})()
-            self.orc_3 = type("Orc3Value", (), {"to_er7": lambda self: "FLY"})()
+            self.orc_2 = _StubER7("PLX")
+            self.orc_3 = _StubER7("FLY")
 
-    xf = ORMO01Transformer()
     patient = xf._build_patient(None, "PID|1||PATID||A^B||19700101|M|")
     sr1 = xf._build_service_request(
         orc=None, obr=None, patient=patient, orc_line="ORC|NW|PL123||", obr_line=None
@@ -709,27 +867,19 @@ def test_build_service_request_sr_identifiers_from_orc_raw_and_component_and_exc
     assert sr3.id in {"PLX", "FLY"}
 
 
-def test_build_service_request_sr_obr_code_components_and_obr_exception():
+def test_build_service_request_sr_obr_code_components_and_obr_exception(xf):
 
     class OBRComp:
         def __init__(self):
-            self.obr_4 = type(
-                "OBR4Composite",
-                (),
-                {
-                    "identifier": type(
-                        "OBR4Identifier", (), {"to_er7": lambda self: "GLU"}
-                    )(),
-                    "text": type("OBR4Text", (), {"to_er7": lambda self: "Glucose"})(),
-                },
-            )()
+            self.obr_4 = SimpleNamespace(
+                identifier=_StubER7("GLU"), text=_StubER7("Glucose")
+            )
 
     class OBRBad:
         @property
         def obr_4(self):
             raise RuntimeError("nope")
 
-    xf = ORMO01Transformer()
     patient = xf._build_patient(None, "PID|1||X||A^B||19700101|M|")
     sr1 = xf._build_service_request(
         orc=None, obr=OBRComp(), patient=patient, orc_line=None, obr_line=None
@@ -742,18 +892,17 @@ def test_build_service_request_sr_obr_code_components_and_obr_exception():
     assert sr2.intent == "order" and sr2.status in {"active", "completed"}
 
 
-def test_build_service_request_sr_status_from_orc5_component_and_exception():
+def test_build_service_request_sr_status_from_orc5_component_and_exception(xf):
 
     class ORC5:
         def __init__(self):
-            self.orc_5 = type("ORC5Status", (), {"to_er7": lambda self: "CM"})()
+            self.orc_5 = _StubER7("CM")
 
     class ORCBad:
         @property
         def orc_5(self):
             raise RuntimeError("boom")
 
-    xf = ORMO01Transformer()
     patient = xf._build_patient(None, None)
     sr = xf._build_service_request(
         orc=ORC5(), obr=None, patient=patient, orc_line=None, obr_line=None
@@ -767,56 +916,24 @@ def test_build_service_request_sr_status_from_orc5_component_and_exception():
 
 
 def test_build_service_request_sr_id_exception_fallback_branch_tracks_raise(
-    monkeypatch,
+    sr_shim, xf
 ):
-
-    class _SRShim:
-        def __init__(
-            self, intent=None, status=None, code=None, identifier=None, subject=None
-        ):
-            self.intent = intent
-            self.status = status
-            self.code = code
-            self.identifier = identifier
-            self.subject = subject
-            self._raised_once = False
-            self.id = None
-
-        def __setattr__(self, name, value):
-            if (
-                name == "id"
-                and value == "IDX"
-                and not getattr(self, "_raised_once", False)
-            ):
-                object.__setattr__(self, "_raised_once", True)
-                raise ValueError("simulate invalid id on first set")
-            return object.__setattr__(self, name, value)
-
-    xf = ORMO01Transformer()
     patient = xf._build_patient(None, "PID|1||PID9||A^B||19700101|M|")
-    fn = ORMO01Transformer._build_service_request
-    SR_orig = fn.__globals__["ServiceRequest"]
-
-    # Force the function to use our shim instead of the real ServiceRequest
-    monkeypatch.setitem(fn.__globals__, "ServiceRequest", _SRShim)
-    try:
-        sr = xf._build_service_request(
-            orc=None,
-            obr=None,
-            patient=patient,
-            orc_line="ORC|NW|IDX||",
-            obr_line=None,
-        )
-    finally:
-        # restore
-        monkeypatch.setitem(fn.__globals__, "ServiceRequest", SR_orig)
+    sr = xf._build_service_request(
+        orc=None,
+        obr=None,
+        patient=patient,
+        orc_line="ORC|NW|IDX||",
+        obr_line=None,
+    )
 
+    assert isinstance(sr, sr_shim)
     assert sr.id == f"sr-{patient.id}"
     assert sr.status == "active"
     assert sr.intent == "order"
 
 
-def test_build_service_request_sr_build_with_partial_obr(monkeypatch):
+def test_build_service_request_sr_build_with_partial_obr(monkeypatch, xf):
 
     class Obr:
         obr_4 = None
@@ -824,7 +941,6 @@ def test_build_service_request_sr_build_with_partial_obr(monkeypatch):
         obr_16 = None
         obr_32 = None
 
-    xf = ORMO01Transformer()
     p = xf._build_patient(None, None)
     sr = xf._build_service_request(
         orc=None, obr=Obr(), patient=p, orc_line=None, obr_line=None
@@ -834,7 +950,9 @@ def test_build_service_request_sr_build_with_partial_obr(monkeypatch):
     assert sr.intent == "order"
 
 
-def test_build_service_request_sr_orc_block_exception_is_caught_and_logged(monkeypatch):
+def test_build_service_request_sr_orc_block_exception_is_caught_and_logged(
+    monkeypatch, xf
+):
 
     class BadORC:
         @property
@@ -860,7 +978,6 @@ def test_build_service_request_sr_orc_block_exception_is_caught_and_logged(monke
             except Exception:
                 self.debugs.append(str(msg))
 
-    xf = ORMO01Transformer()
     patient = xf._build_patient(None, "PID|1||P1||X^Y||19700101|M|")
     fn = ORMO01Transformer._build_service_request
     spy = _LogSpy()
@@ -874,35 +991,14 @@ def test_build_service_request_sr_orc_block_exception_is_caught_and_logged(monke
     assert sr.intent == "order" and sr.status == "active"
 
 
-def test_build_service_request_sr_id_fallback_when_first_set_raises(monkeypatch):
+def test_build_service_request_sr_id_fallback_when_first_set_raises(sr_shim):
 
     class _DummyPatient:
         def __init__(self, pid: str = "ZZ999") -> None:
             self.id = pid
 
-    class _SRShim:
-        def __init__(
-            self, intent=None, status=None, code=None, identifier=None, subject=None
-        ):
-            self.intent = intent
-            self.status = status
-            self.code = code
-            self.identifier = identifier
-            self.subject = subject
-            self._first_raise_done = False
-
-        def __setattr__(self, name, value):
-            if name == "id":
-                if not getattr(self, "_first_raise_done", False):
-                    object.__setattr__(self, "_first_raise_done", True)
-                    raise ValueError("simulate invalid id on first set")
-                return object.__setattr__(self, name, value)
-            return object.__setattr__(self, name, value)
-
     patient = _DummyPatient("ZZ999")
     orc_line = "ORC|NW|PLACER123||SC"
-    fn = ORMO01Transformer._build_service_request
-    monkeypatch.setitem(fn.__globals__, "ServiceRequest", _SRShim)
     sr = ORMO01Transformer._build_service_request(
         orc=None,
         obr=None,
@@ -914,22 +1010,14 @@ def test_build_service_request_sr_id_fallback_when_first_set_raises(monkeypatch)
     assert sr.id == "sr-ZZ999"
 
 
-def test_build_service_request_sr_obr_components_path_builds_codeable_concept_text():
+def test_build_service_request_sr_obr_components_path_builds_codeable_concept_text(xf):
 
     class OBRComp:
         def __init__(self):
-            self.obr_4 = type(
-                "OBR4Composite",
-                (),
-                {
-                    "identifier": type(
-                        "OBR4Identifier", (), {"to_er7": lambda self: "GLU"}
-                    )(),
-                    "text": type("ORB4Text", (), {"to_er7": lambda self: "Glucose"})(),
-                },
-            )()
-
-    xf = ORMO01Transformer()
+            self.obr_4 = SimpleNamespace(
+                identifier=_StubER7("GLU"), text=_StubER7("Glucose")
+            )
+
     patient = xf._build_patient(None, "PID|1||Z9||A^B||19700101|M|")
     sr = xf._build_service_request(
         orc=None, obr=OBRComp(), patient=patient, orc_line=None, obr_line=None
@@ -938,45 +1026,15 @@ def test_build_service_request_sr_obr_components_path_builds_codeable_concept_te
     assert _code_text(sr) == "Glucose"
 
 
-def test_build_service_request_sr_id_assignment_exception_branch_minimal(monkeypatch):
-
-    class _SRShim:
-        def __init__(
-            self, intent=None, status=None, code=None, identifier=None, subject=None
-        ):
-            self.intent = intent
-            self.status = status
-            self.code = code
-            self.identifier = identifier
-            self.subject = subject
-            self._raised_once = False
-            self.id = None
-
-        def __setattr__(self, name, value):
-            if (
-                name == "id"
-                and value == "IDX"
-                and not getattr(self, "_raised_once", False)
-            ):
-                object.__setattr__(self, "_raised_once", True)
-                raise ValueError("simulate invalid id on first set")
-            return object.__setattr__(self, name, value)
-
-    xf = ORMO01Transformer()
+def test_build_service_request_sr_id_assignment_exception_branch_minimal(sr_shim, xf):
     patient = xf._build_patient(None, "PID|1||PID9||A^B||19700101|M|")
-    fn = ORMO01Transformer._build_service_request
-    SR_orig = fn.__globals__["ServiceRequest"]
-    monkeypatch.setitem(fn.__globals__, "ServiceRequest", _SRShim)
-    try:
-        sr = ORMO01Transformer._build_service_request(
-            orc=None,
-            obr=None,
-            patient=patient,
-            orc_line="ORC|NW|IDX||",
-            obr_line=None,
-        )
-    finally:
-        monkeypatch.setitem(fn.__globals__, "ServiceRequest", SR_orig)
+    sr = ORMO01Transformer._build_service_request(
+        orc=None,
+        obr=None,
+        patient=patient,
+        orc_line="ORC|NW|IDX||",
+        obr_line=None,
+    )
 
     assert sr.id == f"sr-{patient.id}"
     assert sr.identifier and sr.identifier[0].value == "IDX"
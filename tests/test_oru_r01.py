@@ -1,15 +1,26 @@
 # tests/test_oru_r01.py
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
 from hl7apy.parser import parse_message
 
 from hl7_fhir_tool.transform.v2_to_fhir.oru_r01 import (
     ORUR01Transformer,
     _parse_hl7_yyyymmdd,
     _er7,
+    _er7_lines,
+    _collect_segments,
     _field_comp_from_er7,
+    _first_attr,
+    _to_decimal,
     _find_first,
+    _fhir,
     _first_segment_line,
+    _tok_comp,
+    _tokenize_segment,
 )
 
 
@@ -78,6 +89,14 @@ def test_applies_empty_msh9_returns_false():
     assert xf.applies(msg) is False
 
 
+def test_fhir_classes_are_imported_lazily_and_cached():
+    mod_globals = _first_segment_line.__globals__
+
+    assert "Observation" not in mod_globals and "Patient" not in mod_globals
+    assert _fhir() is _fhir()
+    assert _fhir().Observation.__name__ == "Observation"
+
+
 # ------------------------------------------------------------------------------
 # _parse_hl7_yyyymmdd
 # ------------------------------------------------------------------------------
@@ -92,6 +111,12 @@ def test_parse_hl7_yyyymmdd_object_to_er7_raises_returns_none():
     assert _parse_hl7_yyyymmdd(Boom()) is None
 
 
+def test_parse_hl7_yyyymmdd_valid_and_invalid_dates():
+    assert _parse_hl7_yyyymmdd("20240229123000") == "2024-02-29"
+    assert _parse_hl7_yyyymmdd("20230229") is None
+    assert _parse_hl7_yyyymmdd("2024") is None
+
+
 # ------------------------------------------------------------------------------
 # _er7()
 # ------------------------------------------------------------------------------
@@ -134,6 +159,64 @@ def test_field_comp_from_er7_oru():
     assert _field_comp_from_er7("OBX|1|||||mg/dL", 6, 1) == "mg/dL"
     assert _field_comp_from_er7(line, 99, 1) is None
     assert _field_comp_from_er7(None, 3, 1) is None
+    assert _field_comp_from_er7(line, 0, 1) is None
+    assert _field_comp_from_er7(line, 3, 0) is None
+
+
+def test_first_attr_returns_first_truthy_or_none():
+
+    class _CE:
+        identifier = ""
+        ce_1 = "GLU"
+
+    assert _first_attr(_CE(), ("identifier", "ce_1")) == "GLU"
+    assert _first_attr(_CE(), ("identifier", "missing")) is None
+
+
+def test_to_decimal_keeps_precision_and_rejects_non_numeric():
+    assert str(_to_decimal("5.50")) == "5.50"
+    assert _to_decimal("-7") == -7 and _to_decimal("+.5") == Decimal("0.5")
+    assert _to_decimal("1e3") == 1000
+    assert _to_decimal("NaN") is None and _to_decimal("Infinity") is None
+    assert _to_decimal("") is None and _to_decimal("5.5.5") is None
+
+
+def test_er7_lines_handles_cr_lf_crlf_and_keeps_control_chars():
+
+    class _Msg:
+        def __init__(self, text):
+            self.text = text
+
+        def to_er7(self):
+            return self.text
+
+    assert _er7_lines(_Msg("MSH|a\rPID|b\x85c")) == ["MSH|a", "PID|b\x85c"]
+    assert _er7_lines(_Msg("MSH|a\nPID|b")) == ["MSH|a", "PID|b"]
+    assert _er7_lines(_Msg("MSH|a\r\nPID|b\rOBX|c")) == ["MSH|a", "PID|b", "OBX|c"]
+    assert _er7_lines(_Msg("")) == []
+
+
+def test_tokenize_segment_and_tok_comp():
+    tok = _tokenize_segment(" OBX|1|NM|GLU^Glucose||105|mg/dL^ milligrams |")
+
+    assert tok[0] == ["OBX"] and tok[4] == [] and tok[-1] == []
+    assert _tok_comp(tok, 3, 2) == "Glucose"
+    assert _tok_comp(tok, 6, 2) == "milligrams"
+    assert _tok_comp(tok, 3, 3) is None
+    assert _tok_comp(tok, 4, 1) is None
+    assert _tokenize_segment(None) == [] and _tokenize_segment(object()) == []
+
+
+def test_tokenize_segment_last_field_stops_splitting():
+    line = "OBX|1|ED|DOC^Report||^AP^PDF^Base64^QUJD|||||F"
+
+    assert _tokenize_segment(line, last_field=3) == [
+        ["OBX"],
+        ["1"],
+        ["ED"],
+        ["DOC", "Report"],
+    ]
+    assert _tokenize_segment("PID|1", last_field=8) == [["PID"], ["1"]]
 
 
 # ------------------------------------------------------------------------------
@@ -203,6 +286,19 @@ def test_find_first_attribute_direct_child_recursive_and_missing():
     assert _find_first(r, "NOPE") is None
 
 
+def test_find_first_breadth_first_prefers_shallowest_match():
+
+    class _N:
+        def __init__(self, name, children=()):
+            self.name = name
+            self.children = list(children)
+
+    deep, shallow = _N("PID"), _N("PID")
+    root = _N("ROOT", [_N("G", [_N("H", [deep])]), _N("K", [shallow])])
+
+    assert _find_first(root, "PID") is shallow
+
+
 def test_find_first_treats_empty_and_len_raising_containers():
 
     class Seg:
@@ -323,14 +419,103 @@ def test_transform_obx_scan_if_er7_returns_empty_string(monkeypatch):
         "MSH|^~\\&|a|b|c|d|20250101||ORU^R01|M|P|2.5\rPID|1||E0||A^B||19700101|M|"
     )
     fn = ORUR01Transformer.transform
-    real_er7 = fn.__globals__["_er7"]
     monkeypatch.setitem(fn.__globals__, "_er7", _empty)
-    try:
-        res = xf.transform(msg)
+    res = xf.transform(msg)
+
+    assert len(res) == 1 and getattr(res[0], "id", None) == "E0"
+
+
+def test_transform_serializes_message_once():
+
+    class _Msg:
+        calls = 0
+        children = []
+
+        def to_er7(self):
+            _Msg.calls += 1
+            return (
+                "MSH|^~\\&|A|B|C|D|20250101||ORU^R01|M|P|2.5\r"
+                "PID|1||ONCE||L^F||19700101|F|\r"
+                "OBR|1|O|F|GLU^Glucose|||20250101101010\r"
+                "OBX|1|NM|GLU^Glucose||7.5|mg/dL|||||F||||\r"
+                "OBX|2|NM|NA^Sodium||140|mmol/L|||||F||||"
+            )
+
+    res = ORUR01Transformer().transform(_Msg())
+
+    assert _Msg.calls == 1
+    assert [getattr(r, "id", None) for r in res] == ["ONCE", "obs-ONCE-1", "obs-ONCE-2"]
+    assert res[2].identifier[0].value == "O"
+
+
+def test_transform_pairs_nested_obx_segments_in_document_order(monkeypatch):
+    msg = parse_message(
+        _raw_oru(
+            "ORU^R01",
+            "PID|1||NEST||L^F||19700101|F|",
+            "OBR|1|O|F|GLU^Glucose|||20250101101010",
+            [
+                "OBX|1|NM|GLU^Glucose||7.5|mg/dL|||||F",
+                "OBX|2|NM|NA^Sodium||140|mmol/L|||||F",
+            ],
+        )
+    )
+    seen = []
+    real_build = ORUR01Transformer._build_observation
+
+    def _spy(**kwargs):
+        seen.append(kwargs["obx"])
+        return real_build(**kwargs)
+
+    monkeypatch.setattr(ORUR01Transformer, "_build_observation", staticmethod(_spy))
+    res = ORUR01Transformer().transform(msg)
+
+    assert len(res) == 3
+    assert [o.name for o in seen] == ["OBX", "OBX"]
+    assert [o.obx_1.to_er7() for o in seen] == ["1", "2"]
+
+
+def test_collect_segments_single_walk_keeps_first_pid_obr_and_all_obx():
+
+    class _N:
+        def __init__(self, name, children=()):
+            self.name = name
+            self.children = list(children)
+
+    class _Boom:
+        @property
+        def name(self):
+            raise RuntimeError("nope")
+
+    pid1, pid2 = _N("PID"), _N("PID")
+    obr1, obr2 = _N("OBR"), _N("OBR")
+    obx1, obx2 = _N("OBX"), _N("OBX")
+    root = _N(
+        "ROOT",
+        [_N("G1", [pid1, obr1, obx1]), _Boom(), _N("G2", [pid2, obr2, obx2])],
+    )
+
+    assert _collect_segments(root, 5) == (pid1, obr1, [obx1, obx2])
+    assert _collect_segments(root, 1) == (pid1, obr1, [obx1])
+    assert _collect_segments(_N("EMPTY"), 1) == (None, None, [])
+
+
+def test_transform_copies_subject_reference_and_placeholder_code():
+    msg = parse_message(
+        _raw_oru(
+            "ORU^R01",
+            "PID|1||SHR||L^F||19700101|F|",
+            None,
+            ["OBX|1|ST|||a|||||F", "OBX|2|ST|||b|||||F"],
+        )
+    )
+
+    _, obs1, obs2 = ORUR01Transformer().transform(msg)
 
-        assert len(res) == 1 and getattr(res[0], "id", None) == "E0"
-    finally:
-        monkeypatch.setitem(fn.__globals__, "_er7", real_er7)
+    assert obs1.subject is not obs2.subject
+    assert obs1.subject.reference == obs2.subject.reference == "Patient/SHR"
+    assert obs1.code.text == obs2.code.text == "Unspecified Observation"
+    assert obs1.code is not obs2.code
 
 
 def test_transform_children_attr_raises_then_fallback_to_obx_attribute(monkeypatch):
@@ -722,16 +907,12 @@ def test_build_patient_id_setter_exception_path(monkeypatch):
         def id(self, v):
             raise ValueError("reject id")
 
-    fn = ORUR01Transformer._build_patient
-    Patient_orig = fn.__globals__["Patient"]
-    try:
-        monkeypatch.setitem(fn.__globals__, "Patient", _PatientShim)
-        p = ORUR01Transformer._build_patient(None, "PID|1||PIDX||Fam^Giv||19700101|M|")
+    fhir = _fhir()
+    monkeypatch.setattr(fhir, "Patient", _PatientShim)
+    p = ORUR01Transformer._build_patient(None, "PID|1||PIDX||Fam^Giv||19700101|M|")
 
-        assert getattr(p, "id", None) is None
-        assert p.name and p.name[0].family == "Fam"
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Patient", Patient_orig)
+    assert getattr(p, "id", None) is None
+    assert p.name and p.name[0].family == "Fam"
 
 
 # ------------------------------------------------------------------------------
@@ -833,6 +1014,20 @@ def test_build_observation_effective_dt_skips_on_invalid_dateonly():
     assert getattr(obs, "effectiveDateTime", None) in (None, "")
 
 
+def test_build_observation_effective_dt_full_datetime_is_utc():
+    patient = ORUR01Transformer._build_patient(None, "PID|1||PIDZ||L^F||19700101|F|")
+    obs = ORUR01Transformer._build_observation(
+        obr=None,
+        obx=None,
+        patient=patient,
+        obr_line="OBR|1||||||20250102030405",
+        obx_line="OBX|1|NM|GLU^Glucose||5.5|mg/dL|||||F||||",
+        ordinal=1,
+    )
+
+    assert obs.effectiveDateTime == datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
 def test_build_observation_obx3_missing_attr():
 
     class Obx3:
@@ -860,49 +1055,42 @@ def test_build_observation_obx3_missing_attr():
 
 def test_build_observation_value_block_error_log(monkeypatch, caplog):
 
-    def _flaky(line, field_index, comp_index):
+    def _flaky(tok, field_index, comp_index):
         if field_index in (2, 5, 6):
             raise RuntimeError("nope-value")
-        return real_field(line, field_index, comp_index)
+        return real_field(tok, field_index, comp_index)
 
     fn = ORUR01Transformer._build_observation
-    real_field = fn.__globals__["_field_comp_from_er7"]
-    monkeypatch.setitem(fn.__globals__, "_field_comp_from_er7", _flaky)
-    try:
-        patient = ORUR01Transformer._build_patient(None, "PID|1||VB1||L^F||19700101|F|")
-        with caplog.at_level("ERROR"):
-            obs = ORUR01Transformer._build_observation(
-                obr=None,
-                obx=None,
-                patient=patient,
-                obr_line="OBR|1|O|F|X^Y|||20250103",
-                obx_line="OBX|1|NM|X^Y||3.14|mg/dL|||||F||||",
-                ordinal=1,
-            )
-
-        assert obs is not None
-        assert any(
-            "Error parsing OBX-5/6 for value" in r.message for r in caplog.records
+    real_field = fn.__globals__["_tok_comp"]
+    monkeypatch.setitem(fn.__globals__, "_tok_comp", _flaky)
+    patient = ORUR01Transformer._build_patient(None, "PID|1||VB1||L^F||19700101|F|")
+    with caplog.at_level("ERROR"):
+        obs = ORUR01Transformer._build_observation(
+            obr=None,
+            obx=None,
+            patient=patient,
+            obr_line="OBR|1|O|F|X^Y|||20250103",
+            obx_line="OBX|1|NM|X^Y||3.14|mg/dL|||||F||||",
+            ordinal=1,
         )
-    finally:
-        monkeypatch.setitem(fn.__globals__, "_field_comp_from_er7", real_field)
+
+    assert obs is not None
+    assert any("Error parsing OBX-5/6 for value" in r.message for r in caplog.records)
 
 
-def test_build_observation_init_retry_when_code_or_value_cause_failure(monkeypatch):
+def test_build_observation_constructor_value_error_is_not_retried(monkeypatch):
+    calls = []
 
     class _ObsShim:
-        def __init__(self, *args, **kwargs):
-            if kwargs.get("code") is not None:
-                raise ValueError("boom")
-            for k, v in kwargs.items():
-                setattr(self, k, v)
+        def __init__(self, **kwargs):
+            calls.append(kwargs)
+            raise ValueError("boom")
 
-    fn = ORUR01Transformer._build_observation
-    Obs_orig = fn.__globals__["Observation"]
-    monkeypatch.setitem(fn.__globals__, "Observation", _ObsShim)
-    try:
-        patient = ORUR01Transformer._build_patient(None, "PID|1||P9||X^Y||19700101|M|")
-        obs = ORUR01Transformer._build_observation(
+    monkeypatch.setattr(_fhir(), "Observation", _ObsShim)
+    patient = ORUR01Transformer._build_patient(None, "PID|1||P9||X^Y||19700101|M|")
+
+    with pytest.raises(ValueError, match="boom"):
+        ORUR01Transformer._build_observation(
             obr=None,
             obx=None,
             patient=patient,
@@ -910,11 +1098,7 @@ def test_build_observation_init_retry_when_code_or_value_cause_failure(monkeypat
             obx_line="OBX|1|ST|NOTE^Comment||hello|||||F||||",
             ordinal=1,
         )
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Observation", Obs_orig)
-
-    assert getattr(obs, "status", None) == "final"
-    assert getattr(obs, "id", None) == "obs-P9-1"
+    assert len(calls) == 1 and calls[0]["code"] is not None
 
 
 def test_build_observation_identifier_obx3_and_effective_dt_error_paths(monkeypatch):
@@ -925,38 +1109,34 @@ def test_build_observation_identifier_obx3_and_effective_dt_error_paths(monkeypa
                 setattr(self, k, v)
             self.id = None
 
-    fn = ORUR01Transformer._build_observation
-    Obs_orig = fn.__globals__["Observation"]
-    try:
-        monkeypatch.setitem(fn.__globals__, "Observation", _ObsShim)
+    fhir = _fhir()
+    monkeypatch.setattr(fhir, "Observation", _ObsShim)
 
-        class ObrBad:
-            def __getattr__(self, name):
-                if name in ("obr_2", "obr_3"):
-                    raise RuntimeError("OBR attr boom")
-                raise AttributeError
+    class ObrBad:
+        def __getattr__(self, name):
+            if name in ("obr_2", "obr_3"):
+                raise RuntimeError("OBR attr boom")
+            raise AttributeError
 
-        class ObxBad:
-            @property
-            def obx_3(self):
-                raise RuntimeError("OBX3 boom")
+    class ObxBad:
+        @property
+        def obx_3(self):
+            raise RuntimeError("OBX3 boom")
 
-        patient = ORUR01Transformer._build_patient(None, "PID|1||PX||L^F||19700101|U|")
-        obs = ORUR01Transformer._build_observation(
-            obr=ObrBad(),
-            obx=ObxBad(),
-            patient=patient,
-            obr_line=object(),
-            obx_line="OBX|1|NM|||notnum|u|||||F||||",
-            ordinal=1,
-        )
+    patient = ORUR01Transformer._build_patient(None, "PID|1||PX||L^F||19700101|U|")
+    obs = ORUR01Transformer._build_observation(
+        obr=ObrBad(),
+        obx=ObxBad(),
+        patient=patient,
+        obr_line=object(),
+        obx_line="OBX|1|NM|||notnum|u|||||F||||",
+        ordinal=1,
+    )
 
-        assert getattr(obs, "status", None) == "final"
-        assert getattr(obs, "subject", None) and obs.subject.reference.endswith("/PX")
-        assert getattr(obs, "code", None) and obs.code.text
-        assert getattr(obs, "effectiveDateTime", None) in (None, "")
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Observation", Obs_orig)
+    assert getattr(obs, "status", None) == "final"
+    assert getattr(obs, "subject", None) and obs.subject.reference.endswith("/PX")
+    assert getattr(obs, "code", None) and obs.code.text
+    assert getattr(obs, "effectiveDateTime", None) in (None, "")
 
 
 def test_build_observation_id_setter_exception_branch(monkeypatch):
@@ -979,23 +1159,19 @@ def test_build_observation_id_setter_exception_branch(monkeypatch):
                 raise ValueError("reject id")
             self._id = v
 
-    fn = ORUR01Transformer._build_observation
-    Obs_orig = fn.__globals__["Observation"]
-    try:
-        monkeypatch.setitem(fn.__globals__, "Observation", _ObsShim)
-        patient = ORUR01Transformer._build_patient(None, "PID|1||IID||L^F||19700101|U|")
-        obs = ORUR01Transformer._build_observation(
-            obr=None,
-            obx=None,
-            patient=patient,
-            obr_line="OBR|1||||||20250101111111|||||||||||||||||||||||",
-            obx_line="OBX|1|ST|NOTE^Comment||ok|||||F||||",
-            ordinal=3,
-        )
+    fhir = _fhir()
+    monkeypatch.setattr(fhir, "Observation", _ObsShim)
+    patient = ORUR01Transformer._build_patient(None, "PID|1||IID||L^F||19700101|U|")
+    obs = ORUR01Transformer._build_observation(
+        obr=None,
+        obx=None,
+        patient=patient,
+        obr_line="OBR|1||||||20250101111111|||||||||||||||||||||||",
+        obx_line="OBX|1|ST|NOTE^Comment||ok|||||F||||",
+        ordinal=3,
+    )
 
-        assert getattr(obs, "id", None) is None or obs.id.startswith("obs-")
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Observation", Obs_orig)
+    assert getattr(obs, "id", None) is None or obs.id.startswith("obs-")
 
 
 def test_build_observation_constructor_other_exception_is_re_raised(monkeypatch):
@@ -1004,28 +1180,24 @@ def test_build_observation_constructor_other_exception_is_re_raised(monkeypatch)
         def __init__(self, **kw):
             raise TypeError("bad args")
 
-    fn = ORUR01Transformer._build_observation
-    Obs_orig = fn.__globals__["Observation"]
+    fhir = _fhir()
+    monkeypatch.setattr(fhir, "Observation", _BoomObs)
+    patient = ORUR01Transformer._build_patient(None, "PID|1||AA1||L^F||19700101|M|")
+    exc = None
     try:
-        monkeypatch.setitem(fn.__globals__, "Observation", _BoomObs)
-        patient = ORUR01Transformer._build_patient(None, "PID|1||AA1||L^F||19700101|M|")
-        exc = None
-        try:
-            ORUR01Transformer._build_observation(
-                obr=None,
-                obx=None,
-                patient=patient,
-                obr_line="OBR|1||||||20250101111111",
-                obx_line="OBX|1|ST|NOTE^Comment||ok|||||F||||",
-                ordinal=1,
-            )
-        except TypeError as e:
-            exc = e
+        ORUR01Transformer._build_observation(
+            obr=None,
+            obx=None,
+            patient=patient,
+            obr_line="OBR|1||||||20250101111111",
+            obx_line="OBX|1|ST|NOTE^Comment||ok|||||F||||",
+            ordinal=1,
+        )
+    except TypeError as e:
+        exc = e
 
-        assert exc is not None, "TypeError was not raised"
-        assert str(exc) == "bad args", f"Unexpected error message: {exc}"
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Observation", Obs_orig)
+    assert exc is not None, "TypeError was not raised"
+    assert str(exc) == "bad args", f"Unexpected error message: {exc}"
 
 
 def test_build_observation_first_rep_len_raises_via_obx6_units_path(monkeypatch):
@@ -1048,21 +1220,17 @@ def test_build_observation_first_rep_len_raises_via_obx6_units_path(monkeypatch)
                 setattr(self, k, v)
             self.id = None
 
-    fn = ORUR01Transformer._build_observation
-    Obs_orig = fn.__globals__["Observation"]
-    try:
-        monkeypatch.setitem(fn.__globals__, "Observation", _ObsShim)
-        patient = ORUR01Transformer._build_patient(None, "PID|1||OX6||L^F||19700101|F|")
-        obs = ORUR01Transformer._build_observation(
-            obr=None,
-            obx=Obx(),
-            patient=patient,
-            obr_line="OBR|1||||||20250101101010",
-            obx_line="OBX|1|NM|X^Y||2.5|||||F||||",
-            ordinal=1,
-        )
+    fhir = _fhir()
+    monkeypatch.setattr(fhir, "Observation", _ObsShim)
+    patient = ORUR01Transformer._build_patient(None, "PID|1||OX6||L^F||19700101|F|")
+    obs = ORUR01Transformer._build_observation(
+        obr=None,
+        obx=Obx(),
+        patient=patient,
+        obr_line="OBR|1||||||20250101101010",
+        obx_line="OBX|1|NM|X^Y||2.5|||||F||||",
+        ordinal=1,
+    )
 
-        assert obs.valueQuantity and float(obs.valueQuantity.value) == 2.5
-        assert getattr(obs.valueQuantity, "unit", None) is None
-    finally:
-        monkeypatch.setitem(fn.__globals__, "Observation", Obs_orig)
+    assert obs.valueQuantity and float(obs.valueQuantity.value) == 2.5
+    assert getattr(obs.valueQuantity, "unit", None) is None